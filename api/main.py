@@ -6,17 +6,24 @@ FastAPI backend per eseguire codice ORATIO dal browser
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Any, Dict, List
 import sys
 import os
-import io
+import asyncio
 import base64
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from oratio.compiler.parser import SemanticParser
+# Il runtime gira nei thread del server: matplotlib senza GUI
+import matplotlib
+matplotlib.use("Agg")
+
+from oratio.compiler.async_parser import AsyncSemanticParser, close_llm_pools
 from oratio.runtime.executor import Runtime
+from oratio.runtime.events import EventLog
+from oratio.render import render
 from oratio.compiler.errors import ParseError, ValidationError, OratioError
 
 app = FastAPI(
@@ -43,11 +50,18 @@ class CodeRequest(BaseModel):
 class CodeResponse(BaseModel):
     success: bool
     output: str = ""
+    events: List[Dict[str, Any]] = []  # eventi dell'esecuzione (Event.record)
     error: str = ""
     image: str = ""  # Base64 se c'è un'immagine
     execution_time: float = 0.0
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Chiude le connessioni verso l'LLM"""
+    await close_llm_pools()
+
+
 @app.get("/")
 def root():
     """Health check"""
@@ -58,6 +72,16 @@ def root():
     }
 
 
+@app.get("/stats")
+def stats():
+    """Contatori del parser (richieste accorpate, latenze LLM) e della cache dei file letti"""
+    return {
+        "coalescing": AsyncSemanticParser.flight.stats(),
+        "llm_latency": AsyncSemanticParser.latency.snapshot(),
+        "frames": Runtime.frames.stats(),
+    }
+
+
 @app.post("/execute", response_model=CodeResponse)
 async def execute_code(request: CodeRequest):
     """
@@ -66,25 +90,21 @@ async def execute_code(request: CodeRequest):
     import time
     start_time = time.time()
     
-    # Cattura output
-    output_buffer = io.StringIO()
-    old_stdout = sys.stdout
+    # Eventi della richiesta (ognuna ha il suo registro)
+    log = EventLog()
     
     try:
-        # Redirect stdout
-        sys.stdout = output_buffer
-        
-        # Parse
-        parser = SemanticParser(language=request.language)
-        ir = parser.parse(request.code)
+        # Parse (non blocca l'event loop)
+        parser = AsyncSemanticParser(language=request.language)
+        ir = await parser.parse(request.code)
         
-        # Execute
-        runtime = Runtime()
-        result = runtime.execute(ir)
+        # Execute in un thread: il lavoro pandas non blocca l'event loop;
+        # gli eventi della richiesta finiscono nel suo registro
+        runtime = Runtime(frame_cache=True, events=log)
+        result = await asyncio.to_thread(runtime.execute, ir)
         
-        # Restore stdout
-        sys.stdout = old_stdout
-        output = output_buffer.getvalue()
+        lines = (render(event) for event in log.events)
+        output = "".join(f"{line}\n" for line in lines if line is not None)
         
         # Check se c'è un'immagine generata
         image_base64 = ""
@@ -102,12 +122,12 @@ async def execute_code(request: CodeRequest):
         return CodeResponse(
             success=True,
             output=output,
+            events=[event.record() for event in log.events],
             image=image_base64,
             execution_time=execution_time
         )
         
     except (ParseError, ValidationError, OratioError) as e:
-        sys.stdout = old_stdout
         return CodeResponse(
             success=False,
             error=str(e),
@@ -115,7 +135,6 @@ async def execute_code(request: CodeRequest):
         )
     
     except Exception as e:
-        sys.stdout = old_stdout
         return CodeResponse(
             success=False,
             error=f"Errore inaspettato: {str(e)}",
@@ -0,0 +1,92 @@
+"""
+Benchmark - Esecuzione a blocchi su un CSV grande
+
+Genera un CSV di --rows vendite ed esegue filtro, somma, media,
+conteggio e un ordinamento salvato su file con Runtime() e
+Runtime(chunked=True), ognuno in un processo separato. Confronta tempo
+e picco di RSS: in modalità chunked il picco resta legato alla
+dimensione dei blocchi, non a quella del file.
+
+Uso:
+    python benchmarks/bench_chunked.py --rows 5000000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime.resources import format_bytes  # noqa: E402
+
+
+OPERATIONS = [
+    {"id": "op_1", "type": "io.read_csv", "params": {"file_path": "vendite.csv"}, "output": "$var_0"},
+    {"id": "op_2", "type": "data.filter", "params": {"source": "$var_0", "condition": "importo > 100"},
+     "output": "$var_1"},
+    {"id": "op_3", "type": "math.sum", "params": {"source": "$var_1", "column": "importo"},
+     "output": "$var_2"},
+    {"id": "op_4", "type": "math.mean", "params": {"source": "$var_1", "column": "importo"},
+     "output": "$var_3"},
+    {"id": "op_5", "type": "math.count", "params": {"source": "$var_1"}, "output": "$var_4"},
+    {"id": "op_6", "type": "io.print", "params": {"message": "Totale: $var_2, media: $var_3, $var_4 vendite"}},
+    {"id": "op_7", "type": "data.sort", "params": {"source": "$var_1", "column": "importo",
+                                                   "ascending": False}, "output": "$var_5"},
+    {"id": "op_8", "type": "io.write_csv", "params": {"source": "$var_5", "file_path": "ordinate.csv"}},
+]
+
+
+def child(chunked: bool):
+    from oratio.runtime import Runtime
+
+    runtime = Runtime(chunked=chunked)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        runtime.execute({"version": "1.0", "operations": OPERATIONS})
+        elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_rss": runtime.last_report["peak_rss"]}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--child", choices=["eager", "chunked"])
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child == "chunked")
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "data": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, args.rows), unit="D"),
+        "prodotto": rng.choice(["Laptop", "Mouse", "Tastiera", "Monitor", "Cuffie"], args.rows),
+        "importo": rng.integers(1, 2000, args.rows),
+        "quantita": rng.integers(1, 10, args.rows),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data.to_csv(Path(tmp) / "vendite.csv", index=False)
+        del data
+        size = (Path(tmp) / "vendite.csv").stat().st_size
+
+        print(f"CSV: {format_bytes(size)}")
+        print(f"{'modalità':<10}{'tempo':>10}{'picco RSS':>12}")
+        for mode in ("eager", "chunked"):
+            out = subprocess.run([sys.executable, __file__, "--child", mode], cwd=tmp,
+                                 capture_output=True, text=True, check=True).stdout
+            report = json.loads(out.splitlines()[-1])
+            print(f"{mode:<10}{report['seconds']:>9.2f}s{format_bytes(report['peak_rss']):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark - Lettura CSV vs Parquet vs Arrow (e copia Parquet dei CSV)
+
+Genera un CSV di --rows righe, lo salva anche in Parquet e Arrow, e
+misura la lettura (migliore di --repeat) di:
+    io.read_csv, io.read_csv con csv_cache (copia già pronta),
+    io.read_parquet, io.read_arrow (memory map senza copie).
+
+Uso:
+    python benchmarks/bench_columnar.py --rows 2000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime import Runtime  # noqa: E402
+from oratio.runtime import columnar  # noqa: E402
+
+
+CASES = {
+    "csv": ("io.read_csv", "vendite.csv", {}),
+    "csv (copia)": ("io.read_csv", "vendite.csv", {"csv_cache": True}),
+    "parquet": ("io.read_parquet", "vendite.parquet", {}),
+    "arrow": ("io.read_arrow", "vendite.arrow", {}),
+}
+
+
+def run(op_type, file_path, options):
+    runtime = Runtime(**options)
+    ir = {"version": "1.0", "operations": [
+        {"id": "op_1", "type": op_type, "params": {"file_path": file_path}, "output": "$var_0"},
+    ]}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        runtime.execute(ir)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "prodotto": rng.choice(["Laptop", "Mouse", "Monitor", "Tastiera"], args.rows),
+        "importo": rng.uniform(1, 2000, args.rows).round(2),
+        "quantita": rng.integers(1, 20, args.rows),
+        "cliente": rng.integers(1, 100_000, args.rows),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.environ["ORATIO_COLUMNAR_DIR"] = os.path.join(tmp, "sidecar")
+        data.to_csv("vendite.csv", index=False)
+        columnar.write_parquet(data, "vendite.parquet")
+        columnar.write_arrow(data, "vendite.arrow")
+        run("io.read_csv", "vendite.csv", {"csv_cache": True})  # prepara la copia
+
+        csv = None
+        print(f"{'formato':<14}{'lettura':>10}{'speedup':>10}")
+        for name, (op_type, file_path, options) in CASES.items():
+            elapsed = min(run(op_type, file_path, options) for _ in range(args.repeat))
+            csv = csv or elapsed
+            print(f"{name:<14}{elapsed:>9.3f}s{csv / elapsed:>9.2f}x")
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark - Sorgente implicita con migliaia di operazioni
+
+Esegue script di --ops operazioni in cui ogni variabile prodotta è letta
+come sorgente implicita dall'operazione successiva, con tutte le
+variabili tenute in memoria (free_memory=False, il caso peggiore). Il
+costo per operazione deve restare costante al crescere dello script.
+
+Per confronto misura anche la vecchia risoluzione,
+list(memory.values())[-1], su una memoria della stessa dimensione.
+
+Uso:
+    python benchmarks/bench_implicit_source.py --ops 1000 5000 20000
+"""
+
+import os
+import sys
+import time
+import timeit
+import argparse
+import contextlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime import Runtime  # noqa: E402
+
+
+def script(count):
+    operations = []
+    for i in range(count // 2):
+        operations.append({"id": f"op_{2 * i}", "type": "io.print",
+                           "params": {"value": [i, i + 1]}, "output": f"$var_{2 * i}"})
+        operations.append({"id": f"op_{2 * i + 1}", "type": "math.count",
+                           "params": {}, "output": f"$var_{2 * i + 1}"})
+    return {"version": "1.0", "operations": operations}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    print(f"{'operazioni':>10}{'µs/op':>10}{'lookup':>12}{'vecchio lookup':>16}")
+    for count in args.ops:
+        runtime = Runtime(free_memory=False)
+        ir = script(count)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            runtime.execute(ir)
+            elapsed = time.perf_counter() - start
+
+        memory = runtime.memory
+        new = min(timeit.repeat(lambda: runtime.last_value, number=1000, repeat=5)) / 1000
+        old = min(timeit.repeat(lambda: list(memory.values())[-1], number=100, repeat=5)) / 100
+        print(f"{count:>10}{elapsed / count * 1e6:>10.1f}{new * 1e9:>10.0f}ns{old * 1e9:>14.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
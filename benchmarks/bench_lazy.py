@@ -0,0 +1,86 @@
+"""
+Benchmark - Esecuzione lazy su un CSV largo
+
+Genera un CSV di --rows righe e --columns colonne (importo, quantita e
+colonne extra) ed esegue filtro, ordinamento, media e conteggio con
+Runtime() e Runtime(lazy=True), ognuno in un processo separato.
+Confronta tempo e picco di RSS.
+
+Uso:
+    python benchmarks/bench_lazy.py --rows 1000000 --columns 30
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime.resources import format_bytes  # noqa: E402
+
+
+OPERATIONS = [
+    {"id": "op_1", "type": "io.read_csv", "params": {"file_path": "vendite.csv"}, "output": "$var_0"},
+    {"id": "op_2", "type": "data.filter", "params": {"source": "$var_0", "condition": "importo > 1500"},
+     "output": "$var_1"},
+    {"id": "op_3", "type": "data.sort", "params": {"source": "$var_1", "column": "importo",
+                                                   "ascending": False}, "output": "$var_2"},
+    {"id": "op_4", "type": "math.mean", "params": {"source": "$var_2", "column": "importo"},
+     "output": "$var_3"},
+    {"id": "op_5", "type": "math.count", "params": {"source": "$var_1"}, "output": "$var_4"},
+    {"id": "op_6", "type": "io.print", "params": {"message": "Media: $var_3 ($var_4 vendite)"}},
+]
+
+
+def child(lazy: bool):
+    from oratio.runtime import Runtime
+
+    runtime = Runtime(lazy=lazy)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        result = runtime.execute({"version": "1.0", "operations": OPERATIONS})
+        elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_rss": runtime.last_report["peak_rss"], "result": result}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=30)
+    parser.add_argument("--child", choices=["eager", "lazy"])
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child == "lazy")
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.integers(0, 1000, (args.rows, args.columns - 2)),
+                        columns=[f"extra_{i}" for i in range(args.columns - 2)])
+    data["importo"] = rng.integers(1, 2000, args.rows)
+    data["quantita"] = rng.integers(1, 10, args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data.to_csv(Path(tmp) / "vendite.csv", index=False)
+        del data
+
+        print(f"{'modalità':<10}{'tempo':>10}{'picco RSS':>12}  risultato")
+        for mode in ("eager", "lazy"):
+            out = subprocess.run([sys.executable, __file__, "--child", mode], cwd=tmp,
+                                 capture_output=True, text=True, check=True).stdout
+            report = json.loads(out.splitlines()[-1])
+            print(f"{mode:<10}{report['seconds']:>9.2f}s{format_bytes(report['peak_rss']):>12}"
+                  f"  {report['result']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark - Picco di memoria con e senza rilascio delle variabili morte
+
+Carica un CSV di --rows vendite casuali (colonne importo e quantita
+come in examples/vendite.csv), lo filtra, lo ordina e ne calcola la
+somma, con Runtime(free_memory=True)
+e Runtime(free_memory=False). Ogni configurazione gira in un processo
+separato, così il picco di RSS non è influenzato dall'altra.
+
+Uso:
+    python benchmarks/bench_memory.py --rows 5000000
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime.resources import format_bytes  # noqa: E402
+
+
+OPERATIONS = [
+    {"id": "op_1", "type": "io.read_csv", "params": {"file_path": "vendite.csv"}, "output": "$var_0"},
+    {"id": "op_2", "type": "data.filter", "params": {"source": "$var_0", "condition": "importo > 20"},
+     "output": "$var_1"},
+    {"id": "op_3", "type": "data.sort", "params": {"source": "$var_1", "column": "importo"},
+     "output": "$var_2"},
+    {"id": "op_4", "type": "math.sum", "params": {"source": "$var_2", "column": "importo"},
+     "output": "$var_3"},
+    {"id": "op_5", "type": "io.print", "params": {"message": "Totale: $var_3"}},
+]
+
+
+def child(free_memory: bool):
+    from oratio.runtime import Runtime
+
+    runtime = Runtime(free_memory=free_memory)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        runtime.execute({"version": "1.0", "operations": OPERATIONS})
+    print(json.dumps(runtime.last_report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--child", choices=["free", "keep"])
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child == "free")
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "importo": rng.integers(1, 2000, args.rows),
+        "quantita": rng.integers(1, 10, args.rows),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data.to_csv(Path(tmp) / "vendite.csv", index=False)
+        del data
+
+        print(f"{'free_memory':<14}{'picco RSS':>12}{'liberate':>10}")
+        for mode in ("keep", "free"):
+            out = subprocess.run([sys.executable, __file__, "--child", mode], cwd=tmp,
+                                 capture_output=True, text=True, check=True).stdout
+            report = json.loads(out.splitlines()[-1])
+            print(f"{str(mode == 'free'):<14}{format_bytes(report['peak_rss']):>12}{report['freed']:>10}")
+
+
+if __name__ == "__main__":
+    main()
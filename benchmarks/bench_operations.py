@@ -0,0 +1,73 @@
+"""
+Benchmark - Operazioni su DataFrame (data.*, math.std/var, string.*)
+
+Esegue ogni operazione su un DataFrame di --rows righe e riporta il
+tempo (migliore di --repeat) e se il DataFrame di partenza resta
+intatto.
+
+Uso:
+    python benchmarks/bench_operations.py --rows 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime import Runtime  # noqa: E402
+
+
+CASES = [
+    ("data.unique", {"column": "prodotto"}),
+    ("data.value_counts", {"column": "prodotto"}),
+    ("data.drop", {"columns": ["cliente"]}),
+    ("data.rename", {"columns": {"importo": "totale"}}),
+    ("data.fillna", {"column": "importo", "value": 0}),
+    ("data.dropna", {}),
+    ("math.std", {"column": "importo"}),
+    ("math.var", {"column": "importo"}),
+    ("string.upper", {"column": "prodotto"}),
+    ("string.lower", {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    importo = rng.uniform(1, 2000, args.rows).round(2)
+    importo[rng.random(args.rows) < 0.05] = np.nan
+    data = pd.DataFrame({
+        "prodotto": rng.choice(["Laptop", "Mouse", "Monitor", "Tastiera"], args.rows),
+        "importo": importo,
+        "quantita": rng.integers(1, 20, args.rows),
+        "cliente": rng.integers(1, 100_000, args.rows),
+    })
+    snapshot = data.copy()
+    runtime = Runtime()
+
+    print(f"{'operazione':<20}{'tempo':>10}  sorgente intatta")
+    for op_type, params in CASES:
+        times = []
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                runtime.operations[op_type](source=data, **params)
+                times.append(time.perf_counter() - start)
+        intact = "sì" if data.equals(snapshot) else "NO"
+        print(f"{op_type:<20}{min(times) * 1000:>8.1f}ms  {intact}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark - Aggregazioni fuse vs separate (Runtime optimize)
+
+Esegue lo script di examples/completo.ora (conteggio, somma e media
+della stessa colonna filtrata) più minimo e massimo, su un CSV di
+--rows righe, con e senza fusione, in modalità eager, lazy e chunked.
+Confronta il tempo totale (migliore di --repeat).
+
+Uso:
+    python benchmarks/bench_optimizer.py --rows 2000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime import Runtime  # noqa: E402
+
+
+def op(index, op_type, output=None, **params):
+    result = {"id": f"op_{index}", "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+OPERATIONS = [
+    op(1, "io.read_csv", "$var_0", file_path="vendite.csv"),
+    op(2, "data.filter", "$var_1", source="$var_0", condition="importo > 100"),
+    op(3, "math.count", "$var_2", source="$var_1"),
+    op(4, "math.sum", "$var_3", source="$var_1", column="importo"),
+    op(5, "math.mean", "$var_4", source="$var_1", column="importo"),
+    op(6, "math.min", "$var_5", source="$var_1", column="importo"),
+    op(7, "math.max", "$var_6", source="$var_1", column="importo"),
+    op(8, "io.print", message="$var_2 vendite, totale $var_3, media $var_4 ($var_5 - $var_6)"),
+]
+
+MODES = {"eager": {}, "lazy": {"lazy": True}, "chunked": {"chunked": True}}
+
+
+def run(mode, optimize):
+    runtime = Runtime(optimize=optimize, **MODES[mode])
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        runtime.execute({"version": "1.0", "operations": OPERATIONS})
+        return time.perf_counter() - start, runtime.last_report["scans"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "prodotto": rng.choice(["Laptop", "Mouse", "Monitor", "Tastiera"], args.rows),
+        "importo": rng.uniform(1, 2000, args.rows).round(2),
+        "quantita": rng.integers(1, 20, args.rows),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        data.to_csv("vendite.csv", index=False)
+
+        print(f"{'modalità':<10}{'separate':>10}{'fuse':>10}{'speedup':>10}{'letture':>12}")
+        for mode in MODES:
+            separate = min(run(mode, False)[0] for _ in range(args.repeat))
+            fused, scans = min((run(mode, True) for _ in range(args.repeat)), key=lambda r: r[0])
+            reads = f"{scans['scans_before']} → {scans['scans_after']}"
+            print(f"{mode:<10}{separate:>9.3f}s{fused:>9.3f}s{separate / fused:>9.2f}x{reads:>12}")
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
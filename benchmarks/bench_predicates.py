@@ -0,0 +1,78 @@
+"""
+Benchmark - Filtri in catena vs una condizione composta
+
+Su un DataFrame di --rows righe confronta tre data.filter in catena
+(un taglio del DataFrame per clausola) con un solo data.filter con la
+condizione composta equivalente (una maschera, un taglio). Tempo
+migliore di --repeat.
+
+Uso:
+    python benchmarks/bench_predicates.py --rows 2000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime import Runtime  # noqa: E402
+
+
+CLAUSES = ["importo > 100", "quantita >= 3", "regione == Nord"]
+
+CHAINED = [
+    {"id": f"op_{i + 1}", "type": "data.filter", "output": f"$var_{i + 1}",
+     "params": {"source": f"$var_{i}", "condition": clause}}
+    for i, clause in enumerate(CLAUSES)
+]
+
+COMPOUND = [
+    {"id": "op_1", "type": "data.filter", "output": "$var_3",
+     "params": {"source": "$var_0", "condition": " and ".join(CLAUSES)}},
+]
+
+
+def run(data, operations):
+    runtime = Runtime()
+    runtime.memory["$var_0"] = data
+    ir = {"version": "1.0", "operations": operations, "exports": ["$var_0", "$var_3"]}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        runtime.execute(ir)
+        elapsed = time.perf_counter() - start
+    return elapsed, len(runtime.memory["$var_3"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "regione": rng.choice(["Nord", "Sud", "Centro"], args.rows),
+        "importo": rng.uniform(1, 2000, args.rows).round(2),
+        "quantita": rng.integers(1, 20, args.rows),
+        "cliente": rng.integers(1, 100_000, args.rows),
+    })
+
+    chained, rows = min(run(data, CHAINED) for _ in range(args.repeat))
+    compound, same = min(run(data, COMPOUND) for _ in range(args.repeat))
+    assert rows == same
+
+    print(f"{'filtri':<12}{'tempo':>10}")
+    print(f"{'in catena':<12}{chained:>9.3f}s")
+    print(f"{'composto':<12}{compound:>9.3f}s  ({chained / compound:.2f}x, {rows} righe)")
+
+
+if __name__ == "__main__":
+    main()
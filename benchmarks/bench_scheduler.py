@@ -0,0 +1,101 @@
+"""
+Benchmark - Esecuzione in sequenza vs parallela (Runtime jobs)
+
+Esegue l'IR degli script di esempio (completo, statistiche, grafico)
+su examples/vendite.csv replicato fino a --rows righe, con jobs=1 e
+con --jobs N, e confronta il tempo totale (migliore di --repeat).
+
+L'IR è scritto a mano, uguale a quello che il parser produce per gli
+esempi: il benchmark misura solo il runtime, senza LLM.
+
+Uso:
+    python benchmarks/bench_scheduler.py --rows 2000000 --jobs 4
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from oratio.runtime import Runtime  # noqa: E402
+
+
+def op(index, op_type, output=None, **params):
+    result = {"id": f"op_{index}", "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+SCRIPTS = {
+    "completo": [
+        op(1, "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op(2, "data.show", source="$var_0", n=3),
+        op(3, "data.filter", "$var_1", source="$var_0", condition="importo > 100"),
+        op(4, "math.count", "$var_2", source="$var_1"),
+        op(5, "io.print", message="Prodotti costosi: $var_2"),
+        op(6, "math.sum", "$var_3", source="$var_1", column="importo"),
+        op(7, "math.mean", "$var_4", source="$var_1", column="importo"),
+        op(8, "io.print", message="Totale: $var_3 euro"),
+        op(9, "io.print", message="Media: $var_4 euro"),
+        op(10, "data.sort", "$var_5", source="$var_1", column="importo", ascending=False),
+        op(11, "data.show", source="$var_5", n=5),
+        op(12, "io.write_csv", source="$var_1", file_path="vendite_filtrate.csv"),
+    ],
+    "statistiche": [
+        op(1, "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op(2, "math.sum", "$var_1", source="$var_0", column="importo"),
+        op(3, "math.mean", "$var_2", source="$var_0", column="importo"),
+        op(4, "math.count", "$var_3", source="$var_0"),
+        op(5, "io.print", message="Totale vendite: $var_1 euro"),
+        op(6, "io.print", message="Media: $var_2 euro"),
+        op(7, "io.print", message="Numero ordini: $var_3"),
+    ],
+    "grafico": [
+        op(1, "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op(2, "data.head", "$var_1", source="$var_0", n=50),
+        op(3, "viz.bar", source="$var_1", y="importo", save_as="vendite_grafico.png"),
+    ],
+}
+
+
+def run(operations, jobs):
+    runtime = Runtime(jobs=jobs)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        runtime.execute({"version": "1.0", "operations": operations})
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = pd.read_csv(ROOT / "examples" / "vendite.csv")
+    data = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).head(args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        data.to_csv("vendite.csv", index=False)
+
+        print(f"{'script':<14}{'jobs=1':>10}{f'jobs={args.jobs}':>10}{'speedup':>10}")
+        for name, operations in SCRIPTS.items():
+            sequential = min(run(operations, 1) for _ in range(args.repeat))
+            parallel = min(run(operations, args.jobs) for _ in range(args.repeat))
+            print(f"{name:<14}{sequential:>9.3f}s{parallel:>9.3f}s{sequential / parallel:>9.2f}x")
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
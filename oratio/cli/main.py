@@ -17,7 +17,13 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from oratio.compiler import SemanticParser
+from oratio.compiler.parser import stored_fingerprint
+from oratio.compiler.artifact import artifact_path, load_ir, read_artifact, write_artifact, \
+    ARTIFACT_SUFFIX
 from oratio.runtime import Runtime
+from oratio.runtime.profiler import Profiler
+from oratio.runtime.resources import format_bytes
+from oratio.render import ConsoleRenderer
 
 app = typer.Typer(
     name="oratio",
@@ -32,12 +38,41 @@ def run(
     file: Path = typer.Argument(..., help="File .ora da eseguire"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Output dettagliato"),
     show_ir: bool = typer.Option(False, "--show-ir", help="Mostra IR generato"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignora la cache IR"),
+    no_artifact: bool = typer.Option(False, "--no-artifact",
+                                     help="Ignora l'artifact .orac e riesegui il parsing"),
+    stream: bool = typer.Option(False, "--stream",
+                                help="Esegui le operazioni mentre l'LLM le genera"),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1,
+                             help="Operazioni indipendenti eseguite in parallelo"),
+    report_memory: bool = typer.Option(False, "--report-memory",
+                                       help="Mostra il picco di memoria dell'esecuzione"),
+    lazy: bool = typer.Option(False, "--lazy",
+                              help="Leggi dai CSV solo colonne e righe usate dallo script"),
+    chunked: bool = typer.Option(False, "--chunked",
+                                 help="Elabora i CSV a blocchi (file più grandi della memoria)"),
+    no_optimize: bool = typer.Option(False, "--no-optimize",
+                                     help="Non fondere le aggregazioni sulla stessa colonna"),
+    csv_cache: bool = typer.Option(False, "--csv-cache",
+                                   help="Rileggi i CSV invariati da una copia Parquet"),
+    quiet: bool = typer.Option(False, "--quiet", "-q",
+                               help="Mostra solo l'output dello script, senza avanzamento"),
+    profile: Optional[Path] = typer.Option(None, "--profile",
+                                           help="Scrivi il profilo (traccia Chrome + stack folded)"),
 ):
     """
-    Esegue un file .ora
+    Esegue un file .ora (o un artifact .orac)
+    
+    Se accanto al sorgente c'è un artifact compilato dallo stesso
+    sorgente, l'IR viene caricato da lì senza parsing. Con --jobs N
+    le operazioni indipendenti vengono eseguite in parallelo. Con
+    --profile out.json scrive la traccia Chrome di parsing, validazione
+    e operazioni (tempi, CPU, memoria, righe) e out.folded per i flame
+    graph.
     
     Esempio:
         oratio run examples/primo.ora
+        oratio run examples/primo.ora --profile profilo.json
     """
     
     # Check file exists
@@ -53,31 +88,61 @@ def run(
             border_style="cyan"
         ))
     
+    profiler = Profiler() if profile else None
+    if profiler:
+        profiler.start()
+    
     try:
-        # Leggi codice
-        code = file.read_text()
+        ir = None
+        if file.suffix == ARTIFACT_SUFFIX:
+            artifact = read_artifact(file)
+            if artifact is None:
+                console.print(f"[red]❌ Artifact non valido:[/red] {file}")
+                raise typer.Exit(1)
+            ir = artifact["ir"]
+            code = None
+        else:
+            # Leggi codice
+            code = file.read_text()
+            if not no_artifact:
+                ir = load_ir(file, code, stored_fingerprint)
         
-        if verbose:
+        if verbose and ir is not None:
+            console.print(f"\n[bold]📦 IR da artifact:[/bold] {artifact_path(file).name}")
+        
+        if verbose and code is not None:
             console.print("\n[bold]📝 Codice:[/bold]")
             syntax = Syntax(code, "text", theme="monokai", line_numbers=True)
             console.print(Panel(syntax, border_style="green"))
         
-        # Parse
-        if verbose:
-            console.print("\n[bold yellow]1️⃣  Parsing...[/bold yellow]")
-        
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-            transient=True
-        ) as progress:
-            task = progress.add_task("Parsing semantico...", total=None)
-            parser = SemanticParser()
-            ir = parser.parse(code)
-            progress.update(task, completed=True)
+        # Streaming: parsing ed esecuzione si sovrappongono
+        operations = None
+        if ir is None and stream:
+            if verbose:
+                console.print("\n[bold yellow]1️⃣  Parsing ed esecuzione in streaming...[/bold yellow]")
+            parser = SemanticParser(use_cache=not no_cache)
+            operations = parser.parse_stream(code)
+        
+        # Parse (solo senza artifact aggiornato)
+        elif ir is None:
+            if verbose:
+                console.print("\n[bold yellow]1️⃣  Parsing...[/bold yellow]")
+            
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console,
+                transient=True
+            ) as progress:
+                task = progress.add_task("Parsing semantico...", total=None)
+                parser = SemanticParser(use_cache=not no_cache)
+                ir = parser.parse(code)
+                progress.update(task, completed=True)
+            
+            if verbose and parser.cache is not None:
+                _print_cache_stats(parser.cache)
         
-        if show_ir:
+        if show_ir and ir is not None:
             import json
             console.print("\n[bold]📦 IR Generato:[/bold]")
             console.print(Panel(
@@ -86,7 +151,7 @@ def run(
             ))
         
         # Execute
-        if verbose:
+        if verbose and operations is None:
             console.print("\n[bold yellow]2️⃣  Esecuzione...[/bold yellow]")
         
         # Cambia directory al file per path relativi
@@ -94,14 +159,25 @@ def run(
         os.chdir(file.parent)
         
         try:
-            runtime = Runtime()
-            result = runtime.execute(ir)
+            runtime = Runtime(jobs=jobs, lazy=lazy, chunked=chunked,
+                              optimize=not no_optimize, csv_cache=csv_cache,
+                              events=ConsoleRenderer(progress=not quiet),
+                              hooks=[profiler] if profiler else None)
+            if operations is not None:
+                result = runtime.execute_stream(operations)
+            else:
+                result = runtime.execute(ir)
         finally:
             os.chdir(original_dir)
         
+        if report_memory:
+            _print_memory_report(runtime.last_report)
+        
         if verbose:
             console.print("\n[bold green]✅ Completato![/bold green]")
         
+    except typer.Exit:
+        raise
     except FileNotFoundError as e:
         console.print(f"[red]❌ File non trovato:[/red] {e}")
         raise typer.Exit(1)
@@ -112,6 +188,61 @@ def run(
             console.print("\n[dim]Traceback:[/dim]")
             console.print(traceback.format_exc())
         raise typer.Exit(1)
+    finally:
+        if profiler:
+            profiler.stop()
+            written = profiler.write(str(profile))
+            console.print(f"[dim]⏱  Profilo: {', '.join(map(str, written))}[/dim]")
+
+
+@app.command("compile")
+def compile_scripts(
+    path: Path = typer.Argument(..., help="File .ora o directory da compilare"),
+    force: bool = typer.Option(False, "--force", "-f",
+                               help="Ricompila anche gli artifact aggiornati"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignora la cache IR"),
+):
+    """
+    Compila file .ora in artifact .orac (IR validato)
+    
+    Esempio:
+        oratio compile examples/
+    """
+    if not path.exists():
+        console.print(f"[red]❌ File non trovato:[/red] {path}")
+        raise typer.Exit(1)
+    
+    files = sorted(path.rglob("*.ora")) if path.is_dir() else [path]
+    parser = None
+    compiled = skipped = failed = 0
+    
+    for file in files:
+        code = file.read_text()
+        target = artifact_path(file)
+        
+        if not force and load_ir(file, code, stored_fingerprint) is not None:
+            console.print(f"[dim]= {file} (aggiornato)[/dim]")
+            skipped += 1
+            continue
+        
+        try:
+            if parser is None:
+                parser = SemanticParser(use_cache=not no_cache)
+            ir = parser.parse(code)
+            write_artifact(target, code, ir, parser.fingerprint(code))
+        except Exception as e:
+            console.print(f"[red]❌ {file}:[/red] {e}")
+            failed += 1
+            continue
+        
+        console.print(f"[green]✅ {file} → {target.name}[/green] "
+                      f"[dim]({len(ir.get('operations', []))} operazioni)[/dim]")
+        compiled += 1
+    
+    console.print(f"\n[bold]Compilati:[/bold] {compiled}, aggiornati: {skipped}, "
+                  f"errori: {failed}")
+    if failed:
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -125,12 +256,12 @@ def repl():
     console.print(Panel.fit(
         "[bold cyan]🎤 ORATIO REPL[/bold cyan]\n"
         "[dim]Modalità interattiva - Parla e premi Invio[/dim]\n"
-        "[dim]Comandi: .exit (esci), .clear (pulisci), .help (aiuto)[/dim]",
+        "[dim]Comandi: .exit (esci), .clear (pulisci), .stats (cache), .help (aiuto)[/dim]",
         border_style="cyan"
     ))
     
     parser = SemanticParser()
-    runtime = Runtime()
+    runtime = Runtime(frame_cache=True, events=ConsoleRenderer())
     
     while True:
         try:
@@ -147,11 +278,15 @@ def repl():
             elif code.strip() == ".clear":
                 console.clear()
                 continue
+            elif code.strip() == ".stats":
+                _print_frame_stats(Runtime.frames.stats())
+                continue
             elif code.strip() == ".help":
                 console.print("""
 [bold]Comandi disponibili:[/bold]
   .exit   - Esci dal REPL
   .clear  - Pulisci schermo
+  .stats  - Statistiche della cache dei file letti
   .help   - Mostra questo aiuto
   
 [bold]Esempi:[/bold]
@@ -176,6 +311,7 @@ def repl():
 @app.command()
 def check(
     file: Path = typer.Argument(..., help="File .ora da controllare"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignora la cache IR"),
 ):
     """
     Controlla sintassi di un file .ora
@@ -193,14 +329,21 @@ def check(
         console.print(f"[bold]Controllo:[/bold] {file.name}")
         
         # Parse
-        parser = SemanticParser()
-        ir = parser.parse(code)
+        parser = SemanticParser(use_cache=not no_cache)
+        ir, stats = parser.parse_with_stats(code)
         
         # Validazioni
         ops_count = len(ir.get('operations', []))
         
         console.print(f"[green]✅ Sintassi valida[/green]")
         console.print(f"[dim]Operazioni: {ops_count}[/dim]")
+        if stats:
+            console.print(
+                f"[dim]Fast path: {stats['rules']}/{stats['statements']} frasi "
+                f"({stats['coverage']:.0%}), LLM: {stats['llm']}, cache: {stats['cache']}[/dim]"
+            )
+        if parser.cache is not None:
+            _print_cache_stats(parser.cache)
         
     except Exception as e:
         console.print(f"[red]❌ Errore di sintassi:[/red] {e}")
@@ -235,6 +378,36 @@ def examples():
     console.print(f"\n[dim]Esegui con: oratio run examples/nome.ora[/dim]")
 
 
+def _print_memory_report(report):
+    """Mostra il picco di memoria dell'ultima esecuzione"""
+    peak = format_bytes(report.get('peak_rss'))
+    if not report.get('peak_reset'):
+        peak += " (dall'avvio del processo)"
+    console.print(
+        f"[dim]🧠 Memoria: picco {peak}, avvio {format_bytes(report.get('start_rss'))}, "
+        f"{report.get('freed', 0)} variabili liberate[/dim]"
+    )
+
+
+def _print_cache_stats(cache):
+    """Mostra contatori della cache IR"""
+    stats = cache.stats()
+    console.print(
+        f"[dim]Cache IR: {stats['hits']} hit, {stats['misses']} miss, "
+        f"{stats['entries']} voci ({stats['bytes'] / 1024:.1f} KB)[/dim]"
+    )
+
+
+def _print_frame_stats(stats):
+    """Mostra contatori della cache dei file letti (Runtime.frames)"""
+    console.print(
+        f"[dim]Cache file: {stats['hits']} hit, {stats['misses']} miss "
+        f"({stats['hit_ratio']:.0%}), {stats['entries']} file, "
+        f"{format_bytes(stats['bytes'])} su {format_bytes(stats['max_bytes'])}, "
+        f"{stats['evictions']} rimossi[/dim]"
+    )
+
+
 def main():
     """Entry point"""
     app()
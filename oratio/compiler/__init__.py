@@ -3,5 +3,7 @@ Compiler - Semantic parsing e IR generation
 """
 
 from .parser import SemanticParser
+from .async_parser import AsyncSemanticParser
+from .cache import IRCache
 
-__all__ = ["SemanticParser"]
+__all__ = ["SemanticParser", "AsyncSemanticParser", "IRCache"]
@@ -0,0 +1,93 @@
+"""
+Artifact - IR compilato su disco (.orac)
+
+`oratio compile` salva accanto al sorgente l'IR validato insieme
+all'hash del sorgente normalizzato e all'impronta del modello che l'ha
+prodotto. `oratio run` usa l'artifact quando hash e impronta
+corrispondono: niente parsing, niente rilevamento lingua, niente rete.
+"""
+
+import os
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional
+
+from .cache import hash_text, normalize_source
+
+
+# Incrementare quando cambia il formato del file
+ARTIFACT_FORMAT = 1
+ARTIFACT_SUFFIX = ".orac"
+
+
+def artifact_path(source: Path) -> Path:
+    """Percorso dell'artifact di un sorgente (.ora -> .orac)"""
+    return Path(source).with_suffix(ARTIFACT_SUFFIX)
+
+
+def source_hash(code: str) -> str:
+    """Hash del sorgente normalizzato (la formattazione non conta)"""
+    return hash_text("source", normalize_source(code))
+
+
+def write_artifact(path: Path, code: str, ir: Dict[str, Any],
+                   fingerprint: Dict[str, str]) -> Path:
+    """Scrive l'artifact (atomicamente) e ne ritorna il percorso"""
+    from oratio import __version__
+
+    path = Path(path)
+    artifact = {
+        "format": ARTIFACT_FORMAT,
+        "oratio": __version__,
+        "source_hash": source_hash(code),
+        "fingerprint": fingerprint,
+        "ir": ir,
+    }
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def read_artifact(path: Path) -> Optional[Dict[str, Any]]:
+    """Legge un artifact; None se manca, è corrotto o di un altro formato"""
+    try:
+        artifact = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get("format") != ARTIFACT_FORMAT:
+        return None
+    if not isinstance(artifact.get("ir"), dict):
+        return None
+    return artifact
+
+
+def load_ir(source: Path, code: str,
+            expected: Optional[Callable[[Dict[str, str]], Optional[Dict[str, str]]]] = None
+            ) -> Optional[Dict[str, Any]]:
+    """
+    IR dell'artifact del sorgente, se aggiornato rispetto a `code`
+    
+    Con `expected` (es. parser.stored_fingerprint), che riceve
+    l'impronta salvata e ritorna quella attuale per la stessa lingua,
+    l'artifact vale solo se modello e system prompt non sono cambiati:
+    la lingua non viene rilevata di nuovo.
+    """
+    artifact = read_artifact(artifact_path(source))
+    if artifact is None or artifact.get("source_hash") != source_hash(code):
+        return None
+    if expected is not None:
+        stored = artifact.get("fingerprint")
+        if not isinstance(stored, dict) or expected(stored) != stored:
+            return None
+    return artifact["ir"]
@@ -0,0 +1,237 @@
+"""
+Async Semantic Parser - Parsing asincrono con client HTTP condiviso
+
+Pensato per il server API: il parsing non blocca l'event loop, le frasi
+da compilare vengono divise in gruppi inviati all'LLM in parallelo, e
+tutte le istanze condividono un pool di connessioni per event loop.
+"""
+
+import json
+import time
+import asyncio
+import weakref
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+from .parser import SemanticParser
+from .errors import ParseError
+from .languages import Language
+from .coalesce import AsyncSingleFlight
+from .latency import backoff_delay
+
+
+class LLMPool:
+    """Client asincrono con pool di connessioni e limite di richieste in volo"""
+
+    def __init__(self, api_key: str, base_url: Optional[str], max_concurrency: int,
+                 max_connections: int):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            )
+        )
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url,
+                                  http_client=self.http_client, max_retries=0)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def aclose(self):
+        await self.client.close()
+
+
+# Un insieme di pool per event loop: le connessioni httpx non si possono
+# condividere tra loop diversi
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+
+
+def get_llm_pool(api_key: str, base_url: Optional[str] = None, max_concurrency: int = 8,
+                 max_connections: int = 20) -> LLMPool:
+    """Pool condiviso per l'event loop corrente"""
+    pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    key = (api_key, base_url, max_concurrency, max_connections)
+    if key not in pools:
+        pools[key] = LLMPool(api_key, base_url, max_concurrency, max_connections)
+    return pools[key]
+
+
+async def close_llm_pools():
+    """Chiude i pool dell'event loop corrente (da chiamare allo shutdown)"""
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await pool.aclose()
+
+
+class AsyncSemanticParser(SemanticParser):
+    """
+    Variante asincrona di SemanticParser
+
+    Stessa pipeline (cache, fast path, frasi incrementali); le frasi da
+    compilare sono divise in gruppi di `chunk_size` e inviate in parallelo,
+    con al più `max_concurrency` richieste in volo per pool.
+    """
+
+    flight = AsyncSingleFlight()
+
+    def __init__(self, api_key: str = None, language: str = None, *,
+                 max_concurrency: int = 8, max_connections: int = 20,
+                 chunk_size: int = 4, **kwargs):
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.chunk_size = chunk_size
+        super().__init__(api_key=api_key, language=language, **kwargs)
+
+    def _create_client(self):
+        # Il client asincrono dipende dall'event loop: vedi get_llm_pool
+        return None
+
+    async def parse(self, code: str) -> Dict[str, Any]:
+        """
+        Converte codice naturale in Intermediate Representation
+
+        Vedi SemanticParser.parse.
+        """
+        return (await self.parse_with_stats(code))[0]
+
+    async def parse_with_stats(self, code: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Vedi SemanticParser.parse_with_stats"""
+        print(f"🔍 Parsing: {code[:50]}...")
+
+        try:
+            language, system_prompt, cache_key, ir = self._lookup(code)
+            if ir is not None:
+                return ir, None
+
+            return await self.flight.do(
+                self._flight_key(code, language, system_prompt),
+                lambda: self._parse_uncached(code, language, system_prompt, cache_key)
+            )
+
+        except Exception as e:
+            raise self._as_parse_error(e, code)
+
+    async def _parse_uncached(self, code: str, language: Language, system_prompt: str,
+                              cache_key: Optional[str]):
+        """Parsing con LLM (eseguito solo dal leader del single-flight)"""
+        deadline = time.monotonic() + self.deadline
+
+        if self._statement_mode():
+            plan = self._plan_statements(code, language, system_prompt)
+
+            for _ in range(2):
+                chunks = plan.chunks(self.chunk_size)
+                if not chunks:
+                    break
+                # Richieste costruite tutte prima di inviarle: ognuna
+                # si riferisce alle altre frasi pendenti con $stmt_N
+                requests = [plan.build_request(chunk, language.code) for chunk in chunks]
+                responses = await asyncio.gather(*(
+                    self._call_llm_async(system_prompt, request.prompt, max_retries=2,
+                                         deadline=deadline)
+                    for request in requests
+                ))
+                for request, response in zip(requests, responses):
+                    self._apply_statements(plan, request, response, language, system_prompt)
+
+            stats = plan.stats()
+            ir = self._assemble_statements(plan)
+        else:
+            prompt = self._build_prompt(code)
+            ir = await self._call_llm_async(system_prompt, prompt, max_retries=2,
+                                            deadline=deadline)
+            stats = None
+
+        return self._finish(ir, cache_key), stats
+
+    async def _call_llm_async(self, system_prompt: str, user_prompt: str,
+                              max_retries: int = 2,
+                              deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Chiama LLM con retry, rispettando deadline e limite di concorrenza"""
+        if deadline is None:
+            deadline = time.monotonic() + self.deadline
+        last_error = None
+        expired = False
+
+        for attempt in range(max_retries):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                expired = True
+                break
+            try:
+                return await self._hedged_attempt_async(
+                    system_prompt, user_prompt, min(self.attempt_timeout, remaining)
+                )
+
+            except Exception as e:
+                last_error = e
+                self.latency.count("failures")
+                if attempt < max_retries - 1:
+                    delay = backoff_delay(attempt)
+                    if time.monotonic() + delay >= deadline:
+                        expired = True
+                        break
+                    print(f"⚠️  Tentativo {attempt + 1} fallito, riprovo...")
+                    await asyncio.sleep(delay)
+
+        if expired:
+            self.latency.count("deadline_exceeded")
+            raise ParseError(f"LLM: deadline di {self.deadline:.0f}s superata "
+                             f"(ultimo errore: {last_error})")
+
+        raise ParseError(f"LLM fallito dopo {max_retries} tentativi: {last_error}")
+
+    async def _hedged_attempt_async(self, system_prompt: str, user_prompt: str,
+                                    timeout: float) -> Dict[str, Any]:
+        """Vedi SemanticParser._hedged_attempt; la richiesta perdente viene cancellata"""
+        hedge_after = self._hedge_after(timeout)
+        if hedge_after is None:
+            return await self._request_async(system_prompt, user_prompt, timeout)
+
+        first = asyncio.ensure_future(self._request_async(system_prompt, user_prompt, timeout))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return first.result()
+
+            self.latency.count("hedges")
+            second = asyncio.ensure_future(
+                self._request_async(system_prompt, user_prompt, timeout - hedge_after)
+            )
+            tasks.add(second)
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.latency.count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _request_async(self, system_prompt: str, user_prompt: str,
+                             timeout: float) -> Dict[str, Any]:
+        """Singola richiesta LLM (sotto il semaforo del pool), con misura della latenza"""
+        pool = get_llm_pool(self.api_key, self.base_url, self.max_concurrency,
+                            self.max_connections)
+        async with pool.semaphore:
+            start = time.perf_counter()
+            response = await pool.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.1,
+                response_format={"type": "json_object"},
+                timeout=timeout
+            )
+            ir = json.loads(response.choices[0].message.content)
+            self.latency.record(time.perf_counter() - start)
+        return ir
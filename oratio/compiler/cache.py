@@ -0,0 +1,190 @@
+"""
+IR Cache - Cache persistente su disco dell'IR generato
+
+Le voci sono indirizzate per contenuto: la chiave è l'hash SHA-256 di
+sorgente normalizzato, lingua, modello e system prompt. Cambiare uno
+qualsiasi di questi elementi produce una chiave diversa, quindi non serve
+alcuna invalidazione esplicita.
+"""
+
+import os
+import re
+import json
+import hashlib
+import unicodedata
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+# Incrementare quando cambia il formato delle voci su disco (o la
+# normalizzazione del sorgente)
+CACHE_FORMAT = 2
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "oratio" / "ir"
+
+
+# Testi tra virgolette (su una riga) o sequenze di spazi. Un apostrofo
+# dopo una lettera ("l'importo") non apre un testo
+_LITERAL_OR_SPACE = re.compile(r'"[^"\n]*"|“[^”\n]*”|(?<![^\W\d_])\'[^\'\n]*\'|\s+')
+
+
+def _normalize_line(line: str) -> str:
+    """Comprime gli spazi fuori dai testi tra virgolette"""
+    return _LITERAL_OR_SPACE.sub(
+        lambda m: " " if m.group().isspace() else m.group(), line
+    ).strip()
+
+
+def normalize_source(code: str) -> str:
+    """
+    Normalizza il sorgente per il calcolo della chiave
+
+    Uniforma unicode e fine riga, comprime gli spazi fuori dai testi tra
+    virgolette e scarta le righe vuote: modifiche solo di formattazione
+    non invalidano la cache, mentre "a  b" e "a b" restano programmi
+    diversi.
+    """
+    code = unicodedata.normalize("NFC", code).replace("\r\n", "\n")
+    lines = (_normalize_line(line) for line in code.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def hash_text(*parts: str) -> str:
+    """SHA-256 esadecimale di una sequenza di stringhe"""
+    payload = json.dumps([CACHE_FORMAT, *parts], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IRCache:
+    """
+    Cache LRU su disco, limitata per numero di voci e dimensione totale
+
+    L'ordine LRU usa il mtime dei file: ogni hit aggiorna il mtime, e
+    l'eviction rimuove i file meno recenti. Più processi possono
+    condividere la stessa directory.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 1000,
+                 max_bytes: int = 50 * 1024 * 1024):
+        self.directory = Path(
+            directory or os.getenv("ORATIO_CACHE_DIR") or DEFAULT_CACHE_DIR
+        )
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # Contatori
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(code: str, language: str, model: str, system_prompt: str,
+            kind: str = "program") -> str:
+        """
+        Calcola chiave content-addressed
+
+        `kind` separa i namespace (programma intero, singola frase, ...).
+        """
+        return hash_text(kind, normalize_source(code), language, model, system_prompt)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Ritorna IR in cache o None"""
+        path = self._path(key)
+        try:
+            ir = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError):
+            # Voce corrotta: trattala come miss
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # Aggiorna posizione LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return ir
+
+    def put(self, key: str, ir: Dict[str, Any]):
+        """Salva IR in cache (scrittura atomica)"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(ir, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(Path(tmp_path))
+            return
+
+        self._evict()
+
+    def clear(self):
+        """Svuota la cache"""
+        for path in self._entries():
+            self._remove(path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contatori e occupazione corrente"""
+        entries = list(self._entries())
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(self._size(p) for p in entries),
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entries(self):
+        if not self.directory.exists():
+            return []
+        return self.directory.glob("*/*.json")
+
+    def _evict(self):
+        """Rimuove le voci meno usate finché la cache rientra nei limiti"""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        entries.sort(key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+
+        for _, size, path in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._remove(path)
+            self.evictions += 1
+            count -= 1
+            total -= size
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,115 @@
+"""
+Request Coalescing - Deduplica dei parse concorrenti identici
+
+Se più chiamate a parse() con la stessa chiave arrivano mentre la prima
+è ancora in corso, solo la prima ("leader") interroga l'LLM; le altre
+aspettano e ricevono una copia dello stesso risultato (o dello stesso
+errore). Se ci sono follower anche il leader riceve una copia: nessun
+chiamante può modificare l'oggetto che gli altri stanno copiando.
+"""
+
+import copy
+import asyncio
+import threading
+import weakref
+from typing import Any, Callable, Awaitable, Dict
+
+
+class _Call:
+    """Chiamata in volo (versione thread)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Single-flight per chiamate sincrone da più thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Esegue fn, o aspetta l'esecuzione già in corso per key"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                call.followers += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                followers = call.followers  # dopo del nessuno si aggiunge più
+            call.done.set()
+        return copy.deepcopy(call.result) if followers else call.result
+
+    def stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced,
+                "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """Single-flight per coroutine (un insieme di chiamate per event loop)"""
+
+    def __init__(self):
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = \
+            weakref.WeakKeyDictionary()
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Esegue fn(), o aspetta l'esecuzione già in corso per key"""
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+
+        future = calls.get(key)
+        if future is not None:
+            future.followers += 1
+            self.coalesced += 1
+            # shield: se questo chiamante viene cancellato, il leader no
+            result = await asyncio.shield(future)
+            return copy.deepcopy(result)
+
+        future = calls[key] = loop.create_future()
+        future.followers = 0
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita il warning "exception was never retrieved" senza follower
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return copy.deepcopy(result) if future.followers else result
+        finally:
+            calls.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced,
+                "in_flight": sum(len(calls) for calls in self._calls.values())}
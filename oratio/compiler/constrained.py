@@ -0,0 +1,162 @@
+"""
+Constrained Decoding - Generazione JSON vincolata allo schema IR
+
+Usato da LocalGPUParser durante model.generate:
+
+- il primo token deve aprire l'oggetto con "{" (niente preamboli);
+- il valore di "type" deve essere un'operazione registrata nel runtime;
+- il valore di "output" deve avere la forma $var_N;
+- la generazione si ferma appena l'oggetto di primo livello si chiude.
+
+Lo stato di ogni riga del batch è un OperationScanner (streaming.py)
+alimentato con il testo dei token generati.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, Iterable, Optional, Tuple
+
+import torch
+from transformers import LogitsProcessor, StoppingCriteria
+
+from .streaming import OperationScanner
+
+
+# Prefissi validi di "$var_N" (senza virgolette di chiusura)
+_VAR_PREFIX = re.compile(r'(\$(v(a(r(_\d*)?)?)?)?)?')
+_VAR_CLOSED = re.compile(r'\$var_\d+"')
+
+
+class TokenTable:
+    """
+    Testo dei token del vocabolario, con ricerca per prefisso
+
+    Da costruire una volta per tokenizer: le maschere calcolate restano
+    in cache per (campo, valore parziale).
+    """
+
+    def __init__(self, tokenizer, vocab_size: int):
+        count = min(len(tokenizer), vocab_size)
+        texts = tokenizer.batch_decode([[i] for i in range(count)])
+        special = set(tokenizer.all_special_ids)
+        self.texts = [("" if i in special else t) for i, t in enumerate(texts)]
+        self.texts += [""] * (vocab_size - count)
+        self.vocab_size = vocab_size
+
+        self._by_text: Dict[str, List[int]] = {}
+        for i, text in enumerate(self.texts):
+            if text:
+                self._by_text.setdefault(text, []).append(i)
+        self._sorted = sorted(self._by_text)
+        self._masks: Dict[Tuple, torch.Tensor] = {}
+
+        # Prima dell'oggetto: solo token che lo aprono (eventualmente dopo spazi)
+        self.start_mask = self._mask(
+            i for i, t in enumerate(self.texts) if t.lstrip().startswith('{')
+        )
+
+    def choices_mask(self, partial: str, choices: Iterable[str]) -> torch.Tensor:
+        """Token che proseguono `partial` verso una delle stringhe `choices` (chiuse da ")"""
+        key = ("choices", partial, tuple(choices))
+        if key not in self._masks:
+            rest = [c[len(partial):] + '"' for c in key[2] if c.startswith(partial)]
+            allowed = set()
+            for r in rest:
+                # Token contenuti nella parte mancante...
+                for n in range(1, len(r) + 1):
+                    allowed.update(self._by_text.get(r[:n], ()))
+                # ...o che la completano e proseguono oltre le virgolette
+                allowed.update(self._with_prefix(r))
+            self._masks[key] = self._mask(allowed)
+        return self._masks[key]
+
+    def var_mask(self, partial: str) -> torch.Tensor:
+        """Token che proseguono `partial` verso $var_N"""
+        # Conta solo se ci sono già cifre, non quali
+        shape = re.sub(r'\d+', '0', partial)
+        key = ("var", shape)
+        if key not in self._masks:
+            allowed = []
+            for i, text in enumerate(self.texts):
+                full = shape + text
+                if text and (_VAR_PREFIX.fullmatch(full) or _VAR_CLOSED.match(full)):
+                    allowed.append(i)
+            self._masks[key] = self._mask(allowed)
+        return self._masks[key]
+
+    def _with_prefix(self, prefix: str) -> List[int]:
+        ids = []
+        index = bisect_left(self._sorted, prefix)
+        while index < len(self._sorted) and self._sorted[index].startswith(prefix):
+            ids.extend(self._by_text[self._sorted[index]])
+            index += 1
+        return ids
+
+    def _mask(self, ids: Iterable[int]) -> torch.Tensor:
+        mask = torch.zeros(self.vocab_size, dtype=torch.bool)
+        mask[list(ids)] = True
+        return mask
+
+
+class DecodingState:
+    """Scanner per ogni riga del batch, sincronizzati con input_ids"""
+
+    def __init__(self, table: TokenTable, prompt_length: int, batch_size: int):
+        self.table = table
+        self.prompt_length = prompt_length
+        self.scanners = [OperationScanner(collect=False) for _ in range(batch_size)]
+        self._consumed = [0] * batch_size
+
+    def sync(self, input_ids: torch.Tensor) -> List[OperationScanner]:
+        for row, scanner in enumerate(self.scanners):
+            if scanner.complete:
+                continue
+            start = self.prompt_length + self._consumed[row]
+            new = input_ids[row, start:].tolist()
+            if new:
+                scanner.feed("".join(self.table.texts[i] if i < len(self.table.texts) else ""
+                                     for i in new))
+                self._consumed[row] += len(new)
+        return self.scanners
+
+
+class IRLogitsProcessor(LogitsProcessor):
+    """Maschera i token che violerebbero lo schema IR"""
+
+    def __init__(self, state: DecodingState, op_types: Iterable[str]):
+        self.state = state
+        self.op_types = tuple(sorted(op_types))
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        table = self.state.table
+        for row, scanner in enumerate(self.state.sync(input_ids)):
+            if scanner.complete:
+                continue
+            mask = self._row_mask(table, scanner)
+            if mask is None or not mask.any():
+                continue
+            mask = mask[:scores.shape[-1]].to(scores.device)
+            scores[row] = scores[row].masked_fill(~mask, float("-inf"))
+        return scores
+
+    def _row_mask(self, table: TokenTable, scanner: OperationScanner) -> Optional[torch.Tensor]:
+        if not scanner.started:
+            return table.start_mask
+        key = scanner.open_value_key
+        if key == "type":
+            return table.choices_mask(scanner.open_value, self.op_types)
+        if key == "output":
+            return table.var_mask(scanner.open_value)
+        return None
+
+
+class JSONObjectStop(StoppingCriteria):
+    """Ferma ogni riga quando l'oggetto JSON di primo livello si chiude"""
+
+    def __init__(self, state: DecodingState):
+        self.state = state
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs):
+        scanners = self.state.sync(input_ids)
+        return torch.tensor([s.complete for s in scanners], dtype=torch.bool,
+                            device=input_ids.device)
@@ -0,0 +1,470 @@
+"""
+Incremental Parsing - Parsing frase per frase con memoizzazione
+
+Il programma viene diviso in frasi; l'IR di ogni frase è salvato in cache
+come frammento indipendente dalla posizione. Al parsing successivo solo le
+frasi nuove o modificate vengono inviate all'LLM, poi i frammenti vengono
+ricuciti e le variabili rinumerate.
+
+Formato frammento:
+    {
+      "imports": [[digest, k, distance], ...],  # variabili di frasi precedenti
+      "outputs": m,                    # variabili prodotte dalla frase
+      "operations": [...]
+    }
+
+Nelle operazioni di un frammento `$var_i` indica l'import i-esimo se
+i < len(imports), altrimenti l'output (i - len(imports))-esimo della frase.
+Un import (digest, k, distance) si risolve nel k-esimo output della frase
+precedente più vicina con lo stesso digest; se quella frase non esiste più
+(è stata modificata) si usa la frase che si trova `distance` posizioni
+prima. Così modificare una frase non costringe a ricompilare quelle che
+ne usano il risultato.
+
+L'import simbolico (FRAME_IMPORT, 0, 0) indica invece l'ultimo DataFrame
+prodotto prima della frase; lo usa il fast path a regole (vedi rules.py).
+Con k = -1 l'import indica l'ultimo output della frase sorgente: serve per
+`$stmt_N`, il riferimento a una frase compilata in un'altra richiesta.
+
+Gli altri `$var_i` di un frammento (variabili locali della frase, non
+contate negli output) diventano `$stmt_N_var_i` nell'IR ricucito.
+"""
+
+import re
+import copy
+from typing import Dict, Any, List, Optional, Callable
+
+from .cache import normalize_source, hash_text
+from .errors import ParseError
+
+
+# Riferimento a variabile dentro qualsiasi stringa dell'IR
+VAR_PATTERN = re.compile(r'\$[A-Za-z_]\w*')
+
+_GLOBAL_VAR = re.compile(r'\$var_(\d+)')
+
+# Risultato (ultimo output) della frase N, anche se non ancora compilata
+_STATEMENT_REF = re.compile(r'\$stmt_(\d+)')
+
+# Import simbolico: ultimo DataFrame prodotto dalle frasi precedenti
+FRAME_IMPORT = "@frame"
+
+# Operazioni il cui output è un DataFrame
+FRAME_OPS = {
+    'io.read_csv', 'io.read_parquet', 'io.read_arrow',
+    'data.filter', 'data.sort', 'data.head', 'data.tail',
+    'data.sample', 'data.drop', 'data.rename', 'data.fillna', 'data.dropna',
+}
+
+# Fine frase: . ! ? seguiti da spazio o fine testo
+_SENTENCE_END = re.compile(r'[.!?](?=\s|$)')
+_QUOTES = {'"': '"', "'": "'", '“': '”', '«': '»'}
+
+
+def split_statements(code: str) -> List[str]:
+    """
+    Divide il programma in frasi
+
+    Ogni riga non vuota è divisa sui segni di fine frase che non stanno
+    dentro virgolette (il punto di "vendite.csv" non separa nulla). Le
+    righe di commento (#) vengono ignorate.
+    """
+    statements = []
+    for line in code.splitlines():
+        if line.lstrip().startswith('#'):
+            continue
+        start = 0
+        closing = None
+        for i, char in enumerate(line):
+            if closing:
+                if char == closing:
+                    closing = None
+            elif char in _QUOTES and (char != "'" or i == 0 or not line[i - 1].isalnum()):
+                # L'apostrofo dentro una parola (dell'importo) non apre citazioni
+                closing = _QUOTES[char]
+            elif _SENTENCE_END.match(line, i):
+                statements.append(line[start:i + 1])
+                start = i + 1
+        statements.append(line[start:])
+
+    return [s.strip() for s in statements if s.strip().rstrip('.!?').strip()]
+
+
+def statement_digest(text: str) -> str:
+    """Identità di una frase, usata per risolvere gli import"""
+    return hash_text("statement", normalize_source(text))[:16]
+
+
+def rename_vars(obj: Any, mapping: Callable[[str], str]) -> Any:
+    """Copia profonda di obj con i riferimenti a variabile rinominati"""
+    if isinstance(obj, str):
+        return VAR_PATTERN.sub(lambda m: mapping(m.group(0)), obj)
+    if isinstance(obj, dict):
+        return {key: rename_vars(value, mapping) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [rename_vars(value, mapping) for value in obj]
+    return copy.deepcopy(obj)
+
+
+def find_vars(obj: Any) -> List[str]:
+    """Riferimenti a variabile in obj, in ordine di apparizione"""
+    found = []
+    if isinstance(obj, str):
+        found.extend(VAR_PATTERN.findall(obj))
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            found.extend(find_vars(value))
+    elif isinstance(obj, list):
+        for value in obj:
+            found.extend(find_vars(value))
+    return found
+
+
+class StatementSlot:
+    """Una frase del programma e il suo frammento IR (se noto)"""
+
+    def __init__(self, index: int, text: str):
+        self.index = index
+        self.text = text
+        self.digest = statement_digest(text)
+        self.fragment: Optional[Dict[str, Any]] = None
+        # Provenienza del frammento: 'rules', 'cache' o 'llm'
+        self.source: Optional[str] = None
+        # Nomi globali degli output, assegnati durante il planning
+        self.outputs: List[str] = []
+
+    @property
+    def resolved(self) -> bool:
+        return self.fragment is not None
+
+
+class StatementRequest:
+    """
+    Una richiesta all'LLM per un gruppo di frasi
+
+    Conserva i nomi di variabile mostrati nel prompt, così la risposta si
+    interpreta correttamente anche se nel frattempo altre richieste hanno
+    risolto altre frasi (e i nomi globali sono cambiati).
+    """
+
+    def __init__(self, slots: List[StatementSlot], prompt: str, owners: Dict[str, Any]):
+        self.slots = slots
+        self.prompt = prompt
+        self.owners = owners
+
+
+class StatementPlan:
+    """
+    Piano di parsing incrementale di un programma
+
+    Uso tipico:
+        plan = StatementPlan(split_statements(code))
+        plan.resolve(lookup, 'cache')
+        request = plan.build_request(plan.pending)
+        plan.apply_response(request, llm_json)
+        ir = plan.assemble()
+    """
+
+    def __init__(self, statements: List[str]):
+        self.slots = [StatementSlot(i, text) for i, text in enumerate(statements)]
+
+    @property
+    def pending(self) -> List[StatementSlot]:
+        return [slot for slot in self.slots if not slot.resolved]
+
+    def resolve(self, lookup: Callable[[StatementSlot], Optional[Dict[str, Any]]],
+                source: str):
+        """
+        Risolve le frasi pendenti con `lookup` (cache, regole, ...)
+
+        Un frammento è usato solo se tutti i suoi import puntano a una frase
+        precedente; se quella frase è da ricompilare il controllo definitivo
+        avviene in `apply_response`.
+        """
+        for slot in self.pending:
+            fragment = lookup(slot)
+            if fragment is not None and self._imports_resolvable(slot, fragment, strict=False):
+                slot.fragment = fragment
+                slot.source = source
+        self._number_outputs()
+
+    def stats(self) -> Dict[str, Any]:
+        """Quante frasi sono state risolte da ciascuna sorgente"""
+        total = len(self.slots)
+        counts = {'rules': 0, 'cache': 0, 'llm': 0}
+        for slot in self.slots:
+            if slot.source in counts:
+                counts[slot.source] += 1
+        return {
+            'statements': total,
+            **counts,
+            'coverage': counts['rules'] / total if total else 0.0,
+        }
+
+    def chunks(self, size: int) -> List[List[StatementSlot]]:
+        """Frasi pendenti in gruppi consecutivi di al più `size` frasi"""
+        pending = self.pending
+        size = max(1, size)
+        return [pending[i:i + size] for i in range(0, len(pending), size)]
+
+    def build_request(self, slots: List[StatementSlot], language: str = "it") -> StatementRequest:
+        """
+        Prompt con il contesto del programma e le frasi da compilare
+
+        Le frasi pendenti che non fanno parte della richiesta vengono
+        mostrate come `$stmt_N`, così le richieste sono indipendenti e
+        possono partire in parallelo.
+        """
+        todo = {slot.index for slot in slots}
+        next_var = sum(len(slot.outputs) for slot in self.slots)
+        owners = {}
+        elsewhere = False
+
+        lines = []
+        for slot in self.slots:
+            number = slot.index + 1
+            if slot.index in todo:
+                lines.append(f"[{number}] {slot.text}  => TODO")
+            elif slot.resolved:
+                summary = ", ".join(
+                    op.get('type', '?') + (f" -> {name}" if name else "")
+                    for op, name in self._named_operations(slot)
+                )
+                lines.append(f"[{number}] {slot.text}  => {summary or '-'}")
+                for k, name in enumerate(slot.outputs):
+                    owners[name] = (slot, k)
+            else:
+                lines.append(f"[{number}] {slot.text}  => $stmt_{number}")
+                elsewhere = True
+
+        program = "\n".join(lines)
+        indexes = ", ".join(str(slot.index + 1) for slot in slots)
+
+        if language == "en":
+            stmt_hint = ("\nUse $stmt_N for the result of a sentence shown as $stmt_N."
+                         if elsewhere else "")
+            prompt = f"""Program (numbered sentences, already compiled ones show their operations):
+
+{program}
+
+Compile ONLY sentences {indexes}.
+Use the variables shown to refer to results of already compiled sentences.{stmt_hint}
+Number new variables starting from $var_{next_var}.
+
+Reply with valid JSON: {{"statements": [{{"index": N, "operations": [...]}}]}}"""
+        else:
+            stmt_hint = ("\nUsa $stmt_N per il risultato di una frase indicata come $stmt_N."
+                         if elsewhere else "")
+            prompt = f"""Programma (frasi numerate, quelle già compilate mostrano le operazioni):
+
+{program}
+
+Compila SOLO le frasi {indexes}.
+Usa le variabili indicate per riferirti ai risultati delle frasi già compilate.{stmt_hint}
+Numera le nuove variabili a partire da $var_{next_var}.
+
+Rispondi con JSON valido: {{"statements": [{{"index": N, "operations": [...]}}]}}"""
+
+        return StatementRequest(slots, prompt, owners)
+
+    def apply_response(self, request: StatementRequest,
+                       response: Dict[str, Any]) -> List[StatementSlot]:
+        """
+        Converte la risposta dell'LLM in frammenti
+
+        Returns:
+            Le frasi compilate (da salvare in cache)
+        """
+        slots = request.slots
+        statements = response.get('statements')
+        if statements is None and len(slots) == 1 and 'operations' in response:
+            # Una sola frase: l'LLM può aver risposto con un IR normale
+            statements = [{"index": slots[0].index + 1, "operations": response['operations']}]
+
+        by_index = {}
+        for entry in statements or []:
+            if isinstance(entry, dict) and isinstance(entry.get('operations'), list):
+                try:
+                    by_index[int(entry.get('index')) - 1] = entry['operations']
+                except (TypeError, ValueError):
+                    continue
+
+        missing = [slot.index + 1 for slot in slots if slot.index not in by_index]
+        if missing:
+            raise ParseError(f"Risposta LLM senza le frasi: {missing}")
+
+        # Variabili -> (frase, k): quelle mostrate nel prompt e le nuove
+        owners = dict(request.owners)
+        for slot in slots:
+            operations = by_index[slot.index]
+            outputs = [op['output'] for op in operations
+                       if isinstance(op, dict) and op.get('output')]
+            for k, name in enumerate(outputs):
+                owners[name] = (slot, k)
+
+        for slot in slots:
+            slot.fragment = self._to_fragment(slot, by_index[slot.index], owners)
+            slot.source = 'llm'
+
+        # Frammenti i cui import non trovano più l'output atteso (es. la
+        # frase sorgente ora non produce variabili) tornano pendenti
+        for slot in self.slots:
+            if slot.source != 'llm' and slot.resolved \
+                    and not self._imports_resolvable(slot, slot.fragment):
+                slot.fragment = None
+                slot.source = None
+
+        self._number_outputs()
+        return slots
+
+    def assemble(self) -> Dict[str, Any]:
+        """Ricuce i frammenti in un unico IR con variabili e id rinumerati"""
+        if self.pending:
+            raise ParseError(f"Frasi non compilate: {[s.index + 1 for s in self.pending]}")
+
+        operations = []
+        for slot in self.slots:
+            for op, _ in self._named_operations(slot):
+                operations.append(op)
+
+        for i, op in enumerate(operations):
+            op['id'] = f"op_{i + 1}"
+
+        return {"version": "1.0", "operations": operations}
+
+    # === Interni ===
+
+    def _resolve_import(self, slot: StatementSlot, entry: List[Any]):
+        """
+        Risolve un import nella coppia (frase sorgente, indice output)
+
+        La frase sorgente può essere ancora pendente; (None, 0) se l'import
+        non punta a nessuna frase.
+        """
+        digest, k, distance = entry
+
+        if digest == FRAME_IMPORT:
+            for other in reversed(self.slots[:slot.index]):
+                if not other.resolved:
+                    # Non si sa ancora cosa produce
+                    return other, 0
+                frame = _last_frame_output(other.fragment)
+                if frame is not None:
+                    return other, frame
+            return None, 0
+
+        source = None
+        for other in reversed(self.slots[:slot.index]):
+            if other.digest == digest:
+                source = other
+                break
+        if source is None and 0 < distance <= slot.index:
+            source = self.slots[slot.index - distance]
+        if source is None:
+            return None, 0
+        if k == -1 and source.resolved:
+            k = source.fragment.get('outputs', 0) - 1
+        return source, k
+
+    def _imports_resolvable(self, slot: StatementSlot, fragment: Dict[str, Any],
+                            strict: bool = True) -> bool:
+        for entry in fragment.get('imports', []):
+            source, k = self._resolve_import(slot, entry)
+            if source is None:
+                return False
+            if not source.resolved:
+                if strict:
+                    return False
+                continue
+            if not 0 <= k < source.fragment.get('outputs', 0):
+                return False
+        return True
+
+    def _number_outputs(self):
+        """Assegna nomi globali $var_N agli output delle frasi risolte"""
+        counter = 0
+        for slot in self.slots:
+            slot.outputs = []
+            if slot.resolved:
+                for _ in range(slot.fragment.get('outputs', 0)):
+                    slot.outputs.append(f"$var_{counter}")
+                    counter += 1
+
+    def _named_operations(self, slot: StatementSlot):
+        """Operazioni del frammento tradotte nei nomi globali"""
+        fragment = slot.fragment
+        imports = fragment.get('imports', [])
+        local_names = []
+        for entry in imports:
+            source, k = self._resolve_import(slot, entry)
+            if source is not None and 0 <= k < len(source.outputs):
+                local_names.append(source.outputs[k])
+            else:
+                # Sorgente ancora da compilare
+                local_names.append(f"$stmt_{source.index + 1 if source else '?'}")
+        local_names.extend(slot.outputs)
+
+        def mapping(name):
+            match = _GLOBAL_VAR.fullmatch(name)
+            if not match:
+                return name
+            if int(match.group(1)) < len(local_names):
+                return local_names[int(match.group(1))]
+            # Variabile locale della frase (né import né output): nome
+            # proprio della frase, così non si scontra con quelle di altre
+            return f"$stmt_{slot.index + 1}_var_{match.group(1)}"
+
+        for op in fragment.get('operations', []):
+            renamed = rename_vars(op, mapping)
+            yield renamed, renamed.get('output')
+
+    def _to_fragment(self, slot: StatementSlot, operations: List[Dict[str, Any]],
+                     owners: Dict[str, Any]) -> Dict[str, Any]:
+        """Traduce operazioni con nomi globali in un frammento posizionale"""
+        own = [op['output'] for op in operations if isinstance(op, dict) and op.get('output')]
+        imports = []
+        import_index = {}
+
+        for name in find_vars(operations):
+            if name in own or name in import_index:
+                continue
+            owner = owners.get(name)
+            statement_ref = _STATEMENT_REF.fullmatch(name)
+            if owner is None and statement_ref:
+                number = int(statement_ref.group(1))
+                if 0 < number <= len(self.slots):
+                    owner = (self.slots[number - 1], -1)
+            if owner is None or owner[0].index >= slot.index:
+                if _GLOBAL_VAR.fullmatch(name):
+                    raise ParseError(
+                        f"Variabile non definita: {name} nella frase {slot.index + 1}"
+                    )
+                # Non è una variabile IR (es. "$USD" in un messaggio)
+                continue
+            import_index[name] = len(imports)
+            imports.append([owner[0].digest, owner[1], slot.index - owner[0].index])
+
+        local = dict(import_index)
+        for k, name in enumerate(own):
+            local[name] = len(imports) + k
+
+        def mapping(name):
+            if name in local:
+                return f"$var_{local[name]}"
+            return name
+
+        return {
+            "imports": imports,
+            "outputs": len(own),
+            "operations": [rename_vars(op, mapping) for op in operations],
+        }
+
+
+def _last_frame_output(fragment: Dict[str, Any]) -> Optional[int]:
+    """Indice dell'ultimo output DataFrame di un frammento"""
+    outputs = [op for op in fragment.get('operations', [])
+               if isinstance(op, dict) and op.get('output')]
+    for k in range(len(outputs) - 1, -1, -1):
+        if outputs[k].get('type') in FRAME_OPS:
+            return k
+    return None
@@ -2,16 +2,33 @@
 Language Support - Supporto multilingua
 """
 
-from typing import Dict
+from typing import Dict, List, Tuple
+from collections import OrderedDict
+import hashlib
 import re
 
 
+# Parole: sequenze di lettere (anche accentate)
+_WORD = re.compile(r"[^\W\d_]+")
+
+# Le parole chiave lunghe almeno così valgono anche come radice
+# ("filtra" -> "filtrate"); quelle più corte solo come parola intera
+# (così "il" non conta dentro "file")
+STEM_MIN_LENGTH = 4
+
+
+def tokenize(code: str) -> List[str]:
+    """Parole del codice, in minuscolo"""
+    return _WORD.findall(code.lower())
+
+
 class Language:
     """Base class per supporto lingua"""
     
     def __init__(self, code: str, name: str):
         self.code = code  # 'it', 'en', etc
         self.name = name  # 'Italiano', 'English', etc
+        self._index = None  # KeywordIndex della sola lingua (vedi detect)
     
     def get_system_prompt(self) -> str:
         """System prompt per LLM in questa lingua"""
@@ -25,21 +42,17 @@ class Language:
         """
         Rileva probabilità che il codice sia in questa lingua
         
+        L'indice delle parole chiave si costruisce alla prima chiamata;
+        per confrontare più lingue usare LanguageDetector.
+        
         Returns:
             Score 0-1 (1 = molto probabile)
         """
-        keywords = self.get_keywords()
-        code_lower = code.lower()
-        
-        score = 0.0
-        total_keywords = sum(len(words) for words in keywords.values())
-        
-        for category, words in keywords.items():
-            for word in words:
-                if word in code_lower:
-                    score += 1.0 / total_keywords
-        
-        return min(score, 1.0)
+        if self._index is None:
+            index = KeywordIndex()
+            index.add(self)
+            self._index = index
+        return self._index.score(code).get(self.code, 0.0)
 
 
 class ItalianLanguage(Language):
@@ -58,13 +71,23 @@ OPERAZIONI SUPPORTATE:
 I/O:
 - io.read_csv: Carica file CSV
 - io.write_csv: Salva file CSV  
+- io.read_parquet: Carica file Parquet (params: file_path, columns opzionale)
+- io.write_parquet: Salva file Parquet
+- io.read_arrow: Carica file Arrow/Feather (params: file_path, columns opzionale)
+- io.write_arrow: Salva file Arrow/Feather
 - io.print: Stampa output
 
 Data:
 - data.show: Mostra dati
 - data.head: Prime N righe
-- data.filter: Filtra righe
+- data.filter: Filtra righe (condition: "importo > 100 e regione in (Nord, Sud)"; anche oppure, non, tra X e Y, è nullo, contiene)
 - data.sort: Ordina dati
+- data.unique: Valori distinti di una colonna (column), come tabella
+- data.value_counts: Occorrenze di ogni valore (column)
+- data.drop: Elimina colonne (columns)
+- data.rename: Rinomina colonne (columns: {"vecchio": "nuovo"})
+- data.fillna: Riempie valori mancanti (value, column opzionale)
+- data.dropna: Elimina righe con valori mancanti (column opzionale)
 
 Math:
 - math.mean: Media
@@ -72,6 +95,12 @@ Math:
 - math.count: Conteggio
 - math.min: Minimo
 - math.max: Massimo
+- math.std: Deviazione standard
+- math.var: Varianza
+
+String:
+- string.upper: Maiuscolo (column opzionale)
+- string.lower: Minuscolo (column opzionale)
 
 Viz:
 - viz.plot: Grafico linee
@@ -123,13 +152,23 @@ SUPPORTED OPERATIONS:
 I/O:
 - io.read_csv: Load CSV file
 - io.write_csv: Save CSV file
+- io.read_parquet: Load Parquet file (params: file_path, optional columns)
+- io.write_parquet: Save Parquet file
+- io.read_arrow: Load Arrow/Feather file (params: file_path, optional columns)
+- io.write_arrow: Save Arrow/Feather file
 - io.print: Print output
 
 Data:
 - data.show: Show data
 - data.head: First N rows
-- data.filter: Filter rows
+- data.filter: Filter rows (condition: "importo > 100 and region in (North, South)"; also or, not, between X and Y, is null, contains)
 - data.sort: Sort data
+- data.unique: Distinct values of a column (column), as a table
+- data.value_counts: Occurrences of each value (column)
+- data.drop: Drop columns (columns)
+- data.rename: Rename columns (columns: {"old": "new"})
+- data.fillna: Fill missing values (value, optional column)
+- data.dropna: Drop rows with missing values (optional column)
 
 Math:
 - math.mean: Average
@@ -137,6 +176,12 @@ Math:
 - math.count: Count
 - math.min: Minimum
 - math.max: Maximum
+- math.std: Standard deviation
+- math.var: Variance
+
+String:
+- string.upper: Uppercase (optional column)
+- string.lower: Lowercase (optional column)
 
 Viz:
 - viz.plot: Line chart
@@ -172,14 +217,67 @@ Reply ONLY with valid JSON."""
         }
 
 
+class KeywordIndex:
+    """
+    Indice parola chiave -> lingue, per tutte le lingue registrate
+    
+    Il punteggio di tutte le lingue si calcola con un solo passaggio sulle
+    parole del codice: ogni parola costa un lookup per la parola intera e
+    uno per ciascuna delle sue radici, indipendentemente da quante lingue
+    sono registrate.
+    """
+    
+    def __init__(self):
+        self._words: Dict[str, List[Tuple[str, float]]] = {}  # parola intera
+        self._stems: Dict[str, List[Tuple[str, float]]] = {}  # radice
+    
+    def add(self, language: Language):
+        """Indicizza le parole chiave della lingua"""
+        words = {w.lower() for group in language.get_keywords().values() for w in group}
+        weight = 1.0 / len(words) if words else 0.0
+        for word in words:
+            self._words.setdefault(word, []).append((language.code, weight))
+            if len(word) >= STEM_MIN_LENGTH:
+                self._stems.setdefault(word, []).append((language.code, weight))
+    
+    def score(self, code: str) -> Dict[str, float]:
+        """Punteggio 0-1 per lingua (ogni parola chiave conta una volta)"""
+        matched = set()
+        for token in set(tokenize(code)):
+            for entry in self._words.get(token, ()):
+                matched.add((token, entry))
+            for end in range(STEM_MIN_LENGTH, len(token)):
+                stem = token[:end]
+                for entry in self._stems.get(stem, ()):
+                    matched.add((stem, entry))
+        
+        scores: Dict[str, float] = {}
+        for _, (lang_code, weight) in matched:
+            scores[lang_code] = scores.get(lang_code, 0.0) + weight
+        return {lang: min(score, 1.0) for lang, score in scores.items()}
+
+
 class LanguageDetector:
     """Rileva automaticamente la lingua del codice"""
     
-    def __init__(self):
-        self.languages = {
-            'it': ItalianLanguage(),
-            'en': EnglishLanguage()
-        }
+    def __init__(self, cache_size: int = 1024):
+        self.languages: Dict[str, Language] = {}
+        self.index = KeywordIndex()
+        
+        # hash del codice -> (lingua, score)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+        self.add_language(ItalianLanguage())
+        self.add_language(EnglishLanguage())
+    
+    def add_language(self, language: Language):
+        """Registra una lingua (il costo della rilevazione non cresce con le lingue)"""
+        self.languages[language.code] = language
+        self.index.add(language)
+        self._cache.clear()
     
     def detect(self, code: str) -> Language:
         """
@@ -188,14 +286,23 @@ class LanguageDetector:
         Returns:
             Language object della lingua rilevata
         """
-        scores = {}
-        for lang_code, language in self.languages.items():
-            scores[lang_code] = language.detect(code)
-        
-        # Lingua con score più alto
-        best_lang = max(scores, key=scores.get)
+        key = hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            best_lang, score = cached
+        else:
+            self.misses += 1
+            scores = self.index.score(code)
+            # Lingua con score più alto (a parità, la prima registrata)
+            best_lang = max(self.languages, key=lambda lang: scores.get(lang, 0.0))
+            score = scores.get(best_lang, 0.0)
+            self._cache[key] = (best_lang, score)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
         
-        print(f"🌍 Lingua rilevata: {self.languages[best_lang].name} (score: {scores[best_lang]:.2f})")
+        print(f"🌍 Lingua rilevata: {self.languages[best_lang].name} (score: {score:.2f})")
         
         return self.languages[best_lang]
     
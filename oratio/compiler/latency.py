@@ -0,0 +1,96 @@
+"""
+Latency - Istogrammi di latenza e backoff per le chiamate LLM
+
+Le durate dei tentativi riusciti finiscono in un istogramma a bucket
+(esportabile) e in una finestra dei campioni recenti, da cui si calcola
+il percentile usato per decidere quando lanciare una richiesta "hedged".
+"""
+
+import random
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+# Limiti superiori dei bucket, in secondi
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Backoff esponenziale con full jitter: uniforme in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyHistogram:
+    """
+    Istogramma delle latenze per tentativo, più contatori di eventi
+
+    Thread-safe: lo stesso istogramma è condiviso da tutti i parser del
+    processo.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window: int = 512, min_samples: int = 10):
+        self.buckets = tuple(buckets)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)  # ultimo = +Inf
+        self._recent = deque(maxlen=window)
+        self._sum = 0.0
+        self._events: Dict[str, int] = {}
+
+    def record(self, seconds: float):
+        """Registra la durata di un tentativo riuscito"""
+        with self._lock:
+            self._counts[bisect_left(self.buckets, seconds)] += 1
+            self._recent.append(seconds)
+            self._sum += seconds
+
+    def count(self, event: str, n: int = 1):
+        """Incrementa un contatore (failures, hedges, hedge_wins, ...)"""
+        with self._lock:
+            self._events[event] = self._events.get(event, 0) + n
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Percentile `p` (0-1) dei campioni recenti
+
+        None finché non ci sono almeno `min_samples` campioni.
+        """
+        with self._lock:
+            samples = sorted(self._recent)
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(p * len(samples))) - 1))
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Stato esportabile (bucket cumulativi in stile Prometheus)"""
+        with self._lock:
+            counts = list(self._counts)
+            total = sum(counts)
+            latency_sum = self._sum
+            events = dict(self._events)
+
+        cumulative = {}
+        running = 0
+        for bound, n in zip(list(self.buckets) + ["+Inf"], counts):
+            running += n
+            cumulative[str(bound)] = running
+
+        return {
+            "count": total,
+            "sum": latency_sum,
+            "buckets": cumulative,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "events": events,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._recent.clear()
+            self._sum = 0.0
+            self._events = {}
@@ -1,14 +1,130 @@
 """
 Local GPU Parser using Qwen 2.5 Coder 14B Instruct
 Faster, more stable, and cheaper than OpenAI API
+
+Il modello viene caricato alla prima richiesta e condiviso da tutti i
+parser del processo (vedi ModelRegistry). Il KV cache del prefisso fisso
+del prompt (system prompt della lingua) viene calcolato una volta sola e
+riusato per ogni richiesta.
 """
 
+import os
+import copy
+import time
+import threading
+from pathlib import Path
+
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers.generation.streamers import BaseStreamer
 import json
 import re
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple, List, Iterable
+from transformers import LogitsProcessorList, StoppingCriteriaList
 from .validator import IRValidator
+from .errors import ParseError
+from .languages import LanguageDetector
+from .constrained import TokenTable, DecodingState, IRLogitsProcessor, JSONObjectStop
+
+
+DEFAULT_MODEL = "Qwen/Qwen2.5-Coder-14B-Instruct"
+DEFAULT_MODEL_DIR = Path.home() / ".cache" / "oratio" / "models"
+
+
+class LoadedModel:
+    """Tokenizer e modello caricati, più i KV cache dei prefissi calcolati"""
+    
+    def __init__(self, model_name: str, cache_dir: str, device: str):
+        print(f"📦 Loading model: {model_name}")
+        print(f"🎮 Device: {device}")
+        if device == "cuda":
+            print(f"🔥 GPUs: {torch.cuda.device_count()}")
+            for i in range(torch.cuda.device_count()):
+                print(f"   GPU {i}: {torch.cuda.get_device_name(i)}")
+        
+        self.device = device
+        
+        # Load tokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(
+            model_name,
+            cache_dir=cache_dir
+        )
+        
+        if device == "cuda":
+            # Load model with multi-GPU support
+            self.model = AutoModelForCausalLM.from_pretrained(
+                model_name,
+                cache_dir=cache_dir,
+                torch_dtype=torch.float16,
+                device_map="auto"  # Automatic multi-GPU distribution
+            )
+        else:
+            self.model = AutoModelForCausalLM.from_pretrained(model_name, cache_dir=cache_dir)
+            self.model.to(device)
+        self.model.eval()
+        
+        # system prompt -> (token del prefisso, KV cache del prefisso)
+        self.prefixes: Dict[str, Tuple[torch.Tensor, Any]] = {}
+        self.lock = threading.Lock()
+        self._token_table: Optional[TokenTable] = None
+        
+        print("✅ Model loaded successfully!")
+        print(f"📊 Model size: {sum(p.numel() for p in self.model.parameters()) / 1e9:.1f}B parameters")
+
+
+    def token_table(self) -> TokenTable:
+        """Testo dei token per la generazione vincolata (calcolato una volta)"""
+        with self.lock:
+            if self._token_table is None:
+                self._token_table = TokenTable(self.tokenizer, self.model.config.vocab_size)
+            return self._token_table
+
+
+class ModelRegistry:
+    """Modelli caricati, condivisi da tutte le istanze del processo"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[Tuple[str, str], LoadedModel] = {}
+    
+    def get(self, model_name: str, cache_dir: str, device: str) -> LoadedModel:
+        """Modello richiesto, caricato alla prima chiamata"""
+        key = (model_name, device)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = LoadedModel(model_name, cache_dir, device)
+            return self._models[key]
+    
+    def loaded(self) -> list:
+        """Chiavi (modello, device) dei modelli in memoria"""
+        with self._lock:
+            return list(self._models)
+    
+    def clear(self):
+        """Rilascia tutti i modelli"""
+        with self._lock:
+            self._models.clear()
+
+
+models = ModelRegistry()
+
+
+class _FirstTokenTimer(BaseStreamer):
+    """Misura il tempo al primo token generato"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.ttft: Optional[float] = None
+        self._calls = 0
+    
+    def put(self, value):
+        # La prima chiamata riceve il prompt, la seconda il primo token
+        self._calls += 1
+        if self._calls == 2 and self.ttft is None:
+            self.ttft = time.perf_counter() - self.start
+    
+    def end(self):
+        pass
 
 
 class LocalGPUParser:
@@ -23,43 +139,56 @@ class LocalGPUParser:
     - Multi-GPU: Supporto nativo senza bug
     """
     
-    def __init__(self, model_name: str = "Qwen/Qwen2.5-Coder-14B-Instruct"):
+    def __init__(self, model_name: str = DEFAULT_MODEL, cache_dir: Optional[str] = None,
+                 device: Optional[str] = None, reuse_prefix: bool = True,
+                 constrained: bool = True, max_new_tokens: int = 2048,
+                 op_types: Optional[Iterable[str]] = None):
         """
-        Inizializza parser con modello locale
+        Inizializza parser con modello locale (caricato alla prima richiesta)
         
         Args:
-            model_name: Nome modello HuggingFace (default: Qwen 2.5 Coder 14B)
+            model_name: Nome modello HuggingFace o directory locale
+                        (default: Qwen 2.5 Coder 14B)
+            cache_dir: Directory dei modelli scaricati (default:
+                       $ORATIO_MODEL_DIR o ~/.cache/oratio/models)
+            device: 'cuda' o 'cpu' (default: cuda se disponibile)
+            reuse_prefix: Riusa il KV cache del system prompt tra le richieste
+            constrained: Vincola la generazione allo schema IR e fermala
+                         alla chiusura dell'oggetto JSON
+            max_new_tokens: Limite di sicurezza sui token generati
+            op_types: Operazioni ammesse in "type" (default: registro del runtime)
         """
-        print("🚀 Inizializzazione LocalGPUParser...")
-        
         self.model_name = model_name
-        self.cache_dir = "/home/manuel/.cache/oratio/models"
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.cache_dir = cache_dir or os.getenv("ORATIO_MODEL_DIR") or str(DEFAULT_MODEL_DIR)
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.reuse_prefix = reuse_prefix
+        self.constrained = constrained
+        self.max_new_tokens = max_new_tokens
+        self._op_types = tuple(op_types) if op_types is not None else None
         self.validator = IRValidator()
-        
-        print(f"📦 Loading model: {self.model_name}")
-        print(f"🎮 Device: {self.device}")
-        print(f"🔥 GPUs: {torch.cuda.device_count()}")
-        for i in range(torch.cuda.device_count()):
-            print(f"   GPU {i}: {torch.cuda.get_device_name(i)}")
-        
-        # Load tokenizer
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            self.model_name,
-            cache_dir=self.cache_dir
-        )
-        
-        # Load model with multi-GPU support
-        self.model = AutoModelForCausalLM.from_pretrained(
-            self.model_name,
-            cache_dir=self.cache_dir,
-            torch_dtype=torch.float16,
-            device_map="auto"  # Automatic multi-GPU distribution
-        )
-        
-        print("✅ Model loaded successfully!")
-        print(f"📊 Model size: {sum(p.numel() for p in self.model.parameters()) / 1e9:.1f}B parameters")
-        
+        self.lang_detector = LanguageDetector()
+        self.last_ttft: Optional[float] = None  # Tempo al primo token dell'ultimo parse
+        self.last_throughput: Optional[Dict[str, float]] = None  # Ultimo parse_many
+    
+    @property
+    def loaded(self) -> LoadedModel:
+        return models.get(self.model_name, self.cache_dir, self.device)
+    
+    @property
+    def op_types(self) -> tuple:
+        if self._op_types is None:
+            from oratio.runtime import Runtime
+            self._op_types = tuple(Runtime().operations)
+        return self._op_types
+    
+    @property
+    def tokenizer(self):
+        return self.loaded.tokenizer
+    
+    @property
+    def model(self):
+        return self.loaded.model
+    
     def parse(self, code: str, language: str = "it") -> Dict[str, Any]:
         """
         Parse codice ORATIO in IR usando GPU locale
@@ -75,36 +204,13 @@ class LocalGPUParser:
         
         # Build prompt
         system_prompt = self._get_system_prompt(language)
-        user_prompt = f"""Convert this code to IR:
-
-```
-{code}
-```
-
-Respond with valid JSON only."""
-        
-        # Format for DeepSeek
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        # Tokenize
-        inputs = self.tokenizer.apply_chat_template(
-            messages,
-            add_generation_prompt=True,
-            return_tensors="pt"
-        ).to(self.device)
+        inputs = self._encode(system_prompt, code)
         
         # Generate
-        with torch.no_grad():
-            outputs = self.model.generate(
-                inputs,
-                max_new_tokens=150,  # Limitato per IR JSON
-                do_sample=False,  # Greedy - più stabile
-                pad_token_id=self.tokenizer.eos_token_id,
-                eos_token_id=self.tokenizer.eos_token_id
-            )
+        timer = _FirstTokenTimer()
+        outputs = self._generate(inputs, system_prompt, max_new_tokens=self.max_new_tokens,
+                                 streamer=timer)
+        self.last_ttft = timer.ttft
         
         # Decode
         response = self.tokenizer.decode(
@@ -112,6 +218,88 @@ Respond with valid JSON only."""
             skip_special_tokens=True
         )
         
+        ir = self._extract_ir(response)
+        print(f"✅ Parsed (GPU): {len(ir.get('operations', []))} operations")
+        return ir
+    
+    def parse_many(self, codes: List[str], language: str = "it", batch_size: int = 8,
+                   return_exceptions: bool = False) -> List[Any]:
+        """
+        Parse di più programmi con generazione a batch
+        
+        I prompt vengono ordinati per lunghezza, divisi in micro-batch da
+        `batch_size`, allineati con padding a sinistra e generati insieme.
+        
+        Args:
+            codes: Programmi in linguaggio naturale
+            language: 'it' o 'en' (uguale per tutti)
+            batch_size: Programmi per chiamata a model.generate
+            return_exceptions: Se True gli errori di parsing finiscono
+                               nella lista invece di essere sollevati
+            
+        Returns:
+            IR validati, nello stesso ordine di `codes`
+        """
+        print(f"🔍 Parsing (GPU): {len(codes)} programmi, batch da {batch_size}...")
+        start = time.perf_counter()
+        
+        responses = self._generate_many(codes, language, batch_size,
+                                        max_new_tokens=self.max_new_tokens)
+        
+        results = []
+        for response in responses:
+            try:
+                results.append(self._extract_ir(response))
+            except ParseError as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        
+        elapsed = time.perf_counter() - start
+        self.last_throughput = {
+            "programs": len(codes),
+            "seconds": elapsed,
+            "programs_per_second": len(codes) / elapsed if elapsed else 0.0,
+        }
+        print(f"📊 {len(codes)} programmi in {elapsed:.2f}s "
+              f"({self.last_throughput['programs_per_second']:.1f} programmi/s)")
+        return results
+    
+    def _generate_many(self, codes: List[str], language: str, batch_size: int,
+                       max_new_tokens: int) -> List[str]:
+        """Testo generato per ogni programma, nell'ordine di `codes`"""
+        system_prompt = self._get_system_prompt(language)
+        encoded = [self._encode(system_prompt, code)[0] for code in codes]
+        pad_id = self.tokenizer.pad_token_id
+        if pad_id is None:
+            pad_id = self.tokenizer.eos_token_id
+        
+        # Lunghezze simili nello stesso batch = meno padding
+        order = sorted(range(len(codes)), key=lambda i: len(encoded[i]))
+        responses: List[Optional[str]] = [None] * len(codes)
+        
+        for begin in range(0, len(order), batch_size):
+            batch = order[begin:begin + batch_size]
+            width = max(len(encoded[i]) for i in batch)
+            inputs = torch.full((len(batch), width), pad_id, dtype=torch.long, device=self.device)
+            attention_mask = torch.zeros_like(inputs)
+            for row, i in enumerate(batch):
+                ids = encoded[i]
+                inputs[row, width - len(ids):] = ids
+                attention_mask[row, width - len(ids):] = 1
+            
+            # Con il padding a sinistra il prefisso non è allineato:
+            # il batch ammortizza già il costo del system prompt
+            outputs = self._generate(inputs, system_prompt, max_new_tokens=max_new_tokens,
+                                     reuse_prefix=False, attention_mask=attention_mask)
+            for row, i in enumerate(batch):
+                responses[i] = self.tokenizer.decode(outputs[row][width:],
+                                                     skip_special_tokens=True)
+        
+        return responses
+    
+    def _extract_ir(self, response: str) -> Dict[str, Any]:
+        """IR validato dal testo generato"""
         # Extract JSON
         try:
             # Find JSON in response
@@ -127,8 +315,6 @@ Respond with valid JSON only."""
             # Validate
             self.validator.validate(ir)
             
-            print(f"✅ Parsed (GPU): {len(ir.get('operations', []))} operations")
-            
             return ir
             
         except json.JSONDecodeError as e:
@@ -136,111 +322,117 @@ Respond with valid JSON only."""
         except Exception as e:
             raise ParseError(f"Parsing error: {e}")
     
+    def time_to_first_token(self, code: str, language: str = "it",
+                            reuse_prefix: Optional[bool] = None) -> float:
+        """Secondi fino al primo token generato per `code`"""
+        system_prompt = self._get_system_prompt(language)
+        inputs = self._encode(system_prompt, code)
+        timer = _FirstTokenTimer()
+        self._generate(inputs, system_prompt, max_new_tokens=1, streamer=timer,
+                       reuse_prefix=reuse_prefix)
+        return timer.ttft
+    
+    def _build_user_prompt(self, code: str) -> str:
+        return f"""Convert this code to IR:
+
+```
+{code}
+```
+
+Respond with valid JSON only."""
+    
+    def _messages(self, system_prompt: str, user_prompt: str) -> list:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _encode(self, system_prompt: str, code: str) -> torch.Tensor:
+        """Token del prompt completo (chat template del modello)"""
+        return self._encode_messages(self._messages(system_prompt, self._build_user_prompt(code)))
+    
+    def _encode_messages(self, messages: list) -> torch.Tensor:
+        text = self.tokenizer.apply_chat_template(
+            messages,
+            add_generation_prompt=True,
+            tokenize=False
+        )
+        encoded = self.tokenizer(text, return_tensors="pt", add_special_tokens=False)
+        return encoded["input_ids"].to(self.device)
+    
+    def _prefix(self, system_prompt: str) -> Tuple[torch.Tensor, Any]:
+        """
+        Token e KV cache del prefisso comune a tutte le richieste
+        
+        Il prefisso è la parte del prompt che non dipende dal codice:
+        si ricava confrontando i token di due richieste diverse.
+        """
+        loaded = self.loaded
+        with loaded.lock:
+            if system_prompt not in loaded.prefixes:
+                a = self._encode_messages(self._messages(system_prompt, "A"))[0]
+                b = self._encode_messages(self._messages(system_prompt, "B"))[0]
+                n = 0
+                while n < min(len(a), len(b)) and a[n] == b[n]:
+                    n += 1
+                prefix_ids = a[:n].unsqueeze(0)
+                with torch.no_grad():
+                    cache = loaded.model(prefix_ids, use_cache=True).past_key_values
+                loaded.prefixes[system_prompt] = (prefix_ids, cache)
+            return loaded.prefixes[system_prompt]
+    
+    def _generate(self, inputs: torch.Tensor, system_prompt: str, max_new_tokens: int,
+                  streamer=None, reuse_prefix: Optional[bool] = None,
+                  attention_mask: Optional[torch.Tensor] = None,
+                  constrained: Optional[bool] = None, **kwargs) -> torch.Tensor:
+        """
+        model.generate, partendo dal KV cache del prefisso quando possibile
+        
+        Con la generazione vincolata ogni riga si ferma alla chiusura del
+        proprio oggetto JSON.
+        """
+        if reuse_prefix is None:
+            reuse_prefix = self.reuse_prefix
+        if constrained is None:
+            constrained = self.constrained
+        
+        if constrained:
+            state = DecodingState(self.loaded.token_table(), inputs.shape[1], inputs.shape[0])
+            kwargs["logits_processor"] = LogitsProcessorList([
+                IRLogitsProcessor(state, self.op_types)
+            ])
+            kwargs["stopping_criteria"] = StoppingCriteriaList([JSONObjectStop(state)])
+        
+        if reuse_prefix:
+            prefix_ids, cache = self._prefix(system_prompt)
+            n = prefix_ids.shape[1]
+            if 0 < n < inputs.shape[1] and torch.equal(inputs[:, :n], prefix_ids.expand(inputs.shape[0], -1)):
+                # generate estende il cache: ogni richiesta ne usa una copia
+                kwargs["past_key_values"] = copy.deepcopy(cache)
+        
+        with torch.no_grad():
+            return self.model.generate(
+                inputs,
+                attention_mask=attention_mask if attention_mask is not None
+                else torch.ones_like(inputs),
+                max_new_tokens=max_new_tokens,
+                do_sample=False,  # Greedy - più stabile
+                pad_token_id=self.tokenizer.eos_token_id,
+                eos_token_id=self.tokenizer.eos_token_id,
+                streamer=streamer,
+                **kwargs
+            )
+    
     def _get_system_prompt(self, language: str) -> str:
         """Get system prompt based on language"""
-        if language == "it":
-            return """Sei un compiler per ORATIO, un linguaggio di programmazione naturale italiano.
-
-Converti codice in linguaggio naturale italiano in IR (Intermediate Representation) JSON.
-
-OPERAZIONI SUPPORTATE:
-
-I/O:
-- io.read_csv: Carica file CSV
-- io.write_csv: Salva file CSV  
-- io.print: Stampa output
-
-Data:
-- data.show: Mostra dati
-- data.head: Prime N righe
-- data.filter: Filtra righe
-- data.sort: Ordina dati
-
-Math:
-- math.mean: Media
-- math.sum: Somma
-- math.count: Conteggio
-- math.min: Minimo
-- math.max: Massimo
-
-Viz:
-- viz.plot: Grafico linee
-- viz.bar: Grafico barre
-- viz.draw_point: Disegna punto
-- viz.draw_circle: Disegna cerchio
-- viz.draw_line: Disegna linea
-- viz.create_canvas: Crea tela
-- viz.save_image: Salva immagine
-
-FORMATO IR:
-{
-  "version": "1.0",
-  "operations": [
-    {
-      "id": "op_1",
-      "type": "io.read_csv",
-      "params": {"file_path": "file.csv"},
-      "output": "$var_0"
-    }
-  ]
-}
-
-Rispondi SOLO con JSON valido."""
-        else:  # English
-            return """You are a compiler for ORATIO, a natural language programming language.
-
-Convert natural English code into IR (Intermediate Representation) JSON.
-
-SUPPORTED OPERATIONS:
-
-I/O:
-- io.read_csv: Load CSV file
-- io.write_csv: Save CSV file
-- io.print: Print output
-
-Data:
-- data.show: Show data
-- data.head: First N rows
-- data.filter: Filter rows
-- data.sort: Sort data
-
-Math:
-- math.mean: Average
-- math.sum: Sum
-- math.count: Count
-- math.min: Minimum
-- math.max: Maximum
-
-Viz:
-- viz.plot: Line chart
-- viz.bar: Bar chart
-- viz.draw_point: Draw point
-- viz.draw_circle: Draw circle
-- viz.draw_line: Draw line
-- viz.create_canvas: Create canvas
-- viz.save_image: Save image
-
-IR FORMAT:
-{
-  "version": "1.0",
-  "operations": [
-    {
-      "id": "op_1",
-      "type": "io.read_csv",
-      "params": {"file_path": "file.csv"},
-      "output": "$var_0"
-    }
-  ]
-}
-
-Reply ONLY with valid JSON."""
+        return self.lang_detector.get_language(language).get_system_prompt()
 
 
 if __name__ == "__main__":
     # Test
     print("🧪 Testing LocalGPUParser...")
     
-    parser = LocalGPUParser()
+    parser = LocalGPUParser(os.getenv("ORATIO_LOCAL_MODEL", DEFAULT_MODEL))
     
     # Test italiano
     code_it = "Stampa 'Ciao dal parser GPU!'"
@@ -249,4 +441,12 @@ if __name__ == "__main__":
     print("\n📦 IR Generated:")
     print(json.dumps(ir, indent=2, ensure_ascii=False))
     
+    # Tempo al primo token con e senza KV cache del system prompt
+    cold = min(parser.time_to_first_token(code_it, reuse_prefix=False) for _ in range(3))
+    warm = min(parser.time_to_first_token(code_it, reuse_prefix=True) for _ in range(3))
+    print(f"\n⏱️  TTFT: {cold * 1000:.1f} ms senza prefisso, {warm * 1000:.1f} ms con prefisso")
+    
+    # Throughput con generazione a batch (stampato da parse_many)
+    parser.parse_many([code_it] * 16, language="it", batch_size=8, return_exceptions=True)
+    
     print("\n✅ Test completato!")
@@ -4,35 +4,111 @@ Semantic Parser - Converte linguaggio naturale in IR
 
 import os
 import json
-from typing import Dict, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Optional, Iterator, Tuple
 from openai import OpenAI
 from dotenv import load_dotenv
 
 from .errors import ParseError, ValidationError
 from .validator import IRValidator
 from .languages import LanguageDetector, Language
+from .cache import IRCache, hash_text
+from .incremental import StatementPlan, split_statements
+from .rules import RuleCompiler
+from .coalesce import SingleFlight
+from .latency import LatencyHistogram, backoff_delay
+from .streaming import OperationScanner
+from oratio.tracing import traced
 
 # Carica variabili ambiente
 load_dotenv()
 
+# Modello LLM del parser (fa parte dell'impronta degli artifact)
+DEFAULT_MODEL = "gpt-4-turbo-preview"
+
+
+def language_fingerprint(language: Language, model: str = DEFAULT_MODEL) -> Dict[str, str]:
+    """Impronta di modello, lingua e system prompt per una lingua già nota"""
+    return {
+        "model": model,
+        "language": language.code,
+        "prompt": hash_text(language.get_system_prompt()),
+    }
+
+
+def fingerprint(code: str, model: str = DEFAULT_MODEL, language: Optional[str] = None,
+                detector: Optional[LanguageDetector] = None) -> Dict[str, str]:
+    """Impronta con cui `code` viene compilato (lingua forzata o rilevata)"""
+    detector = detector or LanguageDetector()
+    detected = detector.get_language(language) if language else detector.detect(code)
+    return language_fingerprint(detected, model)
+
+
+def stored_fingerprint(stored: Dict[str, str],
+                       model: str = DEFAULT_MODEL) -> Optional[Dict[str, str]]:
+    """
+    Impronta attuale per la lingua registrata in un'impronta salvata
+    
+    Non rileva la lingua e non richiede client né chiave API: `oratio
+    run` la confronta con quella dell'artifact (artifact.load_ir). None
+    se la lingua salvata non è più supportata.
+    """
+    language = LanguageDetector().languages.get(stored.get("language"))
+    return language_fingerprint(language, model) if language is not None else None
+
 
 class SemanticParser:
     """
     Parser semantico che usa LLM per capire intent
     """
     
-    def __init__(self, api_key: str = None, language: str = None):
+    # Parse identici in corso contemporaneamente condividono la chiamata LLM
+    flight = SingleFlight()
+    # Latenze dei tentativi LLM, condivise da tutti i parser del processo
+    latency = LatencyHistogram()
+    
+    def __init__(self, api_key: str = None, language: str = None,
+                 cache: Optional[IRCache] = None, use_cache: bool = True,
+                 incremental: bool = True, fast_path: bool = True,
+                 base_url: Optional[str] = None, deadline: float = 60.0,
+                 attempt_timeout: float = 30.0, hedge_percentile: Optional[float] = None,
+                 hedge_delay: float = 2.0, latency: Optional[LatencyHistogram] = None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY non trovata")
         
-        self.client = OpenAI(api_key=self.api_key)
-        self.model = "gpt-4-turbo-preview"
+        self.base_url = base_url  # Endpoint compatibile OpenAI (opzionale)
+        self.client = self._create_client()
+        self.model = DEFAULT_MODEL
         
         # Componenti
         self.validator = IRValidator()
         self.lang_detector = LanguageDetector()
         self.language = language  # Lingua forzata (opzionale)
+        
+        # Cache IR su disco (None = disabilitata)
+        self.cache = (cache or IRCache()) if use_cache else None
+        # Parsing frase per frase (memoizzato se la cache è attiva)
+        self.incremental = incremental
+        # Frasi comuni compilate localmente, senza LLM
+        self.rules = RuleCompiler() if fast_path else None
+        
+        # Tempi delle chiamate LLM
+        self.deadline = deadline                # Tempo massimo per parse (s)
+        self.attempt_timeout = attempt_timeout  # Timeout del singolo tentativo (s)
+        # Percentile di latenza oltre cui lanciare una seconda richiesta
+        # (None = hedging disattivato); `hedge_delay` vale finché
+        # l'istogramma non ha abbastanza campioni
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        if latency is not None:
+            self.latency = latency
+    
+    def _create_client(self):
+        """Client LLM sincrono"""
+        # I retry li gestisce _call_llm_with_retry, con deadline e backoff
+        return OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
     
     def parse(self, code: str) -> Dict[str, Any]:
         """
@@ -48,32 +124,259 @@ class SemanticParser:
             ParseError: Se il parsing fallisce
             ValidationError: Se l'IR non è valido
         """
+        return self.parse_with_stats(code)[0]
+    
+    @traced("SemanticParser.parse")
+    def parse_with_stats(self, code: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Come parse(), con le statistiche di questa chiamata
+        
+        Returns:
+            (IR validato, statistiche delle frasi: frasi per sorgente e
+            copertura del fast path; None per programmi interi dalla cache
+            o senza parsing frase per frase)
+        """
         print(f"🔍 Parsing: {code[:50]}...")
         
         try:
-            # Rileva lingua
-            language = self._detect_language(code)
+            language, system_prompt, cache_key, ir = self._lookup(code)
+            if ir is not None:
+                return ir, None
             
-            # Costruisci prompt
-            prompt = self._build_prompt(code)
-            system_prompt = language.get_system_prompt()
+            return self.flight.do(
+                self._flight_key(code, language, system_prompt),
+                lambda: self._parse_uncached(code, language, system_prompt, cache_key)
+            )
             
-            # Chiama LLM con retry
-            ir = self._call_llm_with_retry(system_prompt, prompt, max_retries=2)
+        except Exception as e:
+            raise self._as_parse_error(e, code)
+    
+    def parse_stream(self, code: str) -> Iterator[Dict[str, Any]]:
+        """
+        Come parse(), ma produce le operazioni una alla volta
+        
+        Con una risposta LLM in streaming ogni operazione viene validata e
+        restituita appena il suo oggetto JSON è completo, così il runtime
+        può iniziare a eseguirla mentre l'LLM genera le successive.
+        L'IR completo viene validato e salvato in cache alla fine.
+        
+        Raises:
+            ParseError: Se il parsing fallisce
+            ValidationError: Se un'operazione o l'IR non è valido
+        """
+        print(f"🔍 Parsing (streaming): {code[:50]}...")
+        
+        try:
+            language, system_prompt, cache_key, ir = self._lookup(code)
             
-            # Valida IR
-            self.validator.validate(ir)
+            if ir is None and self._statement_mode():
+                # Senza frasi per l'LLM l'IR è già tutto disponibile
+                plan = self._plan_statements(code, language, system_prompt)
+                if not plan.pending:
+                    ir = self._finish(self._assemble_statements(plan), cache_key)
             
-            print(f"✅ Parsed: {len(ir.get('operations', []))} operazioni")
+            if ir is not None:
+                yield from ir['operations']
+                return
             
-            return ir
+            # Lo streaming usa il prompt del programma intero: le frasi
+            # compilate a gruppi vanno ricucite prima di poter essere eseguite
+            prompt = self._build_prompt(code)
+            scanner = yield from self._stream_llm(system_prompt, prompt)
+            self._finish(scanner.result(), cache_key)
             
-        except json.JSONDecodeError as e:
-            raise ParseError(f"Risposta LLM non è JSON valido: {e}", code=code)
         except Exception as e:
-            if isinstance(e, (ParseError, ValidationError)):
+            raise self._as_parse_error(e, code)
+    
+    def _stream_llm(self, system_prompt: str, user_prompt: str, max_retries: int = 2):
+        """
+        Chiama LLM in streaming, producendo le operazioni validate
+        
+        Un tentativo fallito viene ripetuto solo se non ha ancora prodotto
+        operazioni. Ritorna lo scanner con la risposta completa.
+        """
+        deadline = time.monotonic() + self.deadline
+        last_error = None
+        
+        for attempt in range(max_retries):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            scanner = OperationScanner()
+            defined_vars: set = set()
+            emitted = 0
+            try:
+                start = time.perf_counter()
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.1,
+                    response_format={"type": "json_object"},
+                    timeout=min(self.attempt_timeout, remaining),
+                    stream=True
+                )
+                for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for op in scanner.feed(chunk.choices[0].delta.content):
+                        self.validator.validate_operation(op, emitted, defined_vars)
+                        emitted += 1
+                        yield op
+                
+                self.latency.record(time.perf_counter() - start)
+                return scanner
+                
+            except ValidationError:
                 raise
-            raise ParseError(f"Errore durante parsing: {e}", code=code)
+            except Exception as e:
+                last_error = e
+                self.latency.count("failures")
+                if emitted or attempt == max_retries - 1:
+                    break
+                print(f"⚠️  Tentativo {attempt + 1} fallito, riprovo...")
+                time.sleep(min(backoff_delay(attempt), max(0.0, deadline - time.monotonic())))
+        
+        raise ParseError(f"LLM (streaming) fallito: {last_error}")
+    
+    def _parse_uncached(self, code: str, language: Language, system_prompt: str,
+                        cache_key: Optional[str]):
+        """
+        Parsing con LLM (eseguito solo dal leader del single-flight)
+        
+        Returns:
+            (IR validato, statistiche)
+        """
+        deadline = time.monotonic() + self.deadline
+        
+        if self._statement_mode():
+            # Solo le frasi non risolte localmente vanno all'LLM
+            plan = self._plan_statements(code, language, system_prompt)
+            
+            # Il secondo giro serve solo se un frammento in cache perde il
+            # suo import dopo la ricompilazione della frase da cui dipende
+            for _ in range(2):
+                if not plan.pending:
+                    break
+                request = plan.build_request(plan.pending, language.code)
+                response = self._call_llm_with_retry(system_prompt, request.prompt,
+                                                     max_retries=2, deadline=deadline)
+                self._apply_statements(plan, request, response, language, system_prompt)
+            
+            stats = plan.stats()
+            ir = self._assemble_statements(plan)
+        else:
+            # Costruisci prompt
+            prompt = self._build_prompt(code)
+            
+            # Chiama LLM con retry
+            ir = self._call_llm_with_retry(system_prompt, prompt, max_retries=2,
+                                           deadline=deadline)
+            stats = None
+        
+        return self._finish(ir, cache_key), stats
+
+    def fingerprint(self, code: str) -> Dict[str, str]:
+        """Impronta di modello, lingua e system prompt usati per `code`"""
+        return fingerprint(code, self.model, self.language, self.lang_detector)
+    
+    def _lookup(self, code: str):
+        """
+        Rileva lingua e cerca il programma nella cache
+        
+        Returns:
+            (lingua, system prompt, chiave cache, IR in cache o None)
+        """
+        # Rileva lingua
+        language = self._detect_language(code)
+        system_prompt = language.get_system_prompt()
+        
+        # Cache hit: nessuna chiamata LLM
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(code, language.code, self.model, system_prompt)
+            ir = self.cache.get(cache_key)
+            if ir is not None:
+                self.validator.validate(ir)
+                print(f"⚡ IR dalla cache: {len(ir.get('operations', []))} operazioni")
+                return language, system_prompt, cache_key, ir
+        
+        return language, system_prompt, cache_key, None
+    
+    def _finish(self, ir: Dict[str, Any], cache_key: Optional[str]) -> Dict[str, Any]:
+        """Valida l'IR e lo salva in cache"""
+        # Valida IR
+        self.validator.validate(ir)
+        
+        if self.cache is not None:
+            self.cache.put(cache_key, ir)
+        
+        print(f"✅ Parsed: {len(ir.get('operations', []))} operazioni")
+        
+        return ir
+    
+    def _as_parse_error(self, error: Exception, code: str) -> Exception:
+        """Uniforma gli errori di parsing"""
+        if isinstance(error, (ParseError, ValidationError)):
+            return error
+        if isinstance(error, json.JSONDecodeError):
+            return ParseError(f"Risposta LLM non è JSON valido: {error}", code=code)
+        return ParseError(f"Errore durante parsing: {error}", code=code)
+    
+    def _statement_mode(self) -> bool:
+        """Parsing frase per frase invece che del programma intero"""
+        return self.rules is not None or self.incremental
+    
+    def _flight_key(self, code: str, language: Language, system_prompt: str) -> str:
+        """Chiave del single-flight: programma e configurazione del parser"""
+        return hash_text("flight", IRCache.key(code, language.code, self.model, system_prompt),
+                         f"incremental={self.incremental}", f"rules={self.rules is not None}",
+                         f"cache={self.cache is not None}", f"base_url={self.base_url}")
+    
+    def _fragment_key(self, slot, language: Language, system_prompt: str) -> str:
+        return self.cache.key(slot.text, language.code, self.model,
+                              system_prompt, kind="statement")
+    
+    def _plan_statements(self, code: str, language: Language,
+                         system_prompt: str) -> StatementPlan:
+        """
+        Divide il programma in frasi e risolve quelle note
+        
+        Ogni frase è risolta, in ordine, dal fast path a regole o dalla
+        cache dei frammenti; le rimanenti restano pendenti per l'LLM.
+        """
+        plan = StatementPlan(split_statements(code))
+        
+        if self.rules is not None:
+            plan.resolve(self.rules.resolver(language), 'rules')
+        if self.cache is not None and self.incremental:
+            plan.resolve(
+                lambda slot: self.cache.get(self._fragment_key(slot, language, system_prompt)),
+                'cache'
+            )
+        
+        if plan.pending:
+            print(f"🧩 Frasi da compilare: {len(plan.pending)}/{len(plan.slots)}")
+        return plan
+    
+    def _apply_statements(self, plan: StatementPlan, request, response: Dict[str, Any],
+                          language: Language, system_prompt: str):
+        """Registra la risposta LLM e memoizza i frammenti"""
+        for slot in plan.apply_response(request, response):
+            if self.cache is not None and self.incremental:
+                self.cache.put(self._fragment_key(slot, language, system_prompt), slot.fragment)
+    
+    def _assemble_statements(self, plan: StatementPlan) -> Dict[str, Any]:
+        """Ricuce i frammenti"""
+        if self.rules is not None:
+            stats = plan.stats()
+            print(f"📐 Fast path: {stats['rules']}/{stats['statements']} frasi "
+                  f"senza LLM ({stats['coverage']:.0%})")
+        
+        return plan.assemble()
     
     def _detect_language(self, code: str) -> Language:
         """Rileva lingua del codice"""
@@ -85,37 +388,113 @@ class SemanticParser:
             return self.lang_detector.detect(code)
     
     def _call_llm_with_retry(self, system_prompt: str, user_prompt: str, 
-                             max_retries: int = 2) -> Dict[str, Any]:
-        """Chiama LLM con retry su errori"""
+                             max_retries: int = 2,
+                             deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Chiama LLM con retry su errori
+        
+        I tentativi rispettano la deadline complessiva (time.monotonic)
+        e sono distanziati da un backoff esponenziale con jitter.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.deadline
         last_error = None
+        expired = False
         
         for attempt in range(max_retries):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                expired = True
+                break
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.1,
-                    response_format={"type": "json_object"},
-                    timeout=30
-                )
-                
-                # Estrai e parse JSON
-                ir_text = response.choices[0].message.content
-                ir = json.loads(ir_text)
-                
-                return ir
+                return self._hedged_attempt(system_prompt, user_prompt,
+                                            min(self.attempt_timeout, remaining))
                 
             except Exception as e:
                 last_error = e
+                self.latency.count("failures")
                 if attempt < max_retries - 1:
+                    delay = backoff_delay(attempt)
+                    if time.monotonic() + delay >= deadline:
+                        expired = True
+                        break
                     print(f"⚠️  Tentativo {attempt + 1} fallito, riprovo...")
-                    continue
+                    time.sleep(delay)
+        
+        if expired:
+            self.latency.count("deadline_exceeded")
+            raise ParseError(f"LLM: deadline di {self.deadline:.0f}s superata "
+                             f"(ultimo errore: {last_error})")
         
         # Tutti i tentativi falliti
         raise ParseError(f"LLM fallito dopo {max_retries} tentativi: {last_error}")
+    
+    def _hedge_after(self, timeout: float) -> Optional[float]:
+        """Attesa prima della richiesta di riserva (None = niente hedging)"""
+        if self.hedge_percentile is None:
+            return None
+        delay = self.latency.percentile(self.hedge_percentile)
+        if delay is None:
+            delay = self.hedge_delay
+        return delay if delay < timeout else None
+    
+    def _hedged_attempt(self, system_prompt: str, user_prompt: str,
+                        timeout: float) -> Dict[str, Any]:
+        """
+        Un tentativo, eventualmente con hedging
+        
+        Se la prima richiesta non risponde entro il percentile configurato
+        ne parte una seconda; vince la prima risposta valida.
+        """
+        hedge_after = self._hedge_after(timeout)
+        if hedge_after is None:
+            return self._request(system_prompt, user_prompt, timeout)
+        
+        # La richiesta perdente non si può interrompere: il pool non la attende
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            first = executor.submit(self._request, system_prompt, user_prompt, timeout)
+            done, _ = wait([first], timeout=hedge_after)
+            if done:
+                return first.result()
+            
+            self.latency.count("hedges")
+            second = executor.submit(self._request, system_prompt, user_prompt,
+                                     timeout - hedge_after)
+            pending = {first, second}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is second:
+                            self.latency.count("hedge_wins")
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            executor.shutdown(wait=False)
+    
+    def _request(self, system_prompt: str, user_prompt: str, timeout: float) -> Dict[str, Any]:
+        """Singola richiesta LLM, con misura della latenza"""
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.1,
+            response_format={"type": "json_object"},
+            timeout=timeout
+        )
+        
+        # Estrai e parse JSON
+        ir_text = response.choices[0].message.content
+        ir = json.loads(ir_text)
+        
+        self.latency.record(time.perf_counter() - start)
+        return ir
 
     def _build_prompt(self, code: str) -> str:
         """Costruisce prompt per parsing"""
@@ -0,0 +1,245 @@
+"""
+Rule-based Fast Path - Compilazione locale delle frasi più comuni
+
+Le frasi ricorrenti ("Carica il file X.csv", "Mostra le prime N righe",
+"Calcola la media della colonna Y", ...) vengono riconosciute con una
+grammatica a pattern e tradotte direttamente in IR, senza chiamare l'LLM.
+
+I verbi della grammatica vengono dalle tabelle `get_keywords()` della
+lingua: ogni parola chiave che compare in KEYWORD_OPS abilita le regole
+della sua operazione.
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Callable
+
+from .languages import Language
+from .incremental import StatementSlot, FRAME_IMPORT, rename_vars
+
+
+# Parola chiave (da Language.get_keywords) -> operazione
+KEYWORD_OPS = {
+    # Italiano
+    'carica': 'io.read_csv', 'leggi': 'io.read_csv', 'salva': 'io.write_csv',
+    'stampa': 'io.print', 'mostra': 'data.show',
+    'filtra': 'data.filter', 'ordina': 'data.sort',
+    'prime': 'data.head', 'ultime': 'data.tail',
+    'calcola': 'math', 'media': 'math.mean', 'somma': 'math.sum', 'conta': 'math.count',
+    'minimo': 'math.min', 'massimo': 'math.max',
+    # English
+    'load': 'io.read_csv', 'read': 'io.read_csv', 'save': 'io.write_csv',
+    'print': 'io.print', 'show': 'data.show',
+    'filter': 'data.filter', 'sort': 'data.sort',
+    'first': 'data.head', 'last': 'data.tail',
+    'calculate': 'math', 'average': 'math.mean', 'mean': 'math.mean', 'sum': 'math.sum',
+    'count': 'math.count', 'min': 'math.min', 'max': 'math.max',
+}
+
+# Estensione del file -> formato di io.read_* / io.write_*
+FILE_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+# Aggregazioni su colonna (gruppo <<math.*>>)
+AGGREGATE_OPS = {'math.mean', 'math.sum', 'math.min', 'math.max'}
+
+# Frammenti di pattern condivisi
+FILE = r'["\'“]?(?P<file>[\w./\\-]+\.(?:csv|parquet|arrow|feather))["\'”]?'
+COLUMN = r'["\'“]?(?P<column>\w+)["\'”]?'
+VALUE = r'(?P<value>-?\d+(?:[.,]\d+)?)'
+TEXT = r'(?P<quote>["\'“])(?P<text>[^"\'“”{}$]*)["\'”]'
+
+OPERATORS = {
+    'maggiore di': '>', 'minore di': '<', 'uguale a': '==',
+    'greater than': '>', 'less than': '<', 'equal to': '==',
+}
+_OPERATOR = r'(?P<op>maggiore\s+di|minore\s+di|uguale\s+a|greater\s+than|less\s+than|' \
+            r'equal\s+to|>=|<=|==|>|<)'
+
+
+# === Costruttori di operazioni ===
+# Usano "$frame" per il DataFrame corrente e "$out_k" per gli output
+
+def _file_format(path: str) -> str:
+    return FILE_FORMATS[path[path.rindex('.'):].lower()]
+
+
+def _read_csv(m):
+    return [{"type": f"io.read_{_file_format(m['file'])}", "params": {"file_path": m['file']},
+             "output": "$out_0"}]
+
+
+def _show(m):
+    return [{"type": "data.show", "params": {"source": "$frame"}}]
+
+
+def _show_head(m):
+    return [{"type": "data.show", "params": {"source": "$frame", "n": int(m['n'])}}]
+
+
+def _show_tail(m):
+    n = int(m['n'])
+    return [
+        {"type": "data.tail", "params": {"source": "$frame", "n": n}, "output": "$out_0"},
+        {"type": "data.show", "params": {"source": "$out_0", "n": n}},
+    ]
+
+
+def _filter(m):
+    operator = OPERATORS.get(' '.join(m['op'].lower().split()), m['op'])
+    value = m['value'].replace(',', '.')
+    return [{
+        "type": "data.filter",
+        "params": {"source": "$frame", "condition": f"{m['column']} {operator} {value}"},
+        "output": "$out_0",
+    }]
+
+
+def _sort(m):
+    order = (m['order'] or '').lower()
+    return [{
+        "type": "data.sort",
+        "params": {
+            "source": "$frame",
+            "column": m['column'],
+            "ascending": order not in ('decrescente', 'descending'),
+        },
+        "output": "$out_0",
+    }]
+
+
+def _aggregate(m):
+    return [{
+        "type": KEYWORD_OPS[m['agg'].lower()],
+        "params": {"source": "$frame", "column": m['column']},
+        "output": "$out_0",
+    }]
+
+
+def _count(m):
+    return [{"type": "math.count", "params": {"source": "$frame"}, "output": "$out_0"}]
+
+
+def _print_text(m):
+    return [{"type": "io.print", "params": {"value": m['text']}}]
+
+
+def _write_csv(m):
+    return [{"type": f"io.write_{_file_format(m['file'])}",
+             "params": {"source": "$frame", "file_path": m['file']}}]
+
+
+# Grammatiche per lingua: (template, costruttore)
+# <<tipo>> si espande nei verbi della lingua associati a quell'operazione
+GRAMMARS = {
+    'it': [
+        (rf"<<io.read_csv>>\s+(?:il\s+file\s+|i\s+dati\s+(?:da|di)\s+|da\s+)?{FILE}", _read_csv),
+        (r"<<data.show>>\s+(?:le\s+)?<<data.head>>\s+(?P<n>\d+)\s+righe", _show_head),
+        (r"<<data.show>>\s+(?:le\s+)?<<data.tail>>\s+(?P<n>\d+)\s+righe", _show_tail),
+        (r"<<data.show>>\s+(?:i\s+)?dati", _show),
+        (rf"<<data.filter>>\s+(?:le\s+righe\s+)?(?:dove|con)\s+{COLUMN}\s+(?:è\s+)?"
+         rf"{_OPERATOR}\s+{VALUE}", _filter),
+        (rf"<<data.sort>>\s+(?:i\s+dati\s+)?per\s+{COLUMN}"
+         r"(?:\s+in\s+ordine\s+(?P<order>crescente|decrescente))?", _sort),
+        (rf"(?:<<math>>\s+)?(?:la\s+|il\s+)?(?P<agg><<math.*>>)\s+della\s+colonna\s+{COLUMN}",
+         _aggregate),
+        (r"<<math.count>>\s+(?:le\s+righe|quante\s+sono|i\s+record)", _count),
+        (rf"<<io.print>>\s+{TEXT}", _print_text),
+        (rf"<<io.write_csv>>\s+(?:i\s+dati\s+)?(?:in|come|su)\s+{FILE}", _write_csv),
+    ],
+    'en': [
+        (rf"<<io.read_csv>>\s+(?:the\s+)?(?:file\s+|data\s+from\s+|from\s+)?{FILE}", _read_csv),
+        (r"<<data.show>>\s+(?:the\s+)?<<data.head>>\s+(?P<n>\d+)\s+rows", _show_head),
+        (r"<<data.show>>\s+(?:the\s+)?<<data.tail>>\s+(?P<n>\d+)\s+rows", _show_tail),
+        (r"<<data.show>>\s+(?:the\s+)?data", _show),
+        (rf"<<data.filter>>\s+(?:the\s+)?(?:rows\s+)?(?:where|with)\s+{COLUMN}\s+(?:is\s+)?"
+         rf"{_OPERATOR}\s+{VALUE}", _filter),
+        (rf"<<data.sort>>\s+(?:the\s+data\s+)?by\s+{COLUMN}"
+         r"(?:\s+in\s+(?P<order>ascending|descending)\s+order)?", _sort),
+        (rf"(?:<<math>>\s+)?(?:the\s+)?(?P<agg><<math.*>>)\s+of\s+(?:the\s+)?column\s+{COLUMN}",
+         _aggregate),
+        (r"<<math.count>>\s+(?:the\s+)?(?:rows|records)", _count),
+        (rf"<<io.print>>\s+{TEXT}", _print_text),
+        (rf"<<io.write_csv>>\s+(?:the\s+data\s+)?(?:to|as|in)\s+{FILE}", _write_csv),
+    ],
+}
+
+
+class RuleCompiler:
+    """
+    Compila localmente le frasi riconosciute dalla grammatica
+
+    Le frasi che non corrispondono a nessuna regola restano all'LLM.
+    """
+
+    def __init__(self):
+        self._compiled: Dict[str, List] = {}
+
+    def compile_statement(self, text: str, language: Language) -> Optional[Dict[str, Any]]:
+        """
+        Frammento IR (formato incremental.py) per la frase, o None
+
+        Il DataFrame corrente è un import simbolico, risolto quando i
+        frammenti vengono ricuciti.
+        """
+        sentence = text.strip().rstrip('.!').strip()
+        for pattern, builder in self._rules(language):
+            match = pattern.fullmatch(sentence)
+            if match:
+                return _to_fragment(builder(match.groupdict()))
+        return None
+
+    def resolver(self, language: Language) -> Callable[[StatementSlot], Optional[Dict[str, Any]]]:
+        """Lookup per StatementPlan.resolve"""
+        return lambda slot: self.compile_statement(slot.text, language)
+
+    def _rules(self, language: Language):
+        """Grammatica della lingua, compilata una volta sola"""
+        if language.code not in self._compiled:
+            self._compiled[language.code] = self._compile_grammar(language)
+        return self._compiled[language.code]
+
+    def _compile_grammar(self, language: Language):
+        verbs: Dict[str, List[str]] = {}
+        for words in language.get_keywords().values():
+            for word in words:
+                op_type = KEYWORD_OPS.get(word)
+                if op_type:
+                    verbs.setdefault(op_type, []).append(word)
+        verbs['math.*'] = [w for t in sorted(AGGREGATE_OPS) for w in verbs.get(t, [])]
+
+        compiled = []
+        for template, builder in GRAMMARS.get(language.code, []):
+            slots = re.findall(r'<<([\w.*]+)>>', template)
+            if not all(verbs.get(slot) for slot in slots):
+                # La lingua non ha parole chiave per questa regola
+                continue
+
+            def expand(match):
+                words = sorted(verbs[match.group(1)], key=len, reverse=True)
+                return '(?:' + '|'.join(re.escape(w) for w in words) + ')'
+
+            pattern = re.sub(r'<<([\w.*]+)>>', expand, template)
+            compiled.append((re.compile(pattern, re.IGNORECASE), builder))
+        return compiled
+
+
+def _to_fragment(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Traduce $frame/$out_k nella numerazione locale dei frammenti"""
+    uses_frame = any(
+        value == "$frame"
+        for op in operations for value in op.get('params', {}).values()
+    )
+    imports = [[FRAME_IMPORT, 0, 0]] if uses_frame else []
+    offset = len(imports)
+
+    def mapping(name):
+        if name == "$frame":
+            return "$var_0"
+        if name.startswith("$out_"):
+            return f"$var_{offset + int(name[5:])}"
+        return name
+
+    return {
+        "imports": imports,
+        "outputs": sum(1 for op in operations if op.get('output')),
+        "operations": [rename_vars(op, mapping) for op in operations],
+    }
@@ -0,0 +1,144 @@
+"""
+Streaming - Parser JSON incrementale per risposte LLM in streaming
+
+L'IR arriva un frammento di testo alla volta. OperationScanner tiene
+traccia di stringhe e annidamento carattere per carattere e restituisce
+ogni elemento della lista "operations" appena la sua graffa si chiude,
+senza aspettare il resto della risposta.
+
+Lo stesso scanner guida la generazione vincolata di LocalGPUParser: sa
+se l'oggetto è iniziato o chiuso e di quale chiave si sta scrivendo il
+valore stringa.
+"""
+
+import json
+from typing import Dict, Any, List, Optional
+
+
+class OperationScanner:
+    """
+    Scanner incrementale dell'oggetto JSON di primo livello
+
+    Uso:
+        scanner = OperationScanner()
+        for chunk in stream:
+            for op in scanner.feed(chunk):
+                ...
+        ir = scanner.result()
+    """
+
+    def __init__(self, key: str = "operations", collect: bool = True):
+        self.key = key
+        self.collect = collect  # False: traccia solo la struttura
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None  # ultima stringa al primo livello
+        self._array_depth: Optional[int] = None  # profondità della lista cercata
+        self._item_start: Optional[int] = None
+        self._started = False
+        self._after_colon = False
+        self._last_key: Optional[str] = None
+        self._value_key: Optional[str] = None  # chiave della stringa aperta
+        self.complete = False  # l'oggetto di primo livello è chiuso
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def started(self) -> bool:
+        """L'oggetto di primo livello è stato aperto"""
+        return self._started
+
+    @property
+    def open_value_key(self) -> Optional[str]:
+        """Chiave del valore stringa in corso di scrittura (None altrimenti)"""
+        return self._value_key if self._in_string else None
+
+    @property
+    def open_value(self) -> str:
+        """Testo grezzo del valore stringa in corso di scrittura"""
+        return self._text[self._string_start + 1:] if self._in_string else ""
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Aggiunge testo e ritorna gli elementi completati nel frattempo"""
+        self._text += chunk
+        items = []
+        text = self._text
+
+        while self._pos < len(text) and not self.complete:
+            c = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    literal = text[self._string_start:self._pos + 1]
+                    if len(self._stack) == 1:
+                        self._last_string = literal
+                    if self._value_key is None:
+                        self._last_key = literal
+
+            elif c == '"':
+                self._in_string = True
+                self._string_start = self._pos
+                self._value_key = self._decode_key(self._last_key) if self._after_colon else None
+                self._after_colon = False
+
+            elif c == ':':
+                self._after_colon = True
+
+            elif c == ',':
+                self._after_colon = False
+
+            elif c in '{[':
+                self._after_colon = False
+                if not self._stack and c == '{':
+                    self._started = True
+                elif c == '[' and len(self._stack) == 1 and self._array_depth is None \
+                        and self._is_key(self._last_string):
+                    self._array_depth = 2
+                elif c == '{' and self._array_depth == len(self._stack):
+                    self._item_start = self._pos
+                self._stack.append(c)
+
+            elif c in '}]' and self._stack:
+                self._stack.pop()
+                depth = len(self._stack)
+                if c == '}' and self._item_start is not None and depth == self._array_depth:
+                    if self.collect:
+                        items.append(json.loads(text[self._item_start:self._pos + 1]))
+                    self._item_start = None
+                elif c == ']' and self._array_depth is not None and depth == self._array_depth - 1:
+                    self._array_depth = -1  # lista chiusa: niente altri elementi
+                elif depth == 0 and self._started:
+                    self.complete = True
+
+            self._pos += 1
+
+        return items
+
+    def result(self) -> Dict[str, Any]:
+        """Oggetto completo (solleva JSONDecodeError se incompleto)"""
+        end = self._pos if self.complete else len(self._text)
+        start = self._text.find('{')
+        return json.loads(self._text[max(start, 0):end])
+
+    def _is_key(self, literal: Optional[str]) -> bool:
+        return self._decode_key(literal) == self.key
+
+    @staticmethod
+    def _decode_key(literal: Optional[str]) -> Optional[str]:
+        if literal is None:
+            return None
+        try:
+            return json.loads(literal)
+        except ValueError:
+            return None
@@ -4,6 +4,7 @@ IR Validator - Valida Intermediate Representation
 
 from typing import Dict, Any, List
 from .errors import ValidationError
+from oratio.tracing import traced
 
 
 class IRValidator:
@@ -12,6 +13,7 @@ class IRValidator:
     REQUIRED_FIELDS = ['version', 'operations']
     SUPPORTED_VERSIONS = ['1.0']
     
+    @traced("IRValidator.validate")
     def validate(self, ir: Dict[str, Any]) -> bool:
         """
         Valida IR completo
@@ -39,6 +41,28 @@ class IRValidator:
         
         return True
     
+    def validate_operation(self, op: Dict[str, Any], index: int, defined_vars: set) -> bool:
+        """
+        Valida una singola operazione ricevuta in streaming
+        
+        Le variabili usate devono essere definite dalle operazioni
+        precedenti; l'output dell'operazione viene aggiunto a `defined_vars`.
+        
+        Raises:
+            ValidationError se non valida
+        """
+        self._check_operation(op, index)
+        
+        for value in op.get('params', {}).values():
+            if isinstance(value, str) and value.startswith('$') and value not in defined_vars:
+                raise ValidationError(
+                    f"Variabile non definita: {value} in operazione {op['type']}"
+                )
+        
+        if op.get('output'):
+            defined_vars.add(op['output'])
+        return True
+    
     def _check_required_fields(self, ir: Dict[str, Any]):
         """Verifica campi richiesti"""
         for field in self.REQUIRED_FIELDS:
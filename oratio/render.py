@@ -0,0 +1,183 @@
+"""
+Render - Resa leggibile degli eventi del Runtime
+
+ConsoleRenderer è il sink degli eventi (runtime/events.py) usato da
+`oratio run` e dal REPL: trasforma ogni evento nelle righe di
+avanzamento ("▶ data.filter...", "✓ Filtrate: 12 righe"). Il
+playground restituisce gli eventi come JSON (Event.record) insieme al
+testo di render().
+Con progress=False mostra solo quello che lo script stampa (io.print,
+data.show, data.describe), senza avanzamento.
+"""
+
+import sys
+from typing import Any, Callable, Dict, Optional, TextIO
+
+from oratio.runtime.events import Event
+
+
+# Aggregazioni: etichetta e se mostrare due decimali
+AGGREGATES = {
+    'count': ('Conteggio', False),
+    'sum': ('Somma', True),
+    'mean': ('Media', True),
+    'min': ('Minimo', False),
+    'max': ('Massimo', False),
+    'median': ('Mediana', True),
+    'var': ('Varianza', True),
+    'std': ('Deviazione standard', True),
+}
+
+# Eventi che sono output dello script (mostrati anche senza avanzamento)
+OUTPUT_EVENTS = ('printed', 'frame')
+
+
+def _decimals(value: Any) -> str:
+    try:
+        return f"{value:.2f}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _run_start(e: Event) -> str:
+    if e['stream']:
+        return "\n⚡ Esecuzione in streaming...\n"
+    parallel = f" ({e['jobs']} in parallelo)" if e['jobs'] > 1 else ""
+    text = f"\n⚡ Esecuzione {e['operations']} operazioni{parallel}...\n"
+    scans = e['scans']
+    if scans and scans['scans_after'] < scans['scans_before']:
+        text += f"\n🔗 Aggregazioni fuse: {scans['scans_before']} letture → {scans['scans_after']}\n"
+    return text
+
+
+def _run_end(e: Event) -> str:
+    if e['stream']:
+        return f"\n✅ Esecuzione completata ({e['operations']} operazioni)\n"
+    return "\n✅ Esecuzione completata\n"
+
+
+def _loaded(e: Event) -> str:
+    notes = list(e.get('notes') or [])
+    if e.get('pushed'):
+        notes.append(f"{e['pushed']} filtri in lettura")
+    return (f"    ✓ Caricato: {e['rows']} righe, {e['columns']} colonne"
+            + (f" ({', '.join(notes)})" if notes else ""))
+
+
+def _saved(e: Event) -> str:
+    if e.get('chunked'):
+        return f"    ✓ Salvato: {e['path']} ({e['rows']} righe, a blocchi)"
+    return f"    ✓ Salvato: {e['path']}"
+
+
+def _aggregate(e: Event) -> str:
+    label, decimals = AGGREGATES.get(e['function'], (e['function'], False))
+    value = _decimals(e['value']) if decimals else e['value']
+    return f"    ✓ {label}: {value}"
+
+
+def _shape(e: Event) -> str:
+    shape = e['shape']
+    if len(shape) == 2:
+        return f"    ✓ Dimensioni: {shape[0]} righe × {shape[1]} colonne"
+    return f"    ✓ Lunghezza: {shape[0]}"
+
+
+def _filled(e: Event) -> str:
+    how = f" ({e['method']})" if e.get('method') else f" (con {e['value']})"
+    return f"    ✓ Valori mancanti riempiti: {e['missing']}{how}"
+
+
+def _case(e: Event) -> str:
+    if 'text' in e.data:
+        return f"    ✓ {e['text']}"
+    return (f"    ✓ Testo {'maiuscolo' if e['case'] == 'upper' else 'minuscolo'}: "
+            f"{', '.join(map(str, e['columns'])) or 'nessuna colonna di testo'}")
+
+
+def _planned(e: Event) -> str:
+    if e['what'] == 'read':
+        columns = e.get('columns')
+        return (f"    ✓ Lettura pianificata: {e['detail']}"
+                + (f" (colonne: {', '.join(columns)})" if columns else ""))
+    if e['what'] == 'filter':
+        return f"    ✓ Filtro pianificato: {e['detail']}"
+    return f"    ✓ Ordinamento pianificato: {e['detail']}"
+
+
+def _drawn(e: Event) -> str:
+    color, points = e['color'], e['points']
+    if e['shape'] == 'line':
+        (x1, y1), (x2, y2) = points
+        return f"    ✓ Linea {color} disegnata da ({x1},{y1}) a ({x2},{y2})"
+    x, y = points[0]
+    if e['shape'] == 'circle':
+        return f"    ✓ Cerchio {color} disegnato in ({x}, {y}), raggio {e['radius']}"
+    return f"    ✓ Punto {color} disegnato in ({x}, {y})"
+
+
+RENDERERS: Dict[str, Callable[[Event], Optional[str]]] = {
+    'run.start': _run_start,
+    'run.end': _run_end,
+    'op.start': lambda e: f"  ▶ {e['type']}...",
+    'op.end': lambda e: None,
+    'loaded': _loaded,
+    'saved': _saved,
+    'printed': lambda e: f"    📄 {e['text']}",
+    'frame': lambda e: f"\n{e['frame']}\n",
+    'filtered': lambda e: f"    ✓ Filtrate: {e['rows']} righe",
+    'aggregate': _aggregate,
+    'sorted': lambda e: f"    ✓ Ordinato: {'OK' if e['rows'] is None else e['rows']}",
+    'grouped': lambda e: f"    ✓ Raggruppato per: {e['by']}",
+    'chart': lambda e: f"    ✓ Grafico salvato: {e['path']}" if e['path'] else "    ✓ Grafico mostrato",
+    'head': lambda e: f"    ✓ Prime {e['n']} righe" if e['unit'] == 'righe' else f"    ✓ Primi {e['n']} elementi",
+    'tail': lambda e: f"    ✓ Ultime {e['n']} righe",
+    'shape': _shape,
+    'columns': lambda e: f"    ✓ Colonne: {', '.join(map(str, e['columns']))}",
+    'sample': lambda e: f"    ✓ Campione: {e['rows']} {e['unit']}",
+    'unique': lambda e: f"    ✓ Valori unici: {e['values']}",
+    'counted': lambda e: f"    ✓ Valori distinti: {e['values']}",
+    'dropped': lambda e: f"    ✓ Colonne eliminate: {', '.join(map(str, e['columns']))}",
+    'renamed': lambda e: "    ✓ Colonne rinominate: "
+                         + ', '.join(f"{old} → {new}" for old, new in e['mapping'].items()),
+    'filled': _filled,
+    'dropped_na': lambda e: f"    ✓ Righe eliminate: {e['removed']}, rimaste {e['rows']}",
+    'case': _case,
+    'planned': _planned,
+    'canvas': lambda e: f"    ✓ Canvas creato: {e['width']}x{e['height']}px",
+    'drawn': _drawn,
+    'image': lambda e: f"    ✓ Immagine salvata: {e['path']}",
+}
+
+
+def render(event: Event, progress: bool = True) -> Optional[str]:
+    """Testo dell'evento (None se non va mostrato)"""
+    if not progress:
+        if event.kind == 'printed':
+            return str(event['text'])
+        if event.kind == 'frame':
+            return str(event['frame'])
+        return None
+    renderer = RENDERERS.get(event.kind)
+    return renderer(event) if renderer else None
+
+
+class ConsoleRenderer:
+    """
+    Sink che scrive gli eventi resi leggibili
+
+    Uso:
+        runtime = Runtime(events=ConsoleRenderer())
+        runtime = Runtime(events=ConsoleRenderer(stream=buffer, progress=False))
+
+    Senza `stream` scrive su sys.stdout (letto a ogni evento).
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, progress: bool = True):
+        self.stream = stream
+        self.progress = progress
+
+    def __call__(self, event: Event):
+        text = render(event, self.progress)
+        if text is not None:
+            print(text, file=self.stream or sys.stdout)
@@ -0,0 +1,187 @@
+"""
+IR Analysis - Dipendenze tra operazioni
+
+Funzioni di analisi statica dell'IR usate dal runtime: riferimenti a
+variabili, risoluzione delle sorgenti implicite ("ultima variabile") e
+grafo delle dipendenze per l'esecuzione parallela.
+"""
+
+import re
+import inspect
+from pathlib import Path
+from typing import Dict, Any, List, Set, Optional, Callable, Iterable
+
+
+VAR_REF = re.compile(r'\$[A-Za-z_]\w*')
+
+# Parametri che nominano file letti o scritti
+PATH_PARAMS = ('file_path', 'filename', 'save_as')
+
+# Operazioni che condividono lo stato di matplotlib e del canvas: sempre in ordine
+SERIAL_PREFIXES = ('viz.',)
+
+
+def var_refs(value: Any) -> Set[str]:
+    """Variabili ($nome) citate in un valore, anche dentro stringhe annidate"""
+    refs: Set[str] = set()
+    if isinstance(value, str):
+        refs.update(VAR_REF.findall(value))
+    elif isinstance(value, dict):
+        for item in value.values():
+            refs |= var_refs(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            refs |= var_refs(item)
+    return refs
+
+
+def uses_implicit_source(op: Dict[str, Any], handler: Optional[Callable]) -> bool:
+    """
+    L'operazione ricade sull'ultima variabile in memoria?
+
+    Vale per gli handler con parametro `source` chiamati senza
+    source/data, e per io.print senza nulla da stampare.
+    """
+    params = op.get('params', {})
+    if op.get('type') == 'io.print':
+        return not any(params.get(k) is not None for k in ('value', 'message', 'template'))
+    if handler is None or params.get('source') is not None or params.get('data') is not None:
+        return False
+    try:
+        return 'source' in inspect.signature(handler).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def resolve_implicit_sources(operations: List[Dict[str, Any]], handlers: Dict[str, Callable],
+                             last_var: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Copia delle operazioni con le sorgenti implicite rese esplicite
+
+    La sorgente implicita è l'ultima variabile prodotta (Runtime.last_var);
+    `last_var` è quella prodotta prima di queste operazioni. Le operazioni
+    senza alcuna variabile precedente restano implicite.
+    """
+    resolved = []
+    for op in operations:
+        if last_var is not None and uses_implicit_source(op, handlers.get(op.get('type'))):
+            params = dict(op.get('params', {}))
+            params.pop('data', None)
+            params['value' if op['type'] == 'io.print' else 'source'] = last_var
+            op = {**op, 'params': params}
+        resolved.append(op)
+        if op.get('output'):
+            last_var = op['output']
+    return resolved
+
+
+def _paths(op: Dict[str, Any]) -> Set[str]:
+    params = op.get('params', {})
+    return {
+        str(Path(params[name]).expanduser().resolve())
+        for name in PATH_PARAMS if isinstance(params.get(name), str)
+    }
+
+
+def is_barrier(op: Dict[str, Any], handler: Optional[Callable]) -> bool:
+    """Operazione da eseguire da sola: sconosciuta o con sorgente ancora implicita"""
+    return handler is None or uses_implicit_source(op, handler)
+
+
+def dependencies(operations: List[Dict[str, Any]], handlers: Dict[str, Callable]) -> List[Set[int]]:
+    """
+    Per ogni operazione, gli indici delle operazioni da attendere
+
+    Le operazioni vanno prima passate a resolve_implicit_sources. Oltre
+    ai dati (lettura dopo scrittura) si rispettano: riscritture della
+    stessa variabile, file condivisi, operazioni grafiche in sequenza, e
+    le barriere (vedi is_barrier), che attendono tutte le precedenti.
+    """
+    deps: List[Set[int]] = []
+    last_writer: Dict[str, int] = {}
+    readers: Dict[str, List[int]] = {}
+    last_path_op: Dict[str, int] = {}
+    last_serial: Optional[int] = None
+    last_barrier: Optional[int] = None
+
+    for i, op in enumerate(operations):
+        op_deps: Set[int] = set()
+        op_type = op.get('type', '')
+        handler = handlers.get(op_type)
+
+        barrier = is_barrier(op, handler)
+        if barrier:
+            op_deps.update(range(i))
+        elif last_barrier is not None:
+            op_deps.add(last_barrier)
+
+        for ref in var_refs(op.get('params', {})):
+            if ref in last_writer:
+                op_deps.add(last_writer[ref])
+            readers.setdefault(ref, []).append(i)
+
+        output = op.get('output')
+        if output:
+            # Riscrittura: dopo chi legge o scrive il valore precedente
+            op_deps.update(r for r in readers.get(output, []) if r != i)
+            if output in last_writer:
+                op_deps.add(last_writer[output])
+            last_writer[output] = i
+            readers[output] = []
+
+        for path in _paths(op):
+            if path in last_path_op:
+                op_deps.add(last_path_op[path])
+            last_path_op[path] = i
+
+        if op_type.startswith(SERIAL_PREFIXES):
+            if last_serial is not None:
+                op_deps.add(last_serial)
+            last_serial = i
+
+        if barrier:
+            last_barrier = i
+        deps.append(op_deps)
+
+    return deps
+
+
+def exported_vars(ir: Dict[str, Any]) -> Set[str]:
+    """Variabili da tenere in memoria a fine esecuzione ("exports" o "export": true)"""
+    exports = set(ir.get('exports', []))
+    exports.update(op['output'] for op in ir.get('operations', [])
+                   if op.get('export') and op.get('output'))
+    return exports
+
+
+def last_uses(operations: List[Dict[str, Any]], handlers: Dict[str, Callable],
+              exports: Iterable[str] = ()) -> List[List[str]]:
+    """
+    Per ogni operazione, le variabili da liberare subito dopo
+
+    Le operazioni vanno prima passate a resolve_implicit_sources. Una
+    variabile muore dopo il suo ultimo uso (o subito, se non è mai
+    usata). Le operazioni sconosciute o con sorgente ancora implicita
+    possono leggere qualsiasi variabile: le tengono tutte in vita.
+    """
+    exports = set(exports)
+    last: Dict[str, int] = {}
+
+    for i, op in enumerate(operations):
+        handler = handlers.get(op.get('type'))
+        if handler is None or uses_implicit_source(op, handler):
+            uses = set(last)
+        else:
+            uses = var_refs(op.get('params', {}))
+        for ref in uses:
+            if ref in last:
+                last[ref] = i
+        # Una riscrittura sostituisce il valore precedente: conta l'ultima
+        if op.get('output'):
+            last[op['output']] = i
+
+    free: List[List[str]] = [[] for _ in operations]
+    for var, index in last.items():
+        if var not in exports:
+            free[index].append(var)
+    return free
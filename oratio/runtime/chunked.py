@@ -0,0 +1,306 @@
+"""
+Chunked - Esecuzione a blocchi per CSV più grandi della memoria
+
+In modalità chunked (Runtime(chunked=True), `oratio run --chunked`) i
+piani lazy (lazy.py) non vengono mai materializzati per intero:
+
+- il CSV è letto a blocchi di CHUNK_ROWS righe e ogni blocco attraversa
+  i filtri;
+- somma, conteggio, media, minimo, massimo, varianza e deviazione
+  standard sono calcolati incrementalmente;
+- io.write_csv scrive il risultato blocco per blocco;
+- data.sort diventa un merge sort esterno: sequenze ordinate di
+  SORT_RUN_ROWS righe vengono salvate su disco e poi fuse; seguito da
+  data.head tiene solo le prime n righe, senza scrivere su disco.
+
+Le altre operazioni ricevono i dati materializzati (lazy.py).
+"""
+
+import os
+import tempfile
+from typing import Dict, Any, Iterator, List, Optional, Callable
+
+import numpy as np
+import pandas as pd
+
+from .lazy import LazyFrame
+
+
+CHUNK_ROWS = 100_000
+SORT_RUN_ROWS = 1_000_000
+
+
+# === FLUSSO DI BLOCCHI ===
+
+def iter_chunks(frame: LazyFrame, columns: Optional[List[str]] = None,
+                ordered: bool = True) -> Iterator[pd.DataFrame]:
+    """Blocchi del piano, nell'ordine del piano (ordered=False: ordinamenti ignorati)"""
+    if frame._frame is not None:
+        yield frame._frame if columns is None else frame._frame[columns]
+        return
+
+    steps = list(frame.steps)
+    if not ordered and not any(step[0] in ('head', 'tail') for step in steps):
+        steps = [step for step in steps if step[0] != 'sort']
+
+    stream = pd.read_csv(frame.file_path, usecols=frame._usecols(columns, steps),
+                         chunksize=CHUNK_ROWS)
+    while steps:
+        step = steps.pop(0)
+        if step[0] == 'filter':
+            stream = _filtered(stream, step[2])
+        elif step[0] == 'sort' and steps and steps[0][0] == 'head':
+            stream = _top(stream, step[1], step[2], steps.pop(0)[1])
+        elif step[0] == 'sort':
+            stream = external_sort(stream, step[1], step[2])
+        elif step[0] == 'head':
+            stream = _head(stream, step[1])
+        else:
+            stream = _tail(stream, step[1])
+
+    for chunk in stream:
+        yield chunk if columns is None else chunk[columns]
+
+
+def _filtered(stream, mask: Callable) -> Iterator[pd.DataFrame]:
+    for chunk in stream:
+        yield chunk[mask(chunk)]
+
+
+def _head(stream, n: int) -> Iterator[pd.DataFrame]:
+    for chunk in stream:
+        if n <= 0:
+            break
+        yield chunk.head(n)
+        n -= len(chunk)
+
+
+def _tail(stream, n: int) -> Iterator[pd.DataFrame]:
+    last = None
+    for chunk in stream:
+        last = chunk if last is None else pd.concat([last, chunk]).tail(n)
+    if last is not None:
+        yield last.tail(n)
+
+
+def _top(stream, column: str, ascending: bool, n: int) -> Iterator[pd.DataFrame]:
+    """Prime n righe dell'ordinamento, tenendone in memoria al più n per blocco"""
+    best = None
+    for chunk in stream:
+        merged = chunk if best is None else pd.concat([best, chunk])
+        best = merged.sort_values(by=column, ascending=ascending, kind='stable').head(n)
+    if best is not None:
+        yield best
+
+
+def external_sort(stream, column: str, ascending: bool = True) -> Iterator[pd.DataFrame]:
+    """
+    Merge sort esterno
+
+    Ordina sequenze di SORT_RUN_ROWS righe in memoria e, se i dati non
+    stanno in una sola, le salva su disco (file temporanei) e le fonde a
+    blocchi: a ogni passo emette le righe con chiave non oltre l'ultima
+    chiave letta dalla sequenza più indietro.
+    """
+    run, rows = [], 0
+    with tempfile.TemporaryDirectory(prefix="oratio-sort-") as spill:
+        runs = []
+        for chunk in stream:
+            run.append(chunk)
+            rows += len(chunk)
+            if rows >= SORT_RUN_ROWS:
+                runs.append(_spill(run, column, ascending, spill, len(runs)))
+                run, rows = [], 0
+
+        if not runs:
+            if run:
+                yield pd.concat(run).sort_values(by=column, ascending=ascending, kind='stable')
+            return
+        if run:
+            runs.append(_spill(run, column, ascending, spill, len(runs)))
+
+        yield from _merge(runs, column, ascending)
+
+
+def _spill(run: List[pd.DataFrame], column: str, ascending: bool, directory: str, index: int) -> List[str]:
+    """Salva una sequenza ordinata in pezzi da CHUNK_ROWS righe (pickle: veloce, tipi intatti)"""
+    ordered = pd.concat(run).sort_values(by=column, ascending=ascending, kind='stable')
+    paths = []
+    for start in range(0, len(ordered), CHUNK_ROWS):
+        path = os.path.join(directory, f"run_{index}_{len(paths)}.pkl")
+        ordered.iloc[start:start + CHUNK_ROWS].to_pickle(path)
+        paths.append(path)
+    return paths
+
+
+def _read_run(paths: List[str]) -> Iterator[pd.DataFrame]:
+    for path in paths:
+        yield pd.read_pickle(path)
+        os.unlink(path)
+
+
+def _merge(runs: List[List[str]], column: str, ascending: bool) -> Iterator[pd.DataFrame]:
+    # Le chiavi nulle (in fondo a ogni sequenza) restano fuori dal confronto
+    # con il limite e vengono emesse alla fine, come na_position='last'
+    readers = {i: _read_run(paths) for i, paths in enumerate(runs)}
+    last: Dict[int, Any] = {}
+    nulls: Dict[int, List[pd.DataFrame]] = {i: [] for i in readers}
+    pending = []
+
+    def pull(i):
+        while True:
+            block = next(readers[i], None)
+            if block is None:
+                del readers[i]
+                last.pop(i, None)
+                return
+            missing = block[column].isna()
+            if missing.any():
+                nulls[i].append(block[missing])
+                block = block[~missing]
+            if not block.empty:
+                pending.append(block)
+                last[i] = block[column].iloc[-1]
+                return
+
+    for i in list(readers):
+        pull(i)
+
+    while pending:
+        merged = pd.concat(pending).sort_values(by=column, ascending=ascending, kind='stable')
+        if not last:
+            yield merged
+            break
+        bound = min(last.values()) if ascending else max(last.values())
+        ready = merged[column] <= bound if ascending else merged[column] >= bound
+        yield merged[ready]
+        pending = [merged[~ready]]
+        # Le sequenze arrivate al limite vanno lette ancora
+        for i in [i for i, key in last.items() if key == bound]:
+            pull(i)
+
+    for i in sorted(nulls):
+        if nulls[i]:
+            yield pd.concat(nulls[i])
+
+
+# === AGGREGAZIONI INCREMENTALI ===
+
+class RunningStats:
+    """
+    Conteggio, somma, minimo, massimo e varianza di una serie, un blocco
+    alla volta (varianze combinate con la formula di Chan)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values: pd.Series):
+        values = values.dropna()
+        n = len(values)
+        if n == 0:
+            return
+        total = values.sum()
+        mean = total / n
+        m2 = float(((values - mean) ** 2).sum())
+        delta = mean - self.mean
+        count = self.count + n
+        self.m2 += m2 + delta ** 2 * self.count * n / count
+        self.mean += delta * n / count
+        self.count = count
+        self.total += total
+        self.min = values.min() if self.min is None else min(self.min, values.min())
+        self.max = values.max() if self.max is None else max(self.max, values.max())
+
+    def var(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+
+def _numeric(chunk: pd.DataFrame) -> bool:
+    """Tutte le colonne del blocco sono numeriche (RunningStats le gestisce)"""
+    return chunk.select_dtypes('number').shape[1] == chunk.shape[1]
+
+
+def column_stats(frame: LazyFrame, column: str):
+    """
+    (righe, RunningStats della colonna) in una sola lettura
+
+    None se la colonna non è numerica: va aggregata materializzata.
+    """
+    rows, stats = 0, RunningStats()
+    for chunk in iter_chunks(frame, [column], ordered=False):
+        if not _numeric(chunk):
+            return None
+        rows += len(chunk)
+        stats.update(chunk[column])
+    return rows, stats
+
+
+def _aggregate(runtime, op_type: str, source: LazyFrame, column: str = None, **kwargs):
+    # Colonne di testo (anche in un solo blocco): NotImplemented, il
+    # runtime materializza e aggrega come in modalità normale
+    rows = 0
+    stats: Dict[str, RunningStats] = {}
+    for chunk in iter_chunks(source, [column] if column else ([] if op_type == 'math.count' else None),
+                             ordered=False):
+        rows += len(chunk)
+        if op_type != 'math.count':
+            if not _numeric(chunk):
+                return NotImplemented
+            for name in chunk.columns:
+                stats.setdefault(name, RunningStats()).update(chunk[name])
+
+    per_column = [stats.get(column, RunningStats())] if column else list(stats.values())
+    if op_type == 'math.count':
+        result = rows
+    elif op_type == 'math.sum':
+        result = sum(s.total for s in per_column)
+    elif op_type == 'math.mean':
+        # Senza colonna: media delle medie, come sul DataFrame
+        result = np.mean([s.mean if s.count else np.nan for s in per_column])
+    elif op_type == 'math.min':
+        # Colonna tutta nulla o flusso vuoto: NaN, come sul DataFrame
+        result = min((s.min for s in per_column if s.min is not None), default=float('nan'))
+    elif op_type == 'math.max':
+        result = max((s.max for s in per_column if s.max is not None), default=float('nan'))
+    elif op_type == 'math.var':
+        result = np.mean([s.var() for s in per_column])
+    else:
+        result = np.mean([np.sqrt(s.var()) for s in per_column])
+    runtime._emit('aggregate', function=op_type.split('.', 1)[1], value=result)
+    return result
+
+
+# === OPERAZIONI A BLOCCHI ===
+
+def _write_csv(runtime, op_type, source: LazyFrame, file_path: str = "output.csv", **kwargs):
+    rows = 0
+    header = True
+    for chunk in iter_chunks(source):
+        chunk.to_csv(file_path, index=False, mode='w' if header else 'a', header=header)
+        header = False
+        rows += len(chunk)
+    if header:
+        pd.read_csv(source.file_path, usecols=source.columns, nrows=0).to_csv(file_path, index=False)
+    runtime._emit('saved', path=file_path, rows=rows, chunked=True)
+    return file_path
+
+
+def _show(runtime, op_type, source: LazyFrame, n: int = 5, **kwargs):
+    if runtime.events is not None:
+        preview = pd.concat(list(_head(iter_chunks(source), n)) or [pd.DataFrame()])
+        runtime._emit('frame', frame=preview)
+    return source
+
+
+CHUNKED_OPERATIONS: Dict[str, Callable] = {
+    'io.write_csv': _write_csv,
+    'data.show': _show,
+    **{op_type: _aggregate for op_type in ('math.sum', 'math.count', 'math.mean', 'math.min',
+                                           'math.max', 'math.var', 'math.std')},
+}
@@ -0,0 +1,131 @@
+"""
+Columnar - File Parquet e Arrow (richiede pyarrow)
+
+- io.read_parquet / io.write_parquet: Parquet, letto in memory map
+- io.read_arrow / io.write_arrow: Arrow IPC (Feather v2) non compresso,
+  letto in memory map senza copie: le colonne numeriche senza valori
+  nulli del DataFrame puntano direttamente alle pagine del file
+- entrambe le letture accettano `columns` e leggono solo quelle colonne
+
+Copia Parquet dei CSV: con Runtime(csv_cache=True) la prima lettura di
+un CSV ne salva una copia Parquet in ORATIO_COLUMNAR_DIR (default
+~/.cache/oratio/columnar); le letture seguenti usano la copia finché
+mtime e dimensione del CSV non cambiano.
+"""
+
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+
+DEFAULT_SIDECAR_DIR = Path.home() / ".cache" / "oratio" / "columnar"
+
+
+def to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    DataFrame che condivide la memoria della tabella dove possibile
+
+    Table.to_pandas copia sempre le colonne numeriche; qui le colonne di
+    un solo blocco, numeriche e senza nulli diventano
+    viste (sola lettura) sui buffer Arrow.
+    """
+    metadata = table.schema.pandas_metadata or {}
+    if any(isinstance(index, str) for index in metadata.get('index_columns', [])):
+        return table.to_pandas()  # indice salvato da pandas: lo ricostruisce to_pandas
+
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        chunk = column.chunk(0) if column.num_chunks == 1 else None
+        if (chunk is not None and chunk.null_count == 0
+                and (pa.types.is_integer(chunk.type) or pa.types.is_floating(chunk.type))):
+            columns[name] = chunk.to_numpy(zero_copy_only=True)
+        else:
+            columns[name] = column.to_pandas()
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_parquet(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    return to_pandas(pq.read_table(file_path, columns=columns, memory_map=True))
+
+
+def write_parquet(frame: pd.DataFrame, file_path: str, compression: str = "snappy"):
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), file_path,
+                   compression=compression)
+
+
+def read_arrow(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    # La tabella tiene aperta la mappa del file finché servono i suoi buffer
+    # (feather.read_table copierebbe i dati in memoria)
+    with pa.memory_map(file_path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return to_pandas(table.select(columns) if columns else table)
+
+
+def write_arrow(frame: pd.DataFrame, file_path: str):
+    # Senza compressione e in un solo blocco: ogni colonna del file è un
+    # buffer contiguo, leggibile così com'è
+    feather.write_feather(frame.reset_index(drop=True), file_path, compression="uncompressed",
+                          chunksize=max(len(frame), 1))
+
+
+class SidecarCache:
+    """
+    Copie Parquet dei CSV, valide finché mtime e dimensione non cambiano
+
+    Il nome della copia contiene hash del percorso, mtime e dimensione
+    del CSV: una copia vecchia non viene mai servita, e viene cancellata
+    quando si salva quella nuova.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(
+            directory or os.getenv("ORATIO_COLUMNAR_DIR") or DEFAULT_SIDECAR_DIR
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _prefix(self, csv_path: str) -> str:
+        return hashlib.sha256(str(Path(csv_path).resolve()).encode("utf-8")).hexdigest()[:32]
+
+    def path(self, csv_path: str) -> Path:
+        stat = os.stat(csv_path)
+        return self.directory / f"{self._prefix(csv_path)}-{stat.st_mtime_ns}-{stat.st_size}.parquet"
+
+    def read_csv(self, csv_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """CSV letto dalla copia Parquet se valida, altrimenti letto e copiato"""
+        sidecar = self.path(csv_path)
+        if sidecar.exists():
+            try:
+                frame = read_parquet(str(sidecar), columns)
+                self.hits += 1
+                return frame
+            except (OSError, pa.ArrowException):
+                pass  # copia danneggiata: si rilegge il CSV
+
+        self.misses += 1
+        frame = pd.read_csv(csv_path)
+        self._store(frame, csv_path, sidecar)
+        return frame[columns] if columns else frame
+
+    def _store(self, frame: pd.DataFrame, csv_path: str, sidecar: Path):
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for stale in self.directory.glob(f"{self._prefix(csv_path)}-*.parquet"):
+                stale.unlink(missing_ok=True)
+            # Scrittura atomica: altri processi vedono la copia intera o niente
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            os.close(fd)
+            write_parquet(frame, tmp)
+            os.replace(tmp, sidecar)
+        except (OSError, pa.ArrowException):
+            # La cache è un'ottimizzazione: un errore non blocca la lettura
+            if tmp:
+                Path(tmp).unlink(missing_ok=True)
@@ -0,0 +1,142 @@
+"""
+Compiled - IR compilato in una sequenza di chiamate
+
+Interpretando l'IR, ogni operazione cerca il suo handler per tipo,
+scorre i parametri alla ricerca di variabili `$` e applica l'alias
+data -> source, a ogni esecuzione. La compilazione fa questo lavoro una
+volta sola: ogni operazione diventa una closure con l'handler già
+trovato, i parametri costanti già separati e le variabili come coppie
+(parametro, nome). Eseguire un programma compilato è un ciclo sulle
+closure.
+
+Runtime.compile pianifica l'IR (sorgenti esplicite, fusione, proiezioni,
+liberazione della memoria) e tiene i programmi in cache per contenuto
+dell'IR: eseguire di nuovo lo stesso IR non ripete né pianificazione né
+compilazione.
+"""
+
+from time import perf_counter
+from typing import Dict, Any, Callable, List, Optional
+
+from compiler.errors import RuntimeError as OratioRuntimeError  # percorso aggiunto da executor.py
+
+from .events import result_rows
+from .profiler import instrument
+
+
+class Program:
+    """IR pianificato e compilato per un Runtime"""
+
+    def __init__(self, operations: List[Dict[str, Any]], calls: List[Callable[[], Any]],
+                 steps: List[Callable[[], Any]], free_after: Optional[List[List[str]]],
+                 scans: Optional[Dict[str, int]]):
+        self.operations = operations  # operazioni pianificate
+        self.calls = calls  # esecuzione di ogni operazione
+        self.steps = steps  # esecuzione, eventi e salvataggio dell'output
+        self.free_after = free_after
+        self.scans = scans
+
+    def __len__(self):
+        return len(self.operations)
+
+
+def compile_operation(runtime, op: Dict[str, Any]) -> Callable[[], Any]:
+    """
+    Closure che esegue l'operazione come Runtime._execute_operation
+
+    Le variabili sono lette da `runtime.memory` a ogni chiamata; un tipo
+    non supportato solleva l'errore solo quando viene eseguito.
+    """
+    op_type = op['type']
+    params = op.get('params', {})
+    handler = runtime.operations.get(op_type)
+    memory = runtime.memory
+    lazy = runtime.lazy
+    execute_lazy = runtime._execute_lazy
+
+    # Parametri costanti e variabili, con l'alias data -> source già applicato
+    alias = 'data' in params and 'source' not in params
+    constants: Dict[str, Any] = {}
+    slots = []
+    for key, value in params.items():
+        if alias and key == 'data':
+            key = 'source'
+        if isinstance(value, str) and value.startswith('$'):
+            slots.append((key, value))
+        else:
+            constants[key] = value
+
+    if handler is not None and not slots and not lazy:
+        def call():
+            try:
+                return handler(**constants)
+            except OratioRuntimeError:
+                raise
+            except Exception as e:
+                raise OratioRuntimeError(f"Errore durante esecuzione: {e}", operation=op_type)
+        return call
+
+    def call():
+        try:
+            resolved = dict(constants)
+            for key, name in slots:
+                resolved[key] = memory.get(name)
+
+            if lazy:
+                result = execute_lazy(op_type, resolved)
+                if result is not NotImplemented:
+                    return result
+
+            if handler is None:
+                raise OratioRuntimeError(f"Operazione non supportata: {op_type}", operation=op_type)
+            return handler(**resolved)
+
+        except OratioRuntimeError:
+            raise
+        except Exception as e:
+            raise OratioRuntimeError(f"Errore durante esecuzione: {e}", operation=op_type)
+    return call
+
+
+def compile_step(runtime, op: Dict[str, Any], call: Callable[[], Any],
+                 index: int = None) -> Callable[[], Any]:
+    """Closure che esegue l'operazione come Runtime._step"""
+    output = op.get('output')
+    store = runtime._store
+
+    if runtime.events is None:
+        # Runtime silenzioso: nessun evento, nessuna misura
+        if not output:
+            return call
+
+        def step():
+            result = call()
+            store(output, result)
+            return result
+        return step
+
+    emit = runtime._emit
+    op_id, op_type = op.get('id'), op['type']
+
+    def step():
+        emit('op.start', index=index, id=op_id, type=op_type)
+        started = perf_counter()
+        result = call()
+        if output:
+            store(output, result)
+        emit('op.end', index=index, id=op_id, type=op_type,
+             seconds=perf_counter() - started, rows=result_rows(result))
+        return result
+    return step
+
+
+def compile_program(runtime, operations: List[Dict[str, Any]],
+                    free_after: Optional[List[List[str]]] = None,
+                    scans: Optional[Dict[str, int]] = None) -> Program:
+    """Compila operazioni già pianificate"""
+    calls = [compile_operation(runtime, op) for op in operations]
+    if runtime.hooks:
+        calls = [instrument(runtime, op, i, call) for i, (op, call) in enumerate(zip(operations, calls))]
+    steps = [compile_step(runtime, op, call, i) for i, (op, call) in enumerate(zip(operations, calls))]
+    return Program(operations, calls, steps, free_after, scans)
+
@@ -0,0 +1,131 @@
+"""
+Events - Eventi strutturati dell'esecuzione
+
+Il Runtime non stampa nulla: durante l'esecuzione produce eventi
+(inizio e fine del programma e di ogni operazione, righe, tempi, esiti
+delle operazioni) e li passa al sink indicato con Runtime(events=...).
+Un sink è qualsiasi callable che riceve un Event. Senza sink il Runtime
+è silenzioso e non costruisce né eventi né testi.
+
+La resa leggibile è compito di chi usa il Runtime (oratio/render.py per
+terminale e REPL); Event.record() dà la versione JSON (playground).
+
+Tipi di evento e dati:
+
+    run.start    operations, jobs, stream, scans (letture prima/dopo la fusione)
+    run.end      operations, seconds, stream
+    op.start     index, id, type
+    op.end       index, id, type, seconds, rows (None se non tabellare)
+
+    loaded       rows, columns, notes (es. "in cache"), pushed (filtri in lettura)
+    saved        path, rows (None se non noto), chunked
+    printed      text
+    frame        frame (anteprima già tagliata o valore da mostrare)
+    filtered     rows
+    aggregate    function (count, sum, mean, ...), value
+    sorted       rows
+    grouped      by
+    chart        path (None se mostrato a schermo)
+    head / tail  n, unit ('righe' o 'elementi')
+    shape        shape
+    columns      columns
+    sample       rows, unit
+    unique       values
+    counted      values
+    dropped      columns
+    renamed      mapping
+    filled       missing, method, value
+    dropped_na   removed, rows
+    case         case, columns (DataFrame) o text (stringa)
+    planned      what ('read', 'filter', 'sort'), detail, columns
+    canvas       width, height
+    drawn        shape ('point', 'circle', 'line'), color, points, radius
+    image        path
+"""
+
+import math
+import time
+import threading
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class Event:
+    """Evento dell'esecuzione: tipo, dati e istante (time.perf_counter)"""
+
+    __slots__ = ('kind', 'data', 'time')
+
+    def __init__(self, kind: str, data: Dict[str, Any], at: Optional[float] = None):
+        self.kind = kind
+        self.data = data
+        self.time = time.perf_counter() if at is None else at
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def record(self) -> Dict[str, Any]:
+        """Evento come dizionario serializzabile in JSON (tipo, istante, dati)"""
+        return {'kind': self.kind, 'time': self.time,
+                'data': {key: _plain(value) for key, value in self.data.items()}}
+
+    def __repr__(self):
+        return f"Event({self.kind!r}, {self.data!r})"
+
+
+Sink = Callable[[Event], None]
+
+
+def _plain(value: Any) -> Any:
+    """Valore di un evento in tipi JSON (anteprime come colonne e righe)"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None  # NaN non è JSON
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, pd.DataFrame):
+        split = value.to_dict(orient='split')
+        return {'columns': [str(c) for c in split['columns']],
+                'index': [_plain(i) for i in split['index']],
+                'data': [[_plain(v) for v in row] for row in split['data']]}
+    if isinstance(value, pd.Series):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        return _plain(value.item())
+    return str(value)
+
+
+def result_rows(value: Any) -> Optional[int]:
+    """Righe di un risultato tabellare (None per gli altri valori)"""
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+class EventLog:
+    """Sink che conserva gli eventi (test, server, analisi a posteriori)"""
+
+    def __init__(self):
+        self.events: List[Event] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event):
+        with self._lock:
+            self.events.append(event)
+
+    def kinds(self) -> List[str]:
+        return [event.kind for event in self.events]
+
+    def of(self, kind: str) -> List[Event]:
+        """Eventi di un tipo, in ordine"""
+        return [event for event in self.events if event.kind == kind]
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
@@ -2,52 +2,323 @@
 Runtime Executor - Esegue IR
 """
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional
 from pathlib import Path
 import sys
 import os
+import json
+import time
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
 
 # Import errori
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from compiler.errors import RuntimeError as OratioRuntimeError
 
+from .analysis import resolve_implicit_sources, last_uses, exported_vars, VAR_REF
+from .resources import current_rss, peak_rss, reset_peak_rss
+from .lazy import LazyFrame, LAZY_OPERATIONS, plan_projections
+from .chunked import CHUNKED_OPERATIONS, column_stats
+from .optimizer import fuse_aggregates, AggregateCache
+from .frame_cache import FrameCache
+from .predicates import Predicate, compile_condition
+from .compiled import Program, compile_program
+from .events import Event, Sink, result_rows
+from .profiler import instrument
+from ..tracing import traced
+
 
 class Runtime:
     """
     Runtime che esegue Intermediate Representation
     """
     
-    def __init__(self):
+    # DataFrame letti, condivisi da tutti i Runtime del processo (REPL, API)
+    frames = FrameCache()
+    
+    # Programmi compilati tenuti in cache da ogni Runtime
+    PROGRAM_CACHE_SIZE = 64
+    
+    def __init__(self, jobs: int = 1, free_memory: bool = True, lazy: bool = False,
+                 chunked: bool = False, optimize: bool = True, csv_cache: bool = False,
+                 frame_cache: bool = False, events: Optional[Sink] = None,
+                 hooks: Optional[List[Any]] = None):
         self.memory = {}  # Variabili in memoria
+        self.last_var = None  # Ultima variabile prodotta (sorgente implicita)
+        self.last_value = None
+        self.canvas = {}  # Stato interno del disegno: 'fig' e 'ax'
         self.operations = self._register_operations()
+        self.jobs = jobs  # > 1: operazioni indipendenti in parallelo
+        self.free_memory = free_memory  # libera le variabili dopo l'ultimo uso
+        self.lazy = lazy or chunked  # CSV letti solo quando servono (vedi lazy.py)
+        self.chunked = chunked  # CSV elaborati a blocchi (vedi chunked.py)
+        self.optimize = optimize  # aggregazioni sorelle fuse (vedi optimizer.py)
+        self._aggregates = AggregateCache()
+        self.csv_cache = csv_cache  # copie Parquet dei CSV (vedi columnar.py)
+        self._sidecar = None
+        self.frame_cache = frame_cache  # file già letti da Runtime.frames
+        self.last_report = {}  # memoria dell'ultima esecuzione
+        self._programs = OrderedDict()  # IR -> Program (vedi compiled.py)
+        self._digests = OrderedDict()  # id(IR) -> impronta del contenuto (vedi _digest)
+        self.events = events  # sink degli eventi (vedi events.py); None: silenzioso
+        self.hooks = list(hooks or [])  # hook per operazione (vedi profiler.py)
     
+    @traced("Runtime.execute")
     def execute(self, ir: Dict[str, Any]) -> Any:
         """
         Esegue IR operation per operation
         
+        Con jobs > 1 le operazioni indipendenti vengono eseguite in
+        parallelo (DataflowScheduler); output ed errori restano in
+        ordine di programma.
+        
+        Con free_memory ogni variabile viene tolta da `memory` dopo il
+        suo ultimo uso, tranne quelle esportate dall'IR ("exports" o
+        "export": true). Il picco di RSS finisce in `last_report`.
+        
+        Con lazy i CSV diventano piani di lettura (LazyFrame) con le sole
+        colonne usate dallo script e i filtri applicati in lettura; con
+        chunked i piani vengono elaborati a blocchi, senza mai caricare
+        il file intero.
+        
+        Con optimize le aggregazioni della stessa colonna della stessa
+        variabile leggono la colonna una volta sola; le letture prima e
+        dopo la fusione finiscono in `last_report['scans']`.
+        
+        L'IR viene compilato (compile) una volta sola: le esecuzioni
+        seguenti dello stesso IR sono un ciclo sulle closure già pronte.
+        
+        L'avanzamento arriva come eventi al sink `events` (events.py);
+        senza sink l'esecuzione è silenziosa.
+        
         Args:
             ir: Intermediate Representation
             
         Returns:
             Risultato ultima operazione
         """
-        print(f"\n⚡ Esecuzione {len(ir['operations'])} operazioni...\n")
+        program = self.compile(ir)
+        operations = program.operations
+        free_after = program.free_after
+        scans = program.scans
+        
+        start_rss = current_rss()
+        peak_reset = reset_peak_rss()
+        started = time.perf_counter()
+        self._emit('run.start', operations=len(operations), jobs=self.jobs, stream=False, scans=scans)
+        
+        self._aggregates.clear()
+        if self.jobs > 1:
+            from .scheduler import DataflowScheduler
+            
+            result = DataflowScheduler(self, self.jobs).run(operations, free_after, program.calls)
+        else:
+            result = None
+            
+            if free_after:
+                release = self._release
+                for step, names in zip(program.steps, free_after):
+                    result = step()
+                    release(names)
+            else:
+                for step in program.steps:
+                    result = step()
+        
+        self.last_report = {
+            'start_rss': start_rss,
+            'peak_rss': peak_rss(),
+            'peak_reset': peak_reset,  # False: picco dall'avvio del processo
+            'freed': sum(map(len, free_after)) if free_after else 0,
+            'scans': scans,
+        }
+        
+        self._emit('run.end', operations=len(operations), seconds=time.perf_counter() - started,
+                   stream=False)
+        return result
+    
+    @traced("Runtime.compile")
+    def compile(self, ir: Dict[str, Any]) -> Program:
+        """
+        Pianifica e compila l'IR (vedi compiled.py)
+        
+        I programmi restano in cache per contenuto dell'IR, sorgente
+        implicita e opzioni del Runtime; gli handler sono quelli
+        registrati al momento della compilazione. L'impronta del
+        contenuto è calcolata una volta per oggetto IR (vedi _digest):
+        un IR modificato sul posto dopo l'esecuzione va passato come
+        copia.
+        """
+        digest = self._digest(ir)
+        key = None  # parametri non serializzabili: niente cache
+        if digest is not None:
+            last_var = self.last_var if self.last_var in self.memory else None
+            key = (digest, last_var, self.jobs, self.free_memory, self.lazy, self.chunked,
+                   self.optimize, self.csv_cache, self.frame_cache,
+                   self.events is None, bool(self.hooks))
+        
+        program = self._programs.get(key) if key else None
+        if program is not None:
+            self._programs.move_to_end(key)
+            return program
+        
+        operations = ir['operations']
+        free_after = None
+        scans = None
+        if self.jobs > 1 or self.free_memory or self.lazy or self.optimize:
+            # Sorgenti esplicite: le variabili lette restano vive fino all'uso
+            # (e in parallelo non c'è un "ultimo valore" da cui leggere)
+            operations = self._explicit_sources(operations)
+        if self.optimize:
+            operations, scans = fuse_aggregates(operations)
+        if self.lazy:
+            operations = plan_projections(operations, self)
+        if self.free_memory:
+            free_after = last_uses(operations, self.operations, exported_vars(ir))
+        
+        program = compile_program(self, operations, free_after, scans)
+        if key:
+            self._programs[key] = program
+            if len(self._programs) > self.PROGRAM_CACHE_SIZE:
+                self._programs.popitem(last=False)
+        return program
+    
+    def _digest(self, ir: Dict[str, Any]) -> Optional[str]:
+        """
+        Impronta del contenuto dell'IR (None se non serializzabile)
+        
+        Calcolata una volta per oggetto: le esecuzioni seguenti dello
+        stesso IR non lo riserializzano. Si ricalcola se cambia la lista
+        delle operazioni, non se cambiano i parametri sul posto.
+        """
+        operations = ir['operations']
+        entry = self._digests.get(id(ir))
+        if entry is not None and entry[0] is ir and entry[1] is operations \
+                and entry[2] == len(operations):
+            self._digests.move_to_end(id(ir))
+            return entry[3]
+        try:
+            text = json.dumps(ir, ensure_ascii=False)
+            digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+        except TypeError:
+            digest = None
+        # L'IR resta referenziato: il suo id non può essere riusato
+        self._digests[id(ir)] = (ir, operations, len(operations), digest)
+        if len(self._digests) > self.PROGRAM_CACHE_SIZE:
+            self._digests.popitem(last=False)
+        return digest
+    
+    @traced("Runtime.execute_stream")
+    def execute_stream(self, operations: Iterable[Dict[str, Any]]) -> Any:
+        """
+        Esegue le operazioni man mano che vengono prodotte
+        
+        `operations` (es. SemanticParser.parse_stream) viene consumato in
+        un thread separato: mentre un'operazione è in esecuzione, la
+        successiva può già arrivare dall'LLM. Le operazioni arrivano in
+        ordine, quindi i loro input sono sempre pronti.
+        
+        Args:
+            operations: Iterabile di operazioni IR
+            
+        Returns:
+            Risultato ultima operazione
+        """
+        start_rss = current_rss()
+        peak_reset = reset_peak_rss()
+        started = time.perf_counter()
+        self._emit('run.start', operations=None, jobs=1, stream=True, scans=None)
+        
+        ready = queue.Queue()
+        stop = threading.Event()
+        
+        def produce():
+            try:
+                for op in operations:
+                    ready.put((op, None))
+                    if stop.is_set():
+                        break
+            except BaseException as e:
+                ready.put((None, e))
+            else:
+                ready.put((None, None))
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
         
         result = None
+        count = 0
+        try:
+            while True:
+                op, error = ready.get()
+                if op is None:
+                    if error is not None:
+                        raise error
+                    break
+                result = self._step(op, count)
+                count += 1
+        finally:
+            stop.set()
+        
+        # Le operazioni arrivano una alla volta: niente analisi di liveness
+        self.last_report = {
+            'start_rss': start_rss,
+            'peak_rss': peak_rss(),
+            'peak_reset': peak_reset,
+            'freed': 0,
+        }
         
-        for op in ir['operations']:
-            print(f"  ▶ {op['type']}...")
+        self._emit('run.end', operations=count, seconds=time.perf_counter() - started, stream=True)
+        return result
+    
+    def _step(self, op: Dict[str, Any], index: int = None) -> Any:
+        """Esegue un'operazione e ne salva l'output in memoria"""
+        if self.events is not None:
+            self._emit('op.start', index=index, id=op.get('id'), type=op['type'])
+            started = time.perf_counter()
+        if self.hooks:
+            result = instrument(self, op, index, lambda: self._execute_operation(op))()
+        else:
             result = self._execute_operation(op)
-            
-            # Salva output in memoria
-            if 'output' in op and op['output']:
-                self.memory[op['output']] = result
         
-        print(f"\n✅ Esecuzione completata\n")
+        # Salva output in memoria
+        if 'output' in op and op['output']:
+            self._store(op['output'], result)
+        if self.events is not None:
+            self._emit('op.end', index=index, id=op.get('id'), type=op['type'],
+                       seconds=time.perf_counter() - started, rows=result_rows(result))
         return result
     
+    def add_hook(self, hook: Any) -> Any:
+        """Aggiunge un hook per operazione (before_operation/after_operation, vedi profiler.py)"""
+        self.hooks.append(hook)
+        return hook
+    
+    def _emit(self, kind: str, **data):
+        """Passa un evento al sink (niente se il Runtime è silenzioso)"""
+        if self.events is not None:
+            self.events(Event(kind, data))
+    
+    def _store(self, name: str, value: Any):
+        """Salva una variabile; diventa la sorgente implicita delle operazioni seguenti"""
+        self.memory[name] = value
+        self.last_var = name
+        self.last_value = value
+    
+    def _explicit_sources(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Operazioni con le sorgenti implicite sostituite dall'ultima variabile"""
+        last_var = self.last_var if self.last_var in self.memory else None
+        return resolve_implicit_sources(operations, self.operations, last_var)
+    
+    def _release(self, names: Iterable[str]):
+        """Toglie dalla memoria variabili non più usate"""
+        for name in names:
+            self.memory.pop(name, None)
+    
     def _execute_operation(self, op: Dict[str, Any]) -> Any:
         """Esegue singola operazione"""
         op_type = op['type']
@@ -57,6 +328,11 @@ class Runtime:
             # Risolvi variabili nei parametri
             resolved_params = self._resolve_params(params)
             
+            if self.lazy:
+                result = self._execute_lazy(op_type, resolved_params)
+                if result is not NotImplemented:
+                    return result
+            
             # Ottieni handler
             handler = self.operations.get(op_type)
             if not handler:
@@ -76,6 +352,30 @@ class Runtime:
                 operation=op_type
             )
     
+    def _execute_lazy(self, op_type: str, params: Dict[str, Any]) -> Any:
+        """
+        Esegue l'operazione sul piano lazy, se possibile
+        
+        Altrimenti materializza i LazyFrame nei parametri (in place) e
+        ritorna NotImplemented: si prosegue con l'operazione normale.
+        """
+        handler = LAZY_OPERATIONS.get(op_type)
+        if self.chunked and isinstance(params.get('source'), LazyFrame):
+            handler = CHUNKED_OPERATIONS.get(op_type, handler)
+        if handler is not None and (op_type == 'io.read_csv' or isinstance(params.get('source'), LazyFrame)):
+            result = handler(self, op_type, **params)
+            if result is not NotImplemented:
+                return result
+        for key, value in params.items():
+            if isinstance(value, LazyFrame):
+                params[key] = value.collect()
+        return NotImplemented
+    
+    def _lookup(self, ref: str) -> Any:
+        """Valore di una variabile citata in un testo (materializzato se lazy)"""
+        value = self.memory.get(ref, ref)
+        return value.collect() if isinstance(value, LazyFrame) else value
+    
     def _resolve_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Risolve variabili nei parametri"""
         resolved = {}
@@ -99,6 +399,10 @@ class Runtime:
             'io.read_csv': self._op_read_csv,
             'io.write_csv': self._op_write_csv,
             'io.print': self._op_print,
+            'io.read_parquet': self._op_read_parquet,
+            'io.write_parquet': self._op_write_parquet,
+            'io.read_arrow': self._op_read_arrow,
+            'io.write_arrow': self._op_write_arrow,
             # Data - Base
             'data.show': self._op_show,
             'data.filter': self._op_filter,
@@ -122,6 +426,7 @@ class Runtime:
             'math.mean': self._op_mean,
             'math.sum': self._op_sum,
             'math.count': self._op_count,
+            'math.aggregate': self._op_aggregate,
             # Math - Generated
             'math.min': self._op_math_min,
             'math.max': self._op_math_max,
@@ -146,10 +451,79 @@ class Runtime:
     
     def _op_read_csv(self, file_path: str, **kwargs) -> pd.DataFrame:
         """Carica CSV"""
-        df = pd.read_csv(file_path)
-        print(f"    ✓ Caricato: {len(df)} righe, {len(df.columns)} colonne")
+        notes = []
+        df = self._load(file_path, 'csv', lambda: self._read_csv(file_path, notes), notes)
+        self._emit('loaded', rows=len(df), columns=len(df.columns), notes=notes)
+        return df
+    
+    def _read_csv(self, file_path: str, notes: list) -> pd.DataFrame:
+        if not self.csv_cache:
+            return pd.read_csv(file_path)
+        if self._sidecar is None:
+            self._sidecar = self._columnar('io.read_csv').SidecarCache()
+        hits = self._sidecar.hits
+        df = self._sidecar.read_csv(file_path)
+        if self._sidecar.hits > hits:
+            notes.append("copia Parquet")
+        return df
+    
+    def _load(self, file_path: str, reader: str, read, notes: list, **options) -> pd.DataFrame:
+        """Lettura attraverso Runtime.frames, se la cache è attiva"""
+        if not self.frame_cache:
+            return read()
+        df, cached = self.frames.load(file_path, reader, read, **options)
+        if cached:
+            notes.append("in cache")
+        return df
+    
+    def _columnar(self, op_type: str):
+        """Modulo columnar.py (richiede pyarrow)"""
+        try:
+            from . import columnar
+        except ImportError:
+            raise OratioRuntimeError(
+                "Parquet e Arrow richiedono pyarrow (pip install oratio[columnar])",
+                operation=op_type
+            )
+        return columnar
+    
+    def _op_read_parquet(self, file_path: str, columns: list = None, **kwargs) -> pd.DataFrame:
+        """Carica Parquet (memory map, solo le colonne richieste)"""
+        columnar = self._columnar('io.read_parquet')
+        notes = []
+        df = self._load(file_path, 'parquet', lambda: columnar.read_parquet(file_path, columns), notes,
+                        columns=columns)
+        self._emit('loaded', rows=len(df), columns=len(df.columns), notes=notes)
+        return df
+    
+    def _op_write_parquet(self, source=None, file_path: str = "output.parquet", **kwargs):
+        """Salva Parquet"""
+        if source is None:
+            source = self.last_value
+        
+        if not isinstance(source, pd.DataFrame):
+            raise ValueError("Source deve essere un DataFrame")
+        self._columnar('io.write_parquet').write_parquet(source, file_path)
+        self._emit('saved', path=file_path, rows=len(source), chunked=False)
+        return file_path
+    
+    def _op_read_arrow(self, file_path: str, columns: list = None, **kwargs) -> pd.DataFrame:
+        """Carica Arrow IPC/Feather (memory map senza copie)"""
+        df = self._columnar('io.read_arrow').read_arrow(file_path, columns)
+        self._emit('loaded', rows=len(df), columns=len(df.columns), notes=[])
         return df
     
+    def _op_write_arrow(self, source=None, file_path: str = "output.arrow", **kwargs):
+        """Salva Arrow IPC/Feather"""
+        if source is None:
+            source = self.last_value
+        
+        if not isinstance(source, pd.DataFrame):
+            raise ValueError("Source deve essere un DataFrame")
+        self._columnar('io.write_arrow').write_arrow(source, file_path)
+        self._emit('saved', path=file_path, rows=len(source), chunked=False)
+        return file_path
+    
     def _op_print(self, value: Any = None, template: str = None, args: list = None, 
                   message: str = None, variables: dict = None, **kwargs):
         """Stampa output"""
@@ -157,18 +531,15 @@ class Runtime:
             # Messaggio con variabili da sostituire
             output = message
             
-            # Sostituisci $var_X direttamente nel messaggio
-            import re
-            for var_match in re.finditer(r'\$var_\d+', output):
-                var_ref = var_match.group()
-                var_value = self.memory.get(var_ref, var_ref)
-                output = output.replace(var_ref, str(var_value))
+            # Sostituisci le variabili ($var_X, $stmt_N_var_X) nel messaggio;
+            # i riferimenti sconosciuti (es. "$USD") restano come sono
+            output = VAR_REF.sub(lambda m: str(self._lookup(m.group())), output)
             
             # Sostituisci {nome} con valore da variables dict
             if variables:
                 for var_name, var_ref in variables.items():
                     if isinstance(var_ref, str) and var_ref.startswith('$'):
-                        var_value = self.memory.get(var_ref, var_ref)
+                        var_value = self._lookup(var_ref)
                     else:
                         var_value = var_ref
                     output = output.replace(f"{{{var_name}}}", str(var_value))
@@ -177,7 +548,7 @@ class Runtime:
             resolved_args = []
             for arg in args:
                 if isinstance(arg, str) and arg.startswith('$'):
-                    resolved_args.append(self.memory.get(arg, arg))
+                    resolved_args.append(self._lookup(arg))
                 else:
                     resolved_args.append(arg)
             output = template.format(*resolved_args)
@@ -185,75 +556,44 @@ class Runtime:
             output = value
         else:
             # Prendi ultima variabile
-            last_var = list(self.memory.values())[-1] if self.memory else None
-            output = last_var
+            output = self.last_value
         
-        print(f"    📄 {output}")
+        self._emit('printed', text=output)
         return output
     
     def _op_show(self, source=None, n: int = 5, **kwargs):
         """Mostra dati"""
         if source is None:
             # Mostra ultima variabile
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
-        if isinstance(source, pd.DataFrame):
-            print(f"\n{source.head(n)}\n")
-        else:
-            print(f"\n{source}\n")
+        if self.events is not None:
+            self._emit('frame', frame=source.head(n) if isinstance(source, pd.DataFrame) else source)
         
         return source
     
     def _op_filter(self, source=None, condition: Any = None, column: str = None, 
                    operator: str = None, value: Any = None, **kwargs) -> pd.DataFrame:
-        """Filtra dati"""
+        """Filtra dati (condizioni composte: vedi predicates.py)"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
-        
-        # Gestisci condition come stringa (es: "importo > 100")
-        if condition and isinstance(condition, str):
-            import re
-            # Parse "colonna operatore valore"
-            match = re.match(r'(\w+)\s*([><=!]+)\s*(.+)', condition)
-            if match:
-                column = match.group(1)
-                operator = match.group(2)
-                value = match.group(3).strip()
-                # Converti valore in numero se possibile
-                try:
-                    value = float(value)
-                except:
-                    pass
-        # Gestisci condition come dict
-        elif condition and isinstance(condition, dict):
-            column = condition.get('column', column)
-            operator = condition.get('operator', operator)
-            value = condition.get('value', value)
-        
-        if not all([column, operator, value is not None]):
-            raise ValueError(f"Filtro richiede column, operator e value")
-        
-        if operator == '>':
-            result = source[source[column] > value]
-        elif operator == '<':
-            result = source[source[column] < value]
-        elif operator == '==':
-            result = source[source[column] == value]
-        elif operator == '>=':
-            result = source[source[column] >= value]
-        elif operator == '<=':
-            result = source[source[column] <= value]
-        else:
-            raise ValueError(f"Operatore non supportato: {operator}")
+            source = self.last_value
         
-        print(f"    ✓ Filtrate: {len(result)} righe")
+        predicate = self._parse_filter(condition, column, operator, value)
+        result = source[predicate.mask(source)]
+        
+        self._emit('filtered', rows=len(result))
         return result
     
+    def _parse_filter(self, condition: Any = None, column: str = None,
+                      operator: str = None, value: Any = None) -> Predicate:
+        """Condizione del filtro compilata (ValueError se non valida)"""
+        return compile_condition(condition, column, operator, value)
+    
     def _op_mean(self, source=None, column: str = None, **kwargs) -> float:
         """Calcola media"""
         # Se source non specificato, usa ultima variabile
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             if column:
@@ -266,13 +606,13 @@ class Runtime:
             # È già un numero singolo
             result = float(source)
         
-        print(f"    ✓ Media: {result:.2f}")
+        self._emit('aggregate', function='mean', value=result)
         return result
     
     def _op_sum(self, source=None, column: str = None, **kwargs) -> float:
         """Calcola somma"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             if column:
@@ -282,13 +622,13 @@ class Runtime:
         else:
             result = sum(source)
         
-        print(f"    ✓ Somma: {result:.2f}")
+        self._emit('aggregate', function='sum', value=result)
         return result
     
     def _op_count(self, source=None, **kwargs) -> int:
         """Conta righe"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             result = len(source)
@@ -298,17 +638,17 @@ class Runtime:
             # È un numero singolo
             result = 1
         
-        print(f"    ✓ Conteggio: {result}")
+        self._emit('aggregate', function='count', value=result)
         return result
     
     def _op_write_csv(self, source=None, file_path: str = "output.csv", **kwargs):
         """Salva CSV"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             source.to_csv(file_path, index=False)
-            print(f"    ✓ Salvato: {file_path}")
+            self._emit('saved', path=file_path, rows=len(source), chunked=False)
         else:
             raise ValueError("Source deve essere un DataFrame")
         
@@ -317,7 +657,7 @@ class Runtime:
     def _op_sort(self, source=None, column: str = None, ascending: bool = True, **kwargs):
         """Ordina dati"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             if column:
@@ -327,17 +667,17 @@ class Runtime:
         else:
             result = sorted(source, reverse=not ascending)
         
-        print(f"    ✓ Ordinato: {len(result) if hasattr(result, '__len__') else 'OK'}")
+        self._emit('sorted', rows=len(result) if hasattr(result, '__len__') else None)
         return result
     
     def _op_group(self, source=None, by: str = None, **kwargs):
         """Raggruppa dati"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame) and by:
             result = source.groupby(by)
-            print(f"    ✓ Raggruppato per: {by}")
+            self._emit('grouped', by=by)
             return result
         else:
             raise ValueError("Serve DataFrame e colonna 'by'")
@@ -346,7 +686,7 @@ class Runtime:
                  title: str = "Grafico", save_as: str = None, **kwargs):
         """Crea grafico a linee"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         plt.figure(figsize=(10, 6))
         
@@ -365,10 +705,9 @@ class Runtime:
         
         if save_as:
             plt.savefig(save_as, dpi=150, bbox_inches='tight')
-            print(f"    ✓ Grafico salvato: {save_as}")
         else:
             plt.show()
-            print(f"    ✓ Grafico mostrato")
+        self._emit('chart', path=save_as)
         
         plt.close()
         return save_as if save_as else "displayed"
@@ -377,7 +716,7 @@ class Runtime:
                       title: str = "Grafico a Barre", save_as: str = None, **kwargs):
         """Crea grafico a barre"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         plt.figure(figsize=(10, 6))
         
@@ -396,10 +735,9 @@ class Runtime:
         
         if save_as:
             plt.savefig(save_as, dpi=150, bbox_inches='tight')
-            print(f"    ✓ Grafico salvato: {save_as}")
         else:
             plt.show()
-            print(f"    ✓ Grafico mostrato")
+        self._emit('chart', path=save_as)
         
         plt.close()
         return save_as if save_as else "displayed"
@@ -409,14 +747,14 @@ class Runtime:
     def _op_data_head(self, source=None, n: int = 5, **kwargs):
         """Mostra le prime N righe"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             result = source.head(n)
-            print(f"    ✓ Prime {n} righe")
+            self._emit('head', n=n, unit='righe')
         elif isinstance(source, (list, tuple)):
             result = source[:n]
-            print(f"    ✓ Primi {n} elementi")
+            self._emit('head', n=n, unit='elementi')
         else:
             result = source
         
@@ -425,20 +763,68 @@ class Runtime:
     def _op_data_tail(self, source=None, n: int = 5, **kwargs):
         """Mostra le ultime N righe"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             result = source.tail(n)
-            print(f"    ✓ Ultime {n} righe")
+            self._emit('tail', n=n, unit='righe')
         else:
             result = source
         
         return result
     
+    def _op_aggregate(self, source=None, column: str = None, function: str = 'sum',
+                      functions: list = None, group: int = None, **kwargs):
+        """Aggregazione di un gruppo fuso (optimizer.py)"""
+        if not isinstance(source, (pd.DataFrame, LazyFrame)):
+            return self.operations[f'math.{function}'](source=source, column=column)
+        
+        values = self._aggregates.get(group, len(functions or [function]),
+                                      lambda: self._aggregate_group(source, column, functions or [function]))
+        result = values[function]
+        if isinstance(result, Exception):
+            raise result
+        
+        self._emit('aggregate', function=function, value=result)
+        return result
+    
+    def _aggregate_group(self, source, column: str, functions: list) -> Dict[str, Any]:
+        """Tutte le aggregazioni del gruppo con una sola lettura della colonna"""
+        scanned = None
+        if isinstance(source, LazyFrame) and self.chunked:
+            scanned = column_stats(source, column)  # None: colonna non numerica
+        if scanned is not None:
+            rows, stats = scanned
+            reductions = {
+                'count': lambda: rows,
+                'sum': lambda: stats.total,
+                'mean': lambda: stats.mean if stats.count else float('nan'),
+                'min': lambda: float('nan') if stats.min is None else stats.min,
+                'max': lambda: float('nan') if stats.max is None else stats.max,
+                'var': stats.var,
+                'std': lambda: np.sqrt(stats.var()),
+            }
+        else:
+            if isinstance(source, LazyFrame):
+                source = source.collect([column], ordered=False)
+            series = source[column]
+            reductions = {'count': lambda: len(source)}
+            for name in ('sum', 'mean', 'min', 'max', 'var', 'std'):
+                reductions[name] = getattr(series, name)
+        
+        values = {}
+        for name in set(functions):
+            # Un errore riguarda solo l'operazione che ne chiede il valore
+            try:
+                values[name] = reductions[name]()
+            except Exception as e:
+                values[name] = e
+        return values
+    
     def _op_math_min(self, source=None, column: str = None, **kwargs):
         """Valore minimo"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             if column:
@@ -450,13 +836,13 @@ class Runtime:
         else:
             result = source
         
-        print(f"    ✓ Minimo: {result}")
+        self._emit('aggregate', function='min', value=result)
         return result
     
     def _op_math_max(self, source=None, column: str = None, **kwargs):
         """Valore massimo"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             if column:
@@ -468,13 +854,13 @@ class Runtime:
         else:
             result = source
         
-        print(f"    ✓ Massimo: {result}")
+        self._emit('aggregate', function='max', value=result)
         return result
     
     def _op_math_median(self, source=None, column: str = None, **kwargs):
         """Mediana"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             if column:
@@ -488,81 +874,246 @@ class Runtime:
         else:
             result = float(source)
         
-        print(f"    ✓ Mediana: {result:.2f}")
+        self._emit('aggregate', function='median', value=result)
         return result
     
     def _op_data_shape(self, source=None, **kwargs):
         """Dimensioni"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             result = source.shape
-            print(f"    ✓ Dimensioni: {result[0]} righe × {result[1]} colonne")
         elif isinstance(source, (list, tuple)):
             result = (len(source),)
-            print(f"    ✓ Lunghezza: {result[0]}")
         else:
             result = (1,)
         
+        if isinstance(source, (pd.DataFrame, list, tuple)):
+            self._emit('shape', shape=result)
         return result
     
     def _op_data_columns(self, source=None, **kwargs):
         """Nomi colonne"""
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
+            source = self.last_value
         
         if isinstance(source, pd.DataFrame):
             result = list(source.columns)
-            print(f"    ✓ Colonne: {', '.join(result)}")
+            self._emit('columns', columns=result)
         else:
             result = []
         
         return result
     
-    # Placeholder per le altre operazioni generate
-    def _op_data_sample(self, source=None, n: int = 5, **kwargs):
-        return self._op_data_head(source, n, **kwargs)
+    def _op_data_sample(self, source=None, n: int = 5, seed: int = None, **kwargs):
+        """N righe casuali"""
+        if source is None:
+            source = self.last_value
+        
+        if isinstance(source, pd.DataFrame):
+            result = source.sample(n=min(n, len(source)), random_state=seed)
+            self._emit('sample', rows=len(result), unit='righe')
+        elif isinstance(source, (list, tuple)):
+            import random
+            result = random.Random(seed).sample(list(source), min(n, len(source)))
+            self._emit('sample', rows=len(result), unit='elementi')
+        else:
+            result = source
+        
+        return result
     
     def _op_data_describe(self, source=None, **kwargs):
         if source is None:
-            source = list(self.memory.values())[-1] if self.memory else None
-        if isinstance(source, pd.DataFrame):
-            print(source.describe())
+            source = self.last_value
+        if isinstance(source, pd.DataFrame) and self.events is not None:
+            self._emit('frame', frame=source.describe())
         return source
     
     def _op_data_info(self, source=None, **kwargs):
         return self._op_data_shape(source, **kwargs)
     
-    def _op_data_unique(self, source=None, column: str = None, **kwargs):
-        return source
+    def _op_data_unique(self, source=None, column: str = None, **kwargs) -> pd.DataFrame:
+        """
+        Valori distinti, sempre come DataFrame (come data.value_counts)
+        
+        Con `column` un DataFrame con la sola colonna e i suoi valori
+        distinti, senza le righe distinte; liste e valori singoli
+        diventano la colonna 'valore'. Ordine di prima comparsa.
+        """
+        if source is None:
+            source = self.last_value
+        
+        if not isinstance(source, pd.DataFrame):
+            values = list(source) if isinstance(source, (list, tuple)) else [source]
+            source = pd.DataFrame({column or 'valore': values})
+        if column:
+            source = source[[column]]
+        result = source.drop_duplicates().reset_index(drop=True)
+        
+        self._emit('unique', values=len(result))
+        return result
     
-    def _op_data_value_counts(self, source=None, column: str = None, **kwargs):
-        return source
+    def _op_data_value_counts(self, source=None, column: str = None, **kwargs) -> pd.DataFrame:
+        """Occorrenze di ogni valore: DataFrame (valore, conteggio) dal più frequente"""
+        if source is None:
+            source = self.last_value
+        
+        if isinstance(source, pd.DataFrame):
+            counts = source[column].value_counts() if column else source.value_counts()
+        else:
+            counts = pd.Series(source if isinstance(source, (list, tuple)) else [source]).value_counts()
+            counts.index.name = column or 'valore'
+        result = counts.reset_index(name='conteggio')
+        
+        self._emit('counted', values=len(result))
+        return result
     
-    def _op_data_drop(self, source=None, columns: list = None, **kwargs):
-        return source
+    def _op_data_drop(self, source=None, columns: list = None, column: str = None, **kwargs):
+        """Elimina colonne"""
+        if source is None:
+            source = self.last_value
+        
+        if not isinstance(source, pd.DataFrame):
+            raise ValueError("Source deve essere un DataFrame")
+        columns = self._column_list(columns, column)
+        if not columns:
+            raise ValueError("data.drop richiede columns")
+        
+        # Con copy-on-write le colonne rimaste non vengono copiate
+        result = source.drop(columns=columns)
+        self._emit('dropped', columns=columns)
+        return result
     
-    def _op_data_rename(self, source=None, columns: dict = None, **kwargs):
-        return source
+    def _op_data_rename(self, source=None, columns: dict = None, column: str = None,
+                        new_name: str = None, **kwargs):
+        """Rinomina colonne ({vecchio: nuovo}, oppure column e new_name)"""
+        if source is None:
+            source = self.last_value
+        
+        if not isinstance(source, pd.DataFrame):
+            raise ValueError("Source deve essere un DataFrame")
+        mapping = dict(columns or {})
+        if column and new_name:
+            mapping[column] = new_name
+        missing = [name for name in mapping if name not in source.columns]
+        if not mapping or missing:
+            raise ValueError(f"Colonne da rinominare non trovate: {', '.join(map(str, missing))}"
+                             if missing else "data.rename richiede columns")
+        
+        result = source.rename(columns=mapping)
+        self._emit('renamed', mapping=mapping)
+        return result
     
-    def _op_data_fillna(self, source=None, value=0, **kwargs):
-        return source
+    def _op_data_fillna(self, source=None, value=0, column: str = None, columns: list = None,
+                        method: str = None, **kwargs):
+        """Riempie i valori mancanti (di tutte le colonne o di quelle indicate)"""
+        if source is None:
+            source = self.last_value
+        
+        if isinstance(source, pd.DataFrame):
+            columns = self._column_list(columns, column) or list(source.columns)
+            missing = int(source[columns].isna().sum().sum())
+            if method in ('ffill', 'bfill'):
+                filled = getattr(source[columns], method)()
+                result = source.assign(**{name: filled[name] for name in columns})
+            else:
+                result = source.fillna({name: value for name in columns})
+            self._emit('filled', missing=missing, value=value,
+                       method=method if method in ('ffill', 'bfill') else None)
+        elif isinstance(source, (list, tuple)):
+            result = [value if pd.isna(x) else x for x in source]
+        else:
+            result = value if source is None else source
+        
+        return result
     
-    def _op_data_dropna(self, source=None, **kwargs):
-        return source
+    def _op_data_dropna(self, source=None, column: str = None, columns: list = None,
+                        how: str = 'any', **kwargs):
+        """Elimina le righe con valori mancanti (in qualsiasi colonna o in quelle indicate)"""
+        if source is None:
+            source = self.last_value
+        
+        if isinstance(source, pd.DataFrame):
+            result = source.dropna(subset=self._column_list(columns, column) or None, how=how)
+            self._emit('dropped_na', removed=len(source) - len(result), rows=len(result))
+        elif isinstance(source, (list, tuple)):
+            result = [x for x in source if not pd.isna(x)]
+        else:
+            result = source
+        
+        return result
     
-    def _op_math_std(self, source=None, column: str = None, **kwargs):
-        return 0.0
+    def _op_math_std(self, source=None, column: str = None, ddof: int = 1, **kwargs):
+        """Deviazione standard (campionaria)"""
+        return self._dispersion('math.std', source, column, ddof)
     
-    def _op_math_var(self, source=None, column: str = None, **kwargs):
-        return 0.0
+    def _op_math_var(self, source=None, column: str = None, ddof: int = 1, **kwargs):
+        """Varianza (campionaria)"""
+        return self._dispersion('math.var', source, column, ddof)
+    
+    def _dispersion(self, op_type: str, source, column: str, ddof: int):
+        if source is None:
+            source = self.last_value
+        
+        name = op_type.split('.', 1)[1]
+        if isinstance(source, pd.DataFrame):
+            if column:
+                result = getattr(source[column], name)(ddof=ddof)
+            else:
+                # Senza colonna: media sulle colonne numeriche, come math.mean
+                result = getattr(source, name)(ddof=ddof, numeric_only=True).mean()
+        elif isinstance(source, (list, tuple)):
+            result = float(getattr(np, name)(source, ddof=ddof)) if len(source) > ddof else float('nan')
+        else:
+            # Un solo numero non varia
+            result = 0.0
+        
+        self._emit('aggregate', function=name, value=result)
+        return result
     
     def _op_string_upper(self, source=None, column: str = None, **kwargs):
-        return source
+        """Testo in maiuscolo (stringa, lista o colonne di testo)"""
+        return self._change_case(source, column, 'upper')
     
     def _op_string_lower(self, source=None, column: str = None, **kwargs):
-        return source
+        """Testo in minuscolo (stringa, lista o colonne di testo)"""
+        return self._change_case(source, column, 'lower')
+    
+    def _change_case(self, source, column: str, case: str):
+        if source is None:
+            source = self.last_value
+        
+        if isinstance(source, pd.DataFrame):
+            columns = self._column_list(None, column) or \
+                list(source.select_dtypes(include=['object', 'string']).columns)
+            # Solo le colonne di testo sono nuove: le altre restano condivise (copy-on-write)
+            result = source.assign(**{name: self._series_case(source[name], case) for name in columns})
+            self._emit('case', case=case, columns=columns)
+        elif isinstance(source, str):
+            result = getattr(source, case)()
+            self._emit('case', case=case, text=result)
+        elif isinstance(source, (list, tuple)):
+            result = [getattr(x, case)() if isinstance(x, str) else x for x in source]
+        else:
+            raise ValueError(f"string.{case} richiede testo o un DataFrame")
+        
+        return result
+    
+    @staticmethod
+    def _series_case(series: pd.Series, case: str) -> pd.Series:
+        if series.dtype == object:
+            # Colonne miste: i valori non testuali restano com'erano
+            return series.map(lambda x: getattr(x, case)() if isinstance(x, str) else x)
+        return getattr(series.str, case)()
+    
+    @staticmethod
+    def _column_list(columns, column: str = None) -> list:
+        """Parametro columns (lista o nome singolo) più column, come lista"""
+        names = [columns] if isinstance(columns, str) else list(columns or [])
+        if column and column not in names:
+            names.append(column)
+        return names
     
     # === OPERAZIONI GRAFICHE ===
     
@@ -581,11 +1132,11 @@ class Runtime:
         ax.set_xticks([])
         ax.set_yticks([])
         
-        print(f"    ✓ Canvas creato: {width}x{height}px")
+        self._emit('canvas', width=width, height=height)
         
         # Salva riferimenti
-        self.memory['_current_fig'] = fig
-        self.memory['_current_ax'] = ax
+        self.canvas['fig'] = fig
+        self.canvas['ax'] = ax
         
         return ax
     
@@ -595,10 +1146,10 @@ class Runtime:
         import matplotlib.pyplot as plt
         
         # Se non c'è canvas, creane uno
-        if '_current_ax' not in self.memory:
+        if 'ax' not in self.canvas:
             self._op_create_canvas()
         
-        ax = self.memory['_current_ax']
+        ax = self.canvas['ax']
         
         # Se x,y non specificati, metti al centro
         if x is None:
@@ -609,7 +1160,7 @@ class Runtime:
         # Disegna punto
         ax.scatter([x], [y], c=color, s=size, zorder=10)
         
-        print(f"    ✓ Punto {color} disegnato in ({x}, {y})")
+        self._emit('drawn', shape='point', color=color, points=[(x, y)])
         
         return (x, y)
     
@@ -621,10 +1172,10 @@ class Runtime:
         import matplotlib.patches as patches
         
         # Se non c'è canvas, creane uno
-        if '_current_ax' not in self.memory:
+        if 'ax' not in self.canvas:
             self._op_create_canvas()
         
-        ax = self.memory['_current_ax']
+        ax = self.canvas['ax']
         
         # Se x,y non specificati, metti al centro
         if x is None:
@@ -639,7 +1190,7 @@ class Runtime:
                                zorder=5)
         ax.add_patch(circle)
         
-        print(f"    ✓ Cerchio {color} disegnato in ({x}, {y}), raggio {radius}")
+        self._emit('drawn', shape='circle', color=color, points=[(x, y)], radius=radius)
         
         return circle
     
@@ -649,15 +1200,15 @@ class Runtime:
         import matplotlib.pyplot as plt
         
         # Se non c'è canvas, creane uno
-        if '_current_ax' not in self.memory:
+        if 'ax' not in self.canvas:
             self._op_create_canvas()
         
-        ax = self.memory['_current_ax']
+        ax = self.canvas['ax']
         
         # Disegna linea
         ax.plot([x1, x2], [y1, y2], color=color, linewidth=width, zorder=5)
         
-        print(f"    ✓ Linea {color} disegnata da ({x1},{y1}) a ({x2},{y2})")
+        self._emit('drawn', shape='line', color=color, points=[(x1, y1), (x2, y2)])
         
         return ((x1, y1), (x2, y2))
     
@@ -665,32 +1216,29 @@ class Runtime:
         """Salva l'immagine"""
         import matplotlib.pyplot as plt
         
-        if '_current_fig' not in self.memory:
+        if 'fig' not in self.canvas:
             raise OratioRuntimeError("Nessun canvas da salvare. Crea prima un disegno.")
         
-        fig = self.memory['_current_fig']
+        fig = self.canvas['fig']
         
         # Salva
         fig.savefig(filename, dpi=150, bbox_inches='tight', 
                    facecolor='white', edgecolor='none')
         
-        print(f"    ✓ Immagine salvata: {filename}")
+        self._emit('image', path=filename)
         
         # Chiudi figura
         plt.close(fig)
         
-        # Pulisci memoria
-        if '_current_fig' in self.memory:
-            del self.memory['_current_fig']
-        if '_current_ax' in self.memory:
-            del self.memory['_current_ax']
+        # Pulisci canvas
+        self.canvas.clear()
         
         return filename
 
 
 if __name__ == "__main__":
-    # Test
-    runtime = Runtime()
+    # Test (eventi grezzi; la resa leggibile è in oratio/render.py)
+    runtime = Runtime(events=print)
     
     # IR di test
     ir = {
@@ -0,0 +1,111 @@
+"""
+Frame Cache - DataFrame già letti, condivisi nel processo
+
+io.read_csv e io.read_parquet rileggono spesso gli stessi file (a ogni
+esecuzione, a ogni riga del REPL, a ogni richiesta dell'API). La cache
+tiene i DataFrame letti con chiave identità del file (percorso assoluto,
+inode, mtime, dimensione) più lettore e opzioni: un file modificato ha
+una chiave nuova, la vecchia esce per LRU.
+
+La memoria è limitata da `max_bytes` (ORATIO_FRAME_CACHE_MB, default
+512; 0 disattiva la cache). Ogni lettura riceve una copia copy-on-write:
+modificarla non tocca il DataFrame in cache.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+import pandas as pd
+
+
+DEFAULT_MAX_MB = 512
+
+# Con pandas >= 3 il copy-on-write è sempre attivo e una copia shallow
+# basta; con pandas 2 serve una copia vera
+_COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+
+def _view(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.copy(deep=not _COPY_ON_WRITE)
+
+
+class FrameCache:
+    """Cache LRU di DataFrame, limitata in byte e sicura fra thread"""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("ORATIO_FRAME_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._frames: "OrderedDict[Tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Contatori
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(file_path: str, reader: str, **options) -> Tuple:
+        """Identità del file più lettore e opzioni di lettura"""
+        stat = os.stat(file_path)
+        return (os.path.realpath(file_path), stat.st_ino, stat.st_mtime_ns, stat.st_size,
+                reader, repr(sorted(options.items())))
+
+    def load(self, file_path: str, reader: str, read: Callable[[], pd.DataFrame],
+             **options) -> Tuple[pd.DataFrame, bool]:
+        """
+        DataFrame del file, dalla cache o letto con `read()`
+
+        Returns:
+            (copia copy-on-write del DataFrame, True se dalla cache)
+        """
+        if self.max_bytes <= 0:
+            return read(), False
+
+        key = self.key(file_path, reader, **options)
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return _view(entry[0]), True
+            self.misses += 1
+
+        # Lettura fuori dal lock: altri file restano disponibili
+        frame = read()
+        self._put(key, frame)
+        return _view(frame), False
+
+    def _put(self, key: Tuple, frame: pd.DataFrame):
+        size = int(frame.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._frames:
+                return
+            self._frames[key] = (frame, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._frames),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
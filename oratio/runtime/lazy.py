@@ -0,0 +1,285 @@
+"""
+Lazy - Esecuzione pianificata delle operazioni sui dati
+
+In modalità lazy (Runtime(lazy=True), `oratio run --lazy`) io.read_csv
+non carica il file: produce un LazyFrame, cioè un piano (file, colonne,
+passi) a cui data.filter, data.sort, data.head e data.tail aggiungono
+passi. I dati vengono letti solo quando servono (math.*, io.print,
+io.write_csv, ...):
+
+- proiezione: prima dell'esecuzione `plan_projections` calcola le
+  colonne usate dallo script per ogni file e le passa al lettore
+  (usecols);
+- predicati: i filtri semplici che precedono ordinamenti e limiti sono
+  applicati a blocchi durante la lettura, senza mai tenere in memoria
+  il file intero;
+- le aggregazioni ignorano gli ordinamenti e leggono solo la loro colonna.
+"""
+
+import threading
+from typing import Dict, Any, List, Optional, Callable
+
+import pandas as pd
+
+from .analysis import var_refs
+
+
+# Righe per blocco quando i filtri sono applicati in lettura
+CHUNK_ROWS = 200_000
+
+# Operazioni che proseguono il piano (senza leggere dati)
+CHAIN_OPS = ('data.filter', 'data.sort', 'data.head', 'data.tail')
+
+# Letture che accettano le colonne da caricare: parametro per la proiezione
+READ_OPS = {'io.read_csv': 'usecols', 'io.read_parquet': 'columns', 'io.read_arrow': 'columns'}
+
+# Aggregazioni: indipendenti dall'ordine, leggono solo la colonna indicata
+AGGREGATE_OPS = ('math.sum', 'math.mean', 'math.count', 'math.min', 'math.max',
+                 'math.median', 'math.std', 'math.var')
+
+
+class LazyFrame:
+    """
+    Piano di lettura di un CSV: colonne da leggere e passi da applicare
+
+    I passi sono tuple:
+        ('filter', colonne, maschera)   maschera(df) -> Series booleana
+        ('sort', colonna, ascending)
+        ('head', n) / ('tail', n)
+    """
+
+    def __init__(self, file_path: str, columns: Optional[List[str]] = None,
+                 steps: tuple = (), parent: Optional["LazyFrame"] = None,
+                 emit: Optional[Callable] = None):
+        self.file_path = file_path
+        self.columns = columns  # None: tutte
+        self.steps = steps
+        self.parent = parent
+        self.emit = emit  # Runtime._emit: evento 'loaded' alla lettura
+        self._frame: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def then(self, step: tuple) -> "LazyFrame":
+        """Nuovo piano con un passo in più"""
+        return LazyFrame(self.file_path, self.columns, self.steps + (step,), parent=self,
+                         emit=self.emit)
+
+    def collect(self, columns: Optional[List[str]] = None, ordered: bool = True) -> pd.DataFrame:
+        """
+        Materializza il piano
+
+        Args:
+            columns: Colonne richieste (None: quelle del piano, [] nessuna in
+                particolare, basta il numero di righe)
+            ordered: False se l'ordine delle righe non conta (aggregazioni)
+        """
+        if columns is None:
+            with self._lock:
+                if self._frame is None:
+                    self._frame = self._materialize(None, ordered=True)
+                return self._frame
+        if self._frame is not None:
+            return self._frame[columns]
+        return self._materialize(columns, ordered)[columns]
+
+    def _materialize(self, columns: Optional[List[str]], ordered: bool) -> pd.DataFrame:
+        steps = list(self.steps)
+        if not ordered and not any(step[0] in ('head', 'tail') for step in steps):
+            steps = [step for step in steps if step[0] != 'sort']
+
+        # Riparti dal piano già materializzato più vicino
+        base = self.parent
+        while base is not None:
+            if base._frame is not None:
+                return self._apply(base._frame, list(self.steps[len(base.steps):]))
+            base = base.parent
+
+        # Filtri in testa al piano: applicati in lettura
+        pushed = []
+        while steps and steps[0][0] == 'filter':
+            pushed.append(steps.pop(0))
+
+        usecols = self._usecols(columns, pushed + steps)
+        if pushed:
+            frame = pd.concat(
+                [self._apply(chunk, pushed) for chunk in
+                 pd.read_csv(self.file_path, usecols=usecols, chunksize=CHUNK_ROWS)],
+                ignore_index=True,
+            )
+        elif len(steps) == 1 and steps[0][0] == 'head':
+            frame, steps = pd.read_csv(self.file_path, usecols=usecols, nrows=steps[0][1]), []
+        else:
+            frame = pd.read_csv(self.file_path, usecols=usecols)
+
+        if self.emit is not None:
+            self.emit('loaded', rows=len(frame), columns=len(frame.columns), notes=[], pushed=len(pushed))
+        return self._apply(frame, steps)
+
+    def _usecols(self, columns: Optional[List[str]], steps: List[tuple]) -> Optional[List[str]]:
+        wanted = self.columns if columns is None else columns
+        if wanted is None:
+            return None
+        needed = list(wanted)
+        for step in steps:
+            step_columns = step[1] if step[0] == 'filter' else [step[1]] if step[0] == 'sort' else []
+            needed += [c for c in step_columns if c not in needed]
+        if not needed:
+            # Serve solo il numero di righe: basta la prima colonna
+            needed = list(pd.read_csv(self.file_path, nrows=0).columns[:1])
+        return needed
+
+    @staticmethod
+    def _apply(frame: pd.DataFrame, steps: List[tuple]) -> pd.DataFrame:
+        for step in steps:
+            if step[0] == 'filter':
+                frame = frame[step[2](frame)]
+            elif step[0] == 'sort':
+                frame = frame.sort_values(by=step[1], ascending=step[2])
+            elif step[0] == 'head':
+                frame = frame.head(step[1])
+            else:
+                frame = frame.tail(step[1])
+        return frame
+
+    def __repr__(self):
+        return f"LazyFrame({self.file_path!r}, columns={self.columns}, steps={len(self.steps)})"
+
+
+# === PIANIFICAZIONE ===
+
+def _source_var(params: Dict[str, Any]) -> Optional[str]:
+    source = params.get('source', params.get('data'))
+    return source if isinstance(source, str) and source.startswith('$') else None
+
+
+def plan_projections(operations: List[Dict[str, Any]], runtime) -> List[Dict[str, Any]]:
+    """
+    Copia delle operazioni con le colonne da leggere sulle letture
+
+    `usecols` per io.read_csv, `columns` per Parquet e Arrow (se lo
+    script non le indica già). Per ogni lettura raccoglie le colonne
+    usate da filtri, ordinamenti e aggregazioni che derivano da essa.
+    Se il DataFrame finisce in
+    un'operazione che può usare qualsiasi colonna (io.print, data.show,
+    io.write_csv, ...) la lettura resta completa. Le operazioni vanno
+    prima passate a resolve_implicit_sources.
+    """
+    origin: Dict[str, int] = {}  # variabile -> indice della lettura
+    needed: Dict[int, Optional[List[str]]] = {}
+
+    def use(read: int, columns: Optional[List[str]]):
+        if needed[read] is None:
+            return
+        if columns is None:
+            needed[read] = None
+        else:
+            needed[read] += [c for c in columns if c not in needed[read]]
+
+    for i, op in enumerate(operations):
+        op_type = op.get('type')
+        params = op.get('params', {})
+        source = _source_var(params)
+        read = origin.get(source)
+        output = op.get('output')
+
+        # Altri riferimenti a letture (messaggi, parametri diversi da source)
+        other = dict(params)
+        other.pop('source' if 'source' in params else 'data', None)
+        for ref in var_refs(other):
+            if ref in origin:
+                use(origin[ref], None)
+
+        if output in origin:
+            del origin[output]
+
+        if op_type in READ_OPS:
+            if output and not (op_type != 'io.read_csv' and params.get('columns')):
+                needed[i] = []
+                origin[output] = i
+        elif read is None:
+            continue
+        elif op_type in CHAIN_OPS:
+            use(read, _step_columns(op_type, params, runtime))
+            if output:
+                origin[output] = read
+        elif op_type in AGGREGATE_OPS:
+            column = params.get('column')
+            use(read, [column] if column else ([] if op_type == 'math.count' else None))
+        elif op_type == 'math.aggregate':
+            use(read, [params['column']])
+        else:
+            use(read, None)
+
+    planned = []
+    for i, op in enumerate(operations):
+        if needed.get(i):
+            op = {**op, 'params': {**op.get('params', {}), READ_OPS[op['type']]: needed[i]}}
+        planned.append(op)
+    return planned
+
+
+def _step_columns(op_type: str, params: Dict[str, Any], runtime) -> Optional[List[str]]:
+    if op_type == 'data.filter':
+        try:
+            return runtime._parse_filter(params.get('condition'), params.get('column'),
+                                         params.get('operator'), params.get('value')).columns
+        except ValueError:
+            return None
+    if op_type == 'data.sort':
+        return [params['column']] if params.get('column') else None
+    return []
+
+
+# === OPERAZIONI LAZY ===
+# Chiamate dal Runtime quando la sorgente è un LazyFrame; NotImplemented
+# fa ricadere sull'operazione normale (sui dati materializzati)
+
+def _scan(runtime, op_type, file_path: str, usecols: List[str] = None, **kwargs):
+    runtime._emit('planned', what='read', detail=file_path, columns=usecols)
+    return LazyFrame(file_path, usecols, emit=runtime._emit)
+
+
+def _filter(runtime, op_type, source: LazyFrame, condition: Any = None, column: str = None,
+            operator: str = None, value: Any = None, **kwargs):
+    try:
+        predicate = runtime._parse_filter(condition, column, operator, value)
+    except ValueError:
+        return NotImplemented
+    runtime._emit('planned', what='filter', detail=str(predicate), columns=predicate.columns)
+    return source.then(('filter', predicate.columns, predicate.mask))
+
+
+def _sort(runtime, op_type, source: LazyFrame, column: str = None, ascending: bool = True, **kwargs):
+    if not column:
+        return NotImplemented
+    runtime._emit('planned', what='sort', detail=column, columns=[column])
+    return source.then(('sort', column, ascending))
+
+
+def _limit(runtime, op_type, source: LazyFrame, n: int = 5, **kwargs):
+    return source.then(('head' if op_type == 'data.head' else 'tail', n))
+
+
+def _aggregate(runtime, op_type, source: LazyFrame, column: str = None, **kwargs):
+    if column:
+        columns = [column]
+    else:
+        columns = [] if op_type == 'math.count' else None
+    frame = source.collect(columns, ordered=False)
+    return runtime.operations[op_type](source=frame, column=column, **kwargs)
+
+
+def _fused(runtime, op_type, source: LazyFrame, **kwargs):
+    # Il gruppo legge la sua colonna una volta sola (Runtime._op_aggregate)
+    return runtime._op_aggregate(source=source, **kwargs)
+
+
+LAZY_OPERATIONS: Dict[str, Callable] = {
+    'io.read_csv': _scan,
+    'data.filter': _filter,
+    'data.sort': _sort,
+    'data.head': _limit,
+    'data.tail': _limit,
+    **{op_type: _aggregate for op_type in AGGREGATE_OPS},
+    'math.aggregate': _fused,
+}
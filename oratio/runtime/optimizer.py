@@ -0,0 +1,133 @@
+"""
+Optimizer - Ottimizzazioni dell'IR prima dell'esecuzione
+
+Fusione delle aggregazioni: conteggio, somma, media, minimo, massimo,
+varianza e deviazione standard della stessa colonna della stessa
+variabile (es. examples/completo.ora) diventano operazioni
+math.aggregate di un gruppo. La prima eseguita legge la colonna una
+volta sola e calcola tutti i valori del gruppo; le altre li prendono
+dalla cache. Ogni operazione resta al suo posto, con
+il suo output: ordine dell'output e dipendenze non cambiano.
+"""
+
+import threading
+from typing import Dict, Any, List, Tuple, Optional
+
+
+# Aggregazioni fondibili (math.count non dipende dalla colonna)
+FUSABLE = ('math.count', 'math.sum', 'math.mean', 'math.min', 'math.max',
+           'math.var', 'math.std')
+
+
+def _candidate(op: Dict[str, Any]) -> Optional[Tuple[str, Optional[str]]]:
+    """(sorgente, colonna) se l'operazione si può fondere"""
+    if op.get('type') not in FUSABLE:
+        return None
+    params = op.get('params', {})
+    source = params.get('source', params.get('data'))
+    column = params.get('column')
+    if not (isinstance(source, str) and source.startswith('$')):
+        return None
+    if set(params) - {'source', 'data', 'column'}:
+        return None
+    if op['type'] != 'math.count' and not column:
+        return None
+    return source, column
+
+
+def fuse_aggregates(operations: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Raggruppa le aggregazioni sorelle
+
+    Le operazioni vanno prima passate a resolve_implicit_sources. Un
+    gruppo è formato dalle aggregazioni della stessa colonna sulla stessa
+    definizione di una variabile (una riscrittura apre un nuovo gruppo);
+    i conteggi si uniscono al primo gruppo della loro variabile.
+
+    Returns:
+        (operazioni, {'scans_before': n, 'scans_after': m})
+    """
+    version: Dict[str, int] = {}  # variabile -> indice dell'ultima definizione
+    groups: Dict[Tuple, List[int]] = {}
+    counts: Dict[Tuple, List[int]] = {}
+
+    for i, op in enumerate(operations):
+        candidate = _candidate(op)
+        if candidate:
+            source, column = candidate
+            defined = (source, version.get(source, -1))
+            if op['type'] == 'math.count':
+                counts.setdefault(defined, []).append(i)
+            else:
+                groups.setdefault(defined + (column,), []).append(i)
+        if op.get('output'):
+            version[op['output']] = i
+
+    # Conteggi nel primo gruppo (per posizione) della stessa definizione
+    for defined, members in counts.items():
+        first = min((key for key in groups if key[:2] == defined),
+                    key=lambda key: groups[key][0], default=None)
+        if first is None:
+            groups[defined + (None,)] = members
+        else:
+            groups[first] = sorted(groups[first] + members)
+
+    fused = list(operations)
+    scans_before = scans_after = 0
+    for group_id, (key, members) in enumerate(sorted(groups.items(), key=lambda item: item[1][0])):
+        scans_before += len(members)
+        if len(members) < 2 or key[2] is None:
+            scans_after += len(members)
+            continue
+        scans_after += 1
+        functions = [operations[i]['type'].split('.', 1)[1] for i in members]
+        for i in members:
+            op = operations[i]
+            fused[i] = {
+                **op,
+                'type': 'math.aggregate',
+                'params': {
+                    'source': key[0],
+                    'column': key[2],
+                    'function': op['type'].split('.', 1)[1],
+                    'functions': functions,
+                    'group': group_id,
+                },
+            }
+
+    return fused, {'scans_before': scans_before, 'scans_after': scans_after}
+
+
+class AggregateCache:
+    """
+    Valori dei gruppi fusi, calcolati dalla prima operazione del gruppo
+
+    Un gruppo resta in cache finché tutte le sue operazioni non li hanno
+    letti, così la colonna non sopravvive alla variabile da cui viene.
+    """
+
+    def __init__(self):
+        self._values: Dict[int, Any] = {}
+        self._pending: Dict[int, int] = {}
+        self._locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, group: int, members: int, compute) -> Any:
+        """Valori del gruppo; `compute()` è chiamata una volta sola"""
+        with self._lock:
+            lock = self._locks.setdefault(group, threading.Lock())
+        with lock:
+            if group not in self._values:
+                self._values[group] = compute()
+                self._pending[group] = members
+            values = self._values[group]
+            self._pending[group] -= 1
+            if self._pending[group] <= 0:
+                del self._values[group]
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._pending.clear()
+            self._locks.clear()
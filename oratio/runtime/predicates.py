@@ -0,0 +1,366 @@
+"""
+Predicates - Condizioni di data.filter compilate in maschere vettoriali
+
+Una condizione (testo o dict) viene compilata una volta in un albero di
+predicati; la maschera si calcola colonna per colonna su array numpy e
+le clausole si combinano con & | ~, quindi il DataFrame viene tagliato
+una volta sola. Le condizioni compilate restano in cache per testo.
+
+Sintassi (parole chiave in italiano o inglese):
+
+    importo > 100 and prodotto == Laptop
+    (regione = 'Nord' oppure regione = 'Sud') e non importo < 10
+    prodotto in (Laptop, Mouse)          prodotto non in [Laptop]
+    importo between 10 and 50            importo tra 10 e 50
+    email is null / is not null          email è nullo / non è nullo
+    nome contains 'ros'                  nome inizia con A / finisce con "i"
+
+Operatori: > < >= <= == = != <>. I valori tra virgolette sono testo,
+i numeri diventano int o float, true/false (vero/falso) booleani; più
+parole senza virgolette formano un solo valore ("Monitor LG").
+
+Dict: {"column", "operator", "value"} (operator anche "in", "between",
+"contains", "is null", ...), {"and": [...]}, {"or": [...]}, {"not": ...};
+una lista di condizioni vale come "and".
+"""
+
+import re
+import json
+from functools import lru_cache
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>"[^"]*"|'[^']*'|“[^”]*”)
+      | (?P<number>-?\d+(?:\.\d+)?)(?![\w.:/-])
+      | (?P<op>>=|<=|==|!=|<>|&&|\|\||=|>|<|!)
+      | (?P<punct>[(),\[\]])
+      | (?P<word>[^\s()\[\],<>=!"'“”]+)
+    )""", re.VERBOSE)
+
+AND = {'and', 'e', '&&'}
+OR = {'or', 'o', 'oppure', '||'}
+NOT = {'not', 'non', '!'}
+NULLS = {'null', 'none', 'nan', 'nullo', 'nulla', 'vuoto', 'vuota', 'mancante'}
+BOOLEANS = {'true': True, 'vero': True, 'false': False, 'falso': False}
+
+COMPARISONS = {'>': '>', '<': '<', '>=': '>=', '<=': '<=', '==': '==', '=': '==',
+               '!=': '!=', '<>': '!='}
+
+# Predicati su testo: parole (una o due) -> tipo
+STRING_OPS = {
+    ('contains',): 'contains', ('contiene',): 'contains',
+    ('startswith',): 'startswith', ('starts', 'with'): 'startswith',
+    ('inizia', 'con'): 'startswith', ('comincia', 'con'): 'startswith',
+    ('endswith',): 'endswith', ('ends', 'with'): 'endswith',
+    ('finisce', 'con'): 'endswith', ('termina', 'con'): 'endswith',
+}
+
+# Parole che chiudono un valore di più parole senza virgolette
+_STOP = AND | OR | {')', ']', ','}
+
+
+class Predicate:
+    """
+    Condizione compilata
+
+    Nodi dell'albero (tuple):
+        ('and', [nodi]) / ('or', [nodi]) / ('not', nodo)
+        ('cmp', colonna, operatore, valore)
+        ('in', colonna, [valori])
+        ('between', colonna, minimo, massimo)
+        ('null', colonna)
+        ('str', colonna, tipo, testo)
+    """
+
+    def __init__(self, tree: tuple, text: str):
+        self.tree = tree
+        self.text = text
+        self.columns: List[str] = []
+        self._collect(tree)
+
+    def _collect(self, node: tuple):
+        if node[0] in ('and', 'or'):
+            for child in node[1]:
+                self._collect(child)
+        elif node[0] == 'not':
+            self._collect(node[1])
+        elif node[1] not in self.columns:
+            self.columns.append(node[1])
+
+    def mask(self, frame: pd.DataFrame) -> pd.Series:
+        """Maschera booleana delle righe che soddisfano la condizione"""
+        return pd.Series(self._evaluate(self.tree, frame), index=frame.index)
+
+    def _evaluate(self, node: tuple, frame: pd.DataFrame) -> np.ndarray:
+        kind = node[0]
+        if kind == 'and':
+            return np.logical_and.reduce([self._evaluate(child, frame) for child in node[1]])
+        if kind == 'or':
+            return np.logical_or.reduce([self._evaluate(child, frame) for child in node[1]])
+        if kind == 'not':
+            return ~self._evaluate(node[1], frame)
+
+        column = frame[node[1]]
+        if kind == 'cmp':
+            op, value = node[2], node[3]
+            if op == '>':
+                result = column > value
+            elif op == '<':
+                result = column < value
+            elif op == '>=':
+                result = column >= value
+            elif op == '<=':
+                result = column <= value
+            elif op == '==':
+                result = column == value
+            else:
+                result = column != value
+        elif kind == 'in':
+            result = column.isin(node[2])
+        elif kind == 'between':
+            result = column.between(node[2], node[3])
+        elif kind == 'null':
+            result = column.isna()
+        else:
+            strings = column.astype('string') if column.dtype == object else column
+            if node[2] == 'contains':
+                result = strings.str.contains(node[3], regex=False)
+            else:
+                result = getattr(strings.str, node[2])(node[3])
+        # I valori mancanti non soddisfano il confronto
+        return result.to_numpy(dtype=bool, na_value=False)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Predicate({self.text!r})"
+
+
+# === COMPILAZIONE ===
+
+def compile_condition(condition: Any = None, column: str = None,
+                      operator: str = None, value: Any = None) -> Predicate:
+    """
+    Compila la condizione di data.filter
+
+    `condition` può essere testo, dict o lista; altrimenti si usano
+    column/operator/value. Solleva ValueError se la condizione non è
+    valida o incompleta.
+    """
+    if condition is None or condition == '':
+        condition = {'column': column, 'operator': operator, 'value': value}
+    if isinstance(condition, str):
+        return _compile_text(condition)
+    if isinstance(condition, (dict, list)):
+        try:
+            key = json.dumps(condition, sort_keys=True, ensure_ascii=False)
+        except TypeError:
+            return Predicate(_from_dict(condition), str(condition))
+        return _compile_json(key)
+    raise ValueError(f"Condizione non valida: {condition!r}")
+
+
+@lru_cache(maxsize=512)
+def _compile_text(text: str) -> Predicate:
+    return Predicate(_Parser(text).parse(), text.strip())
+
+
+@lru_cache(maxsize=512)
+def _compile_json(key: str) -> Predicate:
+    return Predicate(_from_dict(json.loads(key)), key)
+
+
+def _from_dict(condition: Any) -> tuple:
+    if isinstance(condition, str):
+        return _Parser(condition).parse()
+    if isinstance(condition, list):
+        return ('and', [_from_dict(item) for item in condition])
+    if 'and' in condition or 'or' in condition:
+        kind = 'and' if 'and' in condition else 'or'
+        return (kind, [_from_dict(item) for item in condition[kind]])
+    if 'not' in condition:
+        return ('not', _from_dict(condition['not']))
+
+    column, operator, value = condition.get('column'), condition.get('operator'), condition.get('value')
+    operator = ' '.join(str(operator or '').lower().split())
+    negated = operator.startswith(('not ', 'non '))
+    if negated:
+        operator = operator.split(' ', 1)[1]
+    if not column or not operator:
+        raise ValueError("Filtro richiede column, operator e value")
+
+    if operator in ('is null', 'isnull', 'è nullo', 'is none'):
+        node = ('null', column)
+    elif operator in ('is not null', 'notnull', 'non è nullo'):
+        node = ('not', ('null', column))
+    elif operator == 'in':
+        node = ('in', column, list(value) if isinstance(value, (list, tuple)) else [value])
+    elif operator in ('between', 'tra', 'fra'):
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise ValueError("between richiede due valori")
+        node = ('between', column, value[0], value[1])
+    elif tuple(operator.split()) in STRING_OPS:
+        node = ('str', column, STRING_OPS[tuple(operator.split())], str(value))
+    elif operator in COMPARISONS:
+        if value is None:
+            raise ValueError("Filtro richiede column, operator e value")
+        node = ('cmp', column, COMPARISONS[operator], value)
+    else:
+        raise ValueError(f"Operatore non supportato: {operator}")
+    return ('not', node) if negated else node
+
+
+class _Parser:
+    """Parser a discesa ricorsiva: or > and > not > confronto"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = _TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Condizione non valida: {self.text!r}")
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            position = match.end()
+        self.position = 0
+
+    def parse(self) -> tuple:
+        if not self.tokens:
+            raise ValueError("Filtro richiede column, operator e value")
+        node = self._or()
+        if self.position < len(self.tokens):
+            self._fail()
+        return node
+
+    # --- token ---
+
+    def _peek(self, offset: int = 0) -> Optional[tuple]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def _word(self, offset: int = 0) -> Optional[str]:
+        token = self._peek(offset)
+        return token[1].lower() if token and token[0] in ('word', 'op', 'punct') else None
+
+    def _next(self) -> tuple:
+        token = self._peek()
+        if token is None:
+            self._fail()
+        self.position += 1
+        return token
+
+    def _expect(self, *words: str):
+        if self._word() not in words:
+            self._fail()
+        self.position += 1
+
+    def _fail(self):
+        raise ValueError(f"Condizione non valida: {self.text!r}")
+
+    # --- grammatica ---
+
+    def _or(self) -> tuple:
+        nodes = [self._and()]
+        while self._word() in OR:
+            self.position += 1
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def _and(self) -> tuple:
+        nodes = [self._not()]
+        while self._word() in AND:
+            self.position += 1
+            nodes.append(self._not())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def _not(self) -> tuple:
+        if self._word() in NOT:
+            self.position += 1
+            return ('not', self._not())
+        if self._word() == '(':
+            self.position += 1
+            node = self._or()
+            self._expect(')')
+            return node
+        return self._predicate()
+
+    def _predicate(self) -> tuple:
+        kind, column = self._next()
+        if kind not in ('word', 'string'):
+            self._fail()
+        if kind == 'string':
+            column = column[1:-1]
+
+        negated = self._word() in NOT
+        if negated:
+            self.position += 1
+        node = self._test(column)
+        return ('not', node) if negated else node
+
+    def _test(self, column: str) -> tuple:
+        word = self._word()
+        if word in COMPARISONS:
+            self.position += 1
+            return ('cmp', column, COMPARISONS[word], self._value())
+        if word == 'in':
+            self.position += 1
+            return ('in', column, self._list())
+        if word in ('between', 'tra', 'fra'):
+            self.position += 1
+            low = self._value(single=True)
+            self._expect(*AND)
+            return ('between', column, low, self._value(single=True))
+        if word in ('is', 'è'):
+            self.position += 1
+            negated = self._word() in NOT
+            if negated:
+                self.position += 1
+            if self._word() not in NULLS:
+                self._fail()
+            self.position += 1
+            return ('not', ('null', column)) if negated else ('null', column)
+        for words, kind in STRING_OPS.items():
+            if all(self._word(i) == w for i, w in enumerate(words)):
+                self.position += len(words)
+                return ('str', column, kind, str(self._value()))
+        self._fail()
+
+    def _list(self) -> list:
+        closing = {'(': ')', '[': ']'}.get(self._word())
+        if closing is None:
+            self._fail()
+        self.position += 1
+        values = []
+        while self._word() != closing:
+            values.append(self._value())
+            if self._word() == ',':
+                self.position += 1
+            elif self._word() != closing:
+                self._fail()
+        self.position += 1
+        return values
+
+    def _value(self, single: bool = False) -> Any:
+        kind, text = self._next()
+        if kind == 'string':
+            return text[1:-1]
+        if kind == 'number':
+            return float(text) if '.' in text else int(text)
+        if kind != 'word':
+            self._fail()
+        if text.lower() in BOOLEANS:
+            return BOOLEANS[text.lower()]
+        # Testo senza virgolette: più parole fino a una parola chiave
+        words = [text]
+        while not single and self._peek() and self._peek()[0] in ('word', 'number') \
+                and self._word() not in _STOP:
+            words.append(self._next()[1])
+        return ' '.join(words)
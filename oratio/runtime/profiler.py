@@ -0,0 +1,266 @@
+"""
+Profiler - Misure per operazione e tracce dell'esecuzione
+
+Hook del Runtime: Runtime(hooks=[...]) o runtime.add_hook(hook). Un hook
+è un oggetto con before_operation(op, index) e after_operation(op,
+index, stats) (vedi OperationHook); `stats` contiene:
+
+    id, type, index     operazione
+    start, wall         inizio (time.perf_counter) e durata in secondi
+    cpu                 tempo CPU del thread in secondi
+    allocated           byte allocati al picco durante l'operazione
+    retained            byte ancora allocati alla fine (None per entrambi
+                        se tracemalloc non è attivo)
+    rows_in, rows_out   righe della sorgente e del risultato (None se non
+                        tabellari)
+    result_bytes        memoria occupata dal risultato
+    thread, error       thread che l'ha eseguita, errore (None se riuscita)
+
+Profiler è un hook che registra anche le fasi segnate con
+oratio.tracing (parsing, validazione, compilazione) ed esporta una
+traccia Chrome (chrome://tracing, Perfetto) e gli stack "folded" dei
+flame graph (flamegraph.pl, speedscope). Con --jobs le allocazioni di
+operazioni parallele si sovrappongono: tracemalloc non distingue i
+thread.
+"""
+
+import os
+import sys
+import json
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter, thread_time
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .. import tracing
+from .events import result_rows
+
+
+class OperationHook:
+    """Hook per operazione: entrambi i metodi sono facoltativi da ridefinire"""
+
+    def before_operation(self, op: Dict[str, Any], index: Optional[int]):
+        pass
+
+    def after_operation(self, op: Dict[str, Any], index: Optional[int], stats: Dict[str, Any]):
+        pass
+
+
+def result_bytes(value: Any) -> int:
+    """Memoria occupata da un risultato (DataFrame e Series con i testi)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+def instrument(runtime, op: Dict[str, Any], index: Optional[int],
+               call: Callable[[], Any]) -> Callable[[], Any]:
+    """Closure che esegue `call` passando misure e risultato agli hook del runtime"""
+    hooks = runtime.hooks
+    memory = runtime.memory
+    params = op.get('params', {})
+    source = params.get('source', params.get('data'))
+    if not (isinstance(source, str) and source.startswith('$')):
+        source = None
+
+    def run():
+        for hook in hooks:
+            hook.before_operation(op, index)
+
+        rows_in = result_rows(memory.get(source)) if source else None
+        tracing_memory = tracemalloc.is_tracing()
+        if tracing_memory:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        result, error = None, None
+        start, cpu = perf_counter(), thread_time()
+        try:
+            result = call()
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            wall, cpu = perf_counter() - start, thread_time() - cpu
+            allocated = retained = None
+            if tracing_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                allocated, retained = max(peak - before, 0), current - before
+            stats = {
+                'id': op.get('id'),
+                'type': op['type'],
+                'index': index,
+                'start': start,
+                'wall': wall,
+                'cpu': cpu,
+                'allocated': allocated,
+                'retained': retained,
+                'rows_in': rows_in,
+                'rows_out': result_rows(result),
+                'result_bytes': result_bytes(result) if error is None else 0,
+                'thread': threading.current_thread().name,
+                'error': None if error is None else str(error),
+            }
+            for hook in hooks:
+                hook.after_operation(op, index, stats)
+    return run
+
+
+class Span:
+    """Intervallo misurato: fase (span di oratio.tracing) o operazione"""
+
+    __slots__ = ('name', 'category', 'start', 'duration', 'thread', 'stack', 'args')
+
+    def __init__(self, name: str, category: str, start: float, duration: float,
+                 thread: str, stack: tuple, args: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.duration = duration
+        self.thread = thread
+        self.stack = stack  # fasi aperte quando è iniziato
+        self.args = args
+
+
+class Profiler(OperationHook):
+    """
+    Hook e tracer: operazioni del Runtime e fasi di parsing e validazione
+
+    Uso:
+        profiler = Profiler()
+        with profiler:
+            ir = parser.parse(code)
+            Runtime(hooks=[profiler]).execute(ir)
+        profiler.write("profilo.json")  # traccia Chrome + profilo.folded
+
+    Le fasi vanno aperte da un thread alla volta (come fanno CLI e
+    runtime); le operazioni eseguite da altri thread con --jobs finiscono
+    sotto la fase aperta in quel momento.
+    """
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory  # misura le allocazioni (tracemalloc)
+        self.spans: List[Span] = []
+        self.origin = perf_counter()
+        self._stack: List[str] = []
+        self._lock = threading.Lock()
+        self._previous = None
+        self._started_tracemalloc = False
+
+    def start(self):
+        """Attiva il tracer (e tracemalloc se memory)"""
+        self._previous = tracing.activate(self)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self):
+        tracing.activate(self._previous)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Fase misurata; le fasi e le operazioni al suo interno la hanno nello stack"""
+        stack = tuple(self._stack)
+        self._stack.append(name)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            duration = perf_counter() - start
+            self._stack.pop()
+            self._record(Span(name, 'phase', start, duration, threading.current_thread().name,
+                              stack, args))
+
+    def after_operation(self, op: Dict[str, Any], index: Optional[int], stats: Dict[str, Any]):
+        self._record(Span(op['type'], 'operation', stats['start'], stats['wall'], stats['thread'],
+                          tuple(self._stack), stats))
+
+    def _record(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def operations(self) -> List[Dict[str, Any]]:
+        """Misure delle operazioni, in ordine di fine"""
+        return [span.args for span in self.spans if span.category == 'operation']
+
+    # === ESPORTAZIONE ===
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Traccia in formato Chrome Trace Event (eventi completi "X", tempi in µs)"""
+        pid = os.getpid()
+        threads: Dict[str, int] = {}
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round((span.start - self.origin) * 1e6, 3),
+                'dur': round(span.duration * 1e6, 3),
+                'pid': pid,
+                'tid': tid,
+                'args': {key: value for key, value in span.args.items()
+                         if key not in ('start', 'thread')},
+            })
+        for name, tid in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def folded(self) -> str:
+        """
+        Stack "folded" per i flame graph: "fase;fase;operazione µs" per riga
+
+        Il valore di ogni stack è il tempo proprio (senza i figli), in
+        microsecondi.
+        """
+        children: Counter = Counter()
+        for span in self.spans:
+            if span.stack:
+                children[span.stack] += span.duration
+        totals: Counter = Counter()
+        for span in self.spans:
+            path = span.stack + (span.name,)
+            own = span.duration - (children[path] if span.category == 'phase' else 0)
+            totals[path] += max(own, 0.0)
+
+        lines = []
+        for path, seconds in sorted(totals.items()):
+            micros = int(round(seconds * 1e6))
+            if micros > 0:
+                lines.append(';'.join(frame.replace(';', ',') for frame in path) + f" {micros}")
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def write(self, path: str) -> List[Path]:
+        """
+        Scrive la traccia Chrome in `path` e gli stack folded accanto
+        (stesso nome, estensione .folded); ritorna i file scritti
+        """
+        trace = Path(path)
+        folded = trace.with_suffix('.folded')
+        if folded == trace:
+            folded = trace.with_name(trace.name + '.folded')
+        trace.write_text(json.dumps(self.chrome_trace(), default=str), encoding='utf-8')
+        folded.write_text(self.folded(), encoding='utf-8')
+        return [trace, folded]
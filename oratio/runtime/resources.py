@@ -0,0 +1,67 @@
+"""
+Resources - Memoria del processo (RSS)
+
+Su Linux il picco (VmHWM) si può azzerare prima di ogni esecuzione
+scrivendo "5" in /proc/self/clear_refs, così il report riguarda solo
+quell'esecuzione. Altrove si usa il picco dall'avvio del processo
+(resource.getrusage); su Windows i valori non sono disponibili.
+"""
+
+import sys
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+_STATUS = "/proc/self/status"
+
+
+def _status_kb(field: str) -> Optional[int]:
+    try:
+        with open(_STATUS) as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def current_rss() -> Optional[int]:
+    """RSS attuale in byte (None se non disponibile)"""
+    kb = _status_kb("VmRSS")
+    return kb * 1024 if kb is not None else None
+
+
+def peak_rss() -> Optional[int]:
+    """Picco di RSS in byte (dall'ultimo reset_peak_rss, se supportato)"""
+    kb = _status_kb("VmHWM")
+    if kb is not None:
+        return kb * 1024
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS riporta byte, Linux kilobyte
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_rss() -> bool:
+    """Azzera il picco di RSS; False se il sistema non lo permette"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def format_bytes(size: Optional[int]) -> str:
+    if size is None:
+        return "n/d"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
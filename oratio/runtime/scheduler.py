@@ -0,0 +1,203 @@
+"""
+Dataflow Scheduler - Esecuzione parallela dell'IR
+
+Le operazioni indipendenti (es. somma, media e massimo dello stesso
+DataFrame filtrato) vengono eseguite in parallelo su un pool di thread,
+appena le operazioni da cui dipendono sono completate (analysis.py).
+
+Il risultato è indistinguibile dall'esecuzione in sequenza:
+- gli eventi (events.py) di ogni operazione vengono trattenuti nel
+  thread che la esegue e passati al sink in ordine di programma;
+- in caso di errore si completano le operazioni precedenti e si solleva
+  l'errore della prima operazione fallita;
+- la memoria del runtime viene riordinata come se le variabili fossero
+  state create in sequenza.
+"""
+
+import time
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from typing import Dict, Any, Callable, List, Optional
+
+from .analysis import dependencies, is_barrier
+from .events import result_rows
+
+
+class _ThreadEvents:
+    """Sink che trattiene gli eventi nel buffer del thread corrente, se presente"""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.local = threading.local()
+
+    def __call__(self, event):
+        buffer = getattr(self.local, 'events', None)
+        if buffer is None:
+            self.sink(event)
+        else:
+            buffer.append(event)
+
+
+class DataflowScheduler:
+    """
+    Esegue le operazioni di un Runtime seguendo il grafo delle dipendenze
+
+    Uso:
+        scheduler = DataflowScheduler(runtime, jobs=4)
+        result = scheduler.run(ir['operations'])
+    """
+
+    def __init__(self, runtime, jobs: int = 4):
+        self.runtime = runtime
+        self.jobs = max(1, jobs)
+
+    def run(self, operations: List[Dict[str, Any]],
+            free_after: Optional[List[List[str]]] = None,
+            calls: Optional[List[Callable[[], Any]]] = None) -> Any:
+        """
+        Esegue le operazioni e ritorna il risultato dell'ultima
+
+        `free_after` (analysis.last_uses) indica le variabili da liberare
+        dopo ogni operazione: vengono liberate quando quell'operazione e
+        tutte le precedenti sono completate. `calls` sono le operazioni
+        già compilate (compiled.py), nello stesso ordine.
+        """
+        runtime = self.runtime
+        memory = runtime.memory
+        handlers = runtime.operations
+
+        ops = runtime._explicit_sources(operations)
+        if calls is None:
+            calls = [partial(runtime._execute_operation, op) for op in ops]
+        deps = dependencies(ops, handlers)
+        barriers = [is_barrier(op, handlers.get(op.get('type'))) for op in ops]
+
+        dependents: List[List[int]] = [[] for _ in ops]
+        for i, op_deps in enumerate(deps):
+            for d in op_deps:
+                dependents[d].append(i)
+        waiting = [len(d) for d in deps]
+
+        # Posizione di ogni chiave nella memoria "sequenziale"
+        rank = {key: -1 for key in memory}
+
+        ready = [i for i, n in enumerate(waiting) if n == 0]
+        heapq.heapify(ready)
+        running = {}
+        outputs: Dict[int, List[Any]] = {}  # eventi trattenuti
+        errors: Dict[int, BaseException] = {}
+        results: Dict[int, Any] = {}
+        emitted = 0
+        settled = 0  # operazioni [0, settled) completate senza errori
+
+        # Eventi trattenuti per operazione e passati al sink in ordine di programma
+        sink = runtime.events
+        events = _ThreadEvents(sink) if sink is not None else None
+        runtime.events = events
+
+        def task(i: int):
+            buffered = None
+            if events is not None:
+                events.local.events = buffered = []
+                op_id, op_type = ops[i].get('id'), ops[i]['type']
+                runtime._emit('op.start', index=i, id=op_id, type=op_type)
+                started = time.perf_counter()
+            try:
+                result = calls[i]()
+                if events is not None:
+                    runtime._emit('op.end', index=i, id=op_id, type=op_type,
+                                  seconds=time.perf_counter() - started, rows=result_rows(result))
+                return result, None, buffered
+            except BaseException as e:
+                return None, e, buffered
+            finally:
+                if events is not None:
+                    events.local.events = None
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="oratio") as pool:
+                while ready or running:
+                    first_error = min(errors) if errors else None
+                    while ready and len(running) < self.jobs:
+                        # Le barriere partono da sole, con la memoria in ordine
+                        if barriers[ready[0]] and running:
+                            break
+                        i = heapq.heappop(ready)
+                        if first_error is not None and i > first_error:
+                            continue
+                        if barriers[i]:
+                            self._reorder(rank, len(ops))
+                        running[pool.submit(task, i)] = i
+                        if barriers[i]:
+                            break
+
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i = running.pop(future)
+                        result, error, outputs[i] = future.result()
+                        if error is not None:
+                            errors[i] = error
+                            continue
+                        results[i] = result
+                        if ops[i].get('output'):
+                            memory[ops[i]['output']] = result
+                        self._track(rank, i)
+                        for j in dependents[i]:
+                            waiting[j] -= 1
+                            if waiting[j] == 0:
+                                heapq.heappush(ready, j)
+
+                    while settled in results:
+                        if free_after:
+                            runtime._release(free_after[settled])
+                        settled += 1
+
+                    last = min(errors) if errors else len(ops)
+                    while emitted in outputs and emitted <= last:
+                        self._flush(outputs.pop(emitted), sink)
+                        emitted += 1
+        finally:
+            runtime.events = sink
+
+        # Dopo un errore: l'output fino all'operazione fallita, come in sequenza
+        last = min(errors) if errors else len(ops)
+        for i in sorted(outputs):
+            if i <= last:
+                self._flush(outputs[i], sink)
+        self._reorder(rank, len(ops))
+
+        # Ultima variabile prodotta, come in sequenza
+        for i in range(last - 1, -1, -1):
+            if ops[i].get('output') and i in results:
+                runtime.last_var, runtime.last_value = ops[i]['output'], results[i]
+                break
+
+        if errors:
+            raise errors[min(errors)]
+        return results.get(len(ops) - 1) if ops else None
+
+    @staticmethod
+    def _flush(events: Optional[List[Any]], sink):
+        """Eventi trattenuti di un'operazione"""
+        for event in events or ():
+            sink(event)
+
+    def _track(self, rank: Dict[str, int], index: int):
+        """Assegna le chiavi nuove in memoria all'operazione appena completata"""
+        memory = self.runtime.memory
+        for key in [k for k in rank if k not in memory]:
+            del rank[key]
+        for key in memory:
+            if key not in rank:
+                rank[key] = index
+
+    def _reorder(self, rank: Dict[str, int], default: int):
+        """Riordina la memoria come in un'esecuzione in sequenza"""
+        memory = self.runtime.memory
+        items = sorted(memory.items(), key=lambda item: rank.get(item[0], default))
+        memory.clear()
+        memory.update(items)
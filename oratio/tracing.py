@@ -0,0 +1,50 @@
+"""
+Tracing - Intervalli di tempo (span) delle fasi di ORATIO
+
+Il codice strumentato segna le sue fasi con `span(nome)` o con il
+decoratore `traced(nome)` (SemanticParser.parse, IRValidator.validate,
+Runtime.compile, Runtime.execute). Finché nessun tracer è attivo gli
+span non fanno nulla; il Profiler del runtime (runtime/profiler.py) si
+attiva con activate() e li registra.
+"""
+
+import contextlib
+import functools
+from typing import Any, Callable, Optional
+
+
+_NULL = contextlib.nullcontext()
+
+# Tracer attivo nel processo (uno alla volta): oggetto con span(nome, **args)
+_active: Optional[Any] = None
+
+
+def activate(tracer: Optional[Any]) -> Optional[Any]:
+    """Attiva un tracer (None disattiva); ritorna quello precedente"""
+    global _active
+    previous, _active = _active, tracer
+    return previous
+
+
+def active() -> Optional[Any]:
+    return _active
+
+
+def span(name: str, **args):
+    """Contesto che misura una fase (vuoto senza tracer attivo)"""
+    tracer = _active
+    return _NULL if tracer is None else tracer.span(name, **args)
+
+
+def traced(name: str) -> Callable:
+    """Decoratore: ogni chiamata della funzione è uno span"""
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = _active
+            if tracer is None:
+                return function(*args, **kwargs)
+            with tracer.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,197 @@
+"""
+Fixture condivise per i test
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FakeCompletions:
+    """Sostituto di client.chat.completions che risponde senza rete"""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.calls = []
+
+    def create(self, model, messages, **kwargs):
+        self.calls.append(messages)
+        content = self.responder(messages)
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        message = type("Message", (), {"content": content})
+        choice = type("Choice", (), {"message": message})
+        return type("Response", (), {"choices": [choice]})
+
+
+class FakeClient:
+    """Client OpenAI finto: `responder(messages)` produce il contenuto"""
+
+    def __init__(self, responder):
+        self.completions = FakeCompletions(responder)
+        self.chat = type("Chat", (), {"completions": self.completions})
+
+    @property
+    def calls(self):
+        return self.completions.calls
+
+
+PRINT_IR = {
+    "version": "1.0",
+    "operations": [
+        {"id": "op_1", "type": "io.print", "params": {"value": "Ciao"}}
+    ]
+}
+
+
+@pytest.fixture
+def fake_client():
+    return FakeClient(lambda messages: PRINT_IR)
+
+
+class ChatServer:
+    """
+    Server locale che parla il protocollo chat-completions di OpenAI
+
+    `responder(messages)` produce il contenuto della risposta; `delay`
+    (secondi, o funzione del numero di richiesta) simula la latenza.
+    Le richieste con `stream` ricevono il contenuto in pezzi da
+    `chunk_size` caratteri, distanziati di `chunk_delay` secondi.
+    """
+
+    def __init__(self, responder=None, delay=0.0, chunk_size=16, chunk_delay=0.0):
+        self.responder = responder or (lambda messages: PRINT_IR)
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    number = len(server.requests)
+                    server.requests.append(body)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    delay = server.delay(number) if callable(server.delay) else server.delay
+                    time.sleep(delay)
+                    content = server.responder(body["messages"])
+                    if not isinstance(content, str):
+                        content = json.dumps(content)
+                    if body.get("stream"):
+                        self._stream(number, body, content)
+                        return
+                    payload = json.dumps({
+                        "id": f"chatcmpl-{number}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model", "test"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                    }).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def _stream(self, number, body, content):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                size = server.chunk_size
+                for i in range(0, len(content), size):
+                    chunk = {
+                        "id": f"chatcmpl-{number}",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", "test"),
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"content": content[i:i + size]},
+                            "finish_reason": None,
+                        }],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(server.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def chat_server():
+    server = ChatServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture(scope="session")
+def tiny_model_dir(tmp_path_factory):
+    """
+    Modello causale minuscolo (pesi casuali) salvato su disco
+
+    Tokenizer byte-level senza merge e chat template in stile ChatML:
+    basta per provare LocalGPUParser su CPU, senza rete.
+    """
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    from tokenizers import Tokenizer, models, pre_tokenizers, decoders
+
+    specials = ["<|endoftext|>", "<|im_start|>", "<|im_end|>"]
+    alphabet = sorted(pre_tokenizers.ByteLevel.alphabet())
+    vocab = {token: i for i, token in enumerate(specials + alphabet)}
+    backend = Tokenizer(models.BPE(vocab=vocab, merges=[]))
+    backend.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    backend.decoder = decoders.ByteLevel()
+
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=backend, eos_token=specials[0], pad_token=specials[0],
+        additional_special_tokens=specials[1:],
+    )
+    tokenizer.chat_template = (
+        "{% for m in messages %}<|im_start|>{{ m['role'] }}\n{{ m['content'] }}<|im_end|>\n"
+        "{% endfor %}{% if add_generation_prompt %}<|im_start|>assistant\n{% endif %}"
+    )
+
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(vocab_size=len(vocab), n_embd=32, n_layer=2, n_head=2,
+                                     n_positions=4096, bos_token_id=0, eos_token_id=0)
+    model = transformers.GPT2LMHeadModel(config)
+
+    path = tmp_path_factory.mktemp("tiny-model")
+    tokenizer.save_pretrained(path)
+    model.save_pretrained(path)
+    return str(path)
@@ -0,0 +1,119 @@
+"""
+Test artifact compilati (.orac) e comandi `oratio compile` / `oratio run`
+"""
+
+from typer.testing import CliRunner
+
+from importlib import import_module
+from oratio.compiler.languages import LanguageDetector
+from oratio.compiler.parser import SemanticParser, fingerprint, stored_fingerprint
+from oratio.compiler.artifact import artifact_path, load_ir, read_artifact, write_artifact
+from tests.conftest import FakeClient, PRINT_IR
+
+
+cli = import_module("oratio.cli.main")
+runner = CliRunner()
+
+
+def fake_parser_factory(client):
+    def factory(**kwargs):
+        parser = SemanticParser(api_key="test", language="it", use_cache=False,
+                                incremental=False, fast_path=False)
+        parser.client = client
+        return parser
+    return factory
+
+
+def test_artifact_roundtrip_ignores_formatting(tmp_path):
+    source = tmp_path / "saluto.ora"
+    write_artifact(artifact_path(source), "Stampa 'Ciao'", PRINT_IR, {"model": "m"})
+
+    assert load_ir(source, "  Stampa 'Ciao'\n\n") == PRINT_IR
+    assert load_ir(source, "Stampa 'Addio'") is None
+
+
+def test_artifact_from_other_model_or_prompt_is_a_miss(tmp_path):
+    source = tmp_path / "saluto.ora"
+    code = "Stampa 'Ciao'"
+    current = fingerprint(code)
+    write_artifact(artifact_path(source), code, PRINT_IR, current)
+    assert load_ir(source, code, stored_fingerprint) == PRINT_IR
+
+    write_artifact(artifact_path(source), code, PRINT_IR, dict(current, model="altro-modello"))
+    assert load_ir(source, code, stored_fingerprint) is None
+    write_artifact(artifact_path(source), code, PRINT_IR, dict(current, prompt="vecchio"))
+    assert load_ir(source, code, stored_fingerprint) is None
+    write_artifact(artifact_path(source), code, PRINT_IR, dict(current, language="xx"))
+    assert load_ir(source, code, stored_fingerprint) is None
+
+
+def test_valid_artifact_skips_language_detection(tmp_path, monkeypatch):
+    source = tmp_path / "saluto.ora"
+    code = "Stampa 'Ciao'"
+    write_artifact(artifact_path(source), code, PRINT_IR, fingerprint(code))
+
+    def detect(self, code):
+        raise AssertionError("lingua rilevata di nuovo")
+
+    monkeypatch.setattr(LanguageDetector, "detect", detect)
+    assert load_ir(source, code, stored_fingerprint) == PRINT_IR
+
+
+def test_corrupt_artifact_is_ignored(tmp_path):
+    path = tmp_path / "rotto.orac"
+    path.write_text("{non json")
+    assert read_artifact(path) is None
+
+
+def test_compile_then_run_skips_parser(tmp_path, monkeypatch):
+    client = FakeClient(lambda messages: PRINT_IR)
+    monkeypatch.setattr(cli, "SemanticParser", fake_parser_factory(client))
+    (tmp_path / "a.ora").write_text("Stampa 'Ciao'")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.ora").write_text("Stampa 'Ciao'.")
+
+    result = runner.invoke(cli.app, ["compile", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert len(client.calls) == 2
+    artifact = read_artifact(tmp_path / "sub" / "b.orac")
+    assert artifact["ir"] == PRINT_IR
+    assert artifact["fingerprint"]["language"] == "it"
+
+    # Artifact aggiornati: niente ricompilazione
+    result = runner.invoke(cli.app, ["compile", str(tmp_path)])
+    assert "aggiornati: 2" in result.output
+    assert len(client.calls) == 2
+
+    # run non costruisce nemmeno il parser
+    monkeypatch.setattr(cli, "SemanticParser", None)
+    result = runner.invoke(cli.app, ["run", str(tmp_path / "a.ora")])
+    assert result.exit_code == 0, result.output
+    assert "Ciao" in result.output
+    assert "Lingua rilevata" not in result.output
+
+
+def test_run_reparses_stale_artifact(tmp_path, monkeypatch):
+    client = FakeClient(lambda messages: PRINT_IR)
+    monkeypatch.setattr(cli, "SemanticParser", fake_parser_factory(client))
+    source = tmp_path / "a.ora"
+    source.write_text("Stampa 'Ciao'")
+    write_artifact(artifact_path(source), "Stampa 'Vecchio'", PRINT_IR, {})
+
+    result = runner.invoke(cli.app, ["run", str(source)])
+
+    assert result.exit_code == 0, result.output
+    assert len(client.calls) == 1
+
+
+def test_run_reparses_artifact_from_other_model(tmp_path, monkeypatch):
+    client = FakeClient(lambda messages: PRINT_IR)
+    monkeypatch.setattr(cli, "SemanticParser", fake_parser_factory(client))
+    source = tmp_path / "a.ora"
+    source.write_text("Stampa 'Ciao'")
+    write_artifact(artifact_path(source), "Stampa 'Ciao'", PRINT_IR,
+                   dict(fingerprint("Stampa 'Ciao'"), model="altro-modello"))
+
+    result = runner.invoke(cli.app, ["run", str(source)])
+
+    assert result.exit_code == 0, result.output
+    assert len(client.calls) == 1
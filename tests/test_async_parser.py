@@ -0,0 +1,92 @@
+"""
+Test Async Semantic Parser (contro un server chat-completions locale)
+"""
+
+import re
+import asyncio
+
+import pytest
+
+from oratio.compiler.async_parser import AsyncSemanticParser, get_llm_pool
+from tests.conftest import PRINT_IR
+
+
+def statement_responder(messages):
+    """Una io.print per ogni frase TODO; le frasi "Conta" usano $stmt_1"""
+    prompt = messages[-1]["content"]
+    statements = []
+    for index, text in re.findall(r'^\[(\d+)\] (.*?)  => TODO$', prompt, re.MULTILINE):
+        if text.startswith("Conta"):
+            ref = "$var_0" if "-> $var_0" in prompt else "$stmt_1"
+            op = {"type": "io.print", "params": {"value": ref}}
+        elif text.startswith("Apri"):
+            op = {"type": "io.read_csv", "params": {"file_path": "a.csv"}, "output": "$var_0"}
+        else:
+            op = {"type": "io.print", "params": {"value": text}}
+        statements.append({"index": int(index), "operations": [op]})
+    return {"statements": statements}
+
+
+def make_parser(server, **kwargs):
+    return AsyncSemanticParser(api_key="test", language="it", base_url=server.base_url,
+                               use_cache=False, fast_path=False, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_whole_program(chat_server):
+    parser = AsyncSemanticParser(api_key="test", language="it", base_url=chat_server.base_url,
+                                 use_cache=False, fast_path=False, incremental=False)
+
+    ir = await parser.parse("Stampa 'Ciao'")
+
+    assert ir == PRINT_IR
+    assert len(chat_server.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_parsed_concurrently(chat_server):
+    chat_server.responder = statement_responder
+    chat_server.delay = 0.3
+    parser = make_parser(chat_server, chunk_size=2)
+    code = "\n".join(f"Scrivi riga {i}." for i in range(8))
+
+    start = asyncio.get_running_loop().time()
+    ir = await parser.parse(code)
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert len(chat_server.requests) == 4
+    assert chat_server.max_in_flight == 4
+    assert elapsed < 0.3 * 3
+    assert [op["params"]["value"] for op in ir["operations"]] == \
+        [f"Scrivi riga {i}." for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_cross_chunk_reference(chat_server):
+    chat_server.responder = statement_responder
+    parser = make_parser(chat_server, chunk_size=1)
+
+    ir = await parser.parse("Apri il file.\nConta le righe.")
+
+    assert len(chat_server.requests) == 2
+    assert ir["operations"][0]["output"] == "$var_0"
+    assert ir["operations"][1]["params"]["value"] == "$var_0"
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit(chat_server):
+    chat_server.responder = statement_responder
+    chat_server.delay = 0.1
+    parser = make_parser(chat_server, chunk_size=1, max_concurrency=2)
+
+    await parser.parse("\n".join(f"Scrivi riga {i}." for i in range(6)))
+
+    assert chat_server.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_is_shared(chat_server):
+    first = get_llm_pool("test", chat_server.base_url)
+    second = get_llm_pool("test", chat_server.base_url)
+
+    assert first is second
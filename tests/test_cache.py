@@ -0,0 +1,97 @@
+"""
+Test IR Cache
+"""
+
+import os
+import time
+
+from oratio.compiler.parser import SemanticParser
+from oratio.compiler.cache import IRCache, normalize_source
+from tests.conftest import PRINT_IR
+
+
+def make_parser(tmp_path, client, **kwargs):
+    parser = SemanticParser(api_key="test", language="it",
+                            cache=IRCache(directory=str(tmp_path)),
+                            incremental=False, fast_path=False, **kwargs)
+    parser.client = client
+    return parser
+
+
+def test_normalize_ignores_formatting():
+    assert normalize_source("Stampa  'x'\r\n\n  Conta.  ") == normalize_source("Stampa 'x'\nConta.")
+
+
+def test_normalize_keeps_spaces_inside_quotes():
+    assert normalize_source('Filtra nome == "a  b"') != normalize_source('Filtra nome == "a b"')
+    assert normalize_source("Stampa   'a  b'") == "Stampa 'a  b'"
+    # L'apostrofo non apre un testo
+    assert normalize_source("Calcola l'importo   totale") == "Calcola l'importo totale"
+
+
+def test_programs_differing_inside_quotes_do_not_share_ir(tmp_path, fake_client):
+    parser = make_parser(tmp_path, fake_client)
+
+    parser.parse('Filtra nome == "a  b"')
+    parser.parse('Filtra nome == "a b"')
+
+    assert len(fake_client.calls) == 2
+    assert parser.cache.hits == 0
+
+
+def test_second_parse_skips_llm(tmp_path, fake_client):
+    parser = make_parser(tmp_path, fake_client)
+
+    first = parser.parse("Stampa 'Ciao'")
+    second = parser.parse("  Stampa 'Ciao'\n")
+
+    assert first == second == PRINT_IR
+    assert len(fake_client.calls) == 1
+    assert parser.cache.hits == 1
+    assert parser.cache.misses == 1
+
+
+def test_key_depends_on_model_and_prompt(tmp_path):
+    cache = IRCache(directory=str(tmp_path))
+    base = cache.key("Stampa 'x'", "it", "gpt-4", "prompt")
+
+    assert cache.key("Stampa 'x'", "it", "gpt-4o", "prompt") != base
+    assert cache.key("Stampa 'x'", "it", "gpt-4", "altro prompt") != base
+    assert cache.key("Stampa 'x'", "en", "gpt-4", "prompt") != base
+
+
+def test_use_cache_false(tmp_path, fake_client):
+    parser = make_parser(tmp_path, fake_client, use_cache=False)
+
+    parser.parse("Stampa 'Ciao'")
+    parser.parse("Stampa 'Ciao'")
+
+    assert parser.cache is None
+    assert len(fake_client.calls) == 2
+
+
+def test_lru_eviction(tmp_path):
+    cache = IRCache(directory=str(tmp_path), max_entries=2)
+
+    cache.put("aa1", PRINT_IR)
+    cache.put("bb2", PRINT_IR)
+    # Rendi "aa1" la voce usata più di recente
+    old = time.time() - 10
+    os.utime(cache._path("bb2"), (old, old))
+    assert cache.get("aa1") is not None
+
+    cache.put("cc3", PRINT_IR)
+
+    assert cache.get("bb2") is None
+    assert cache.get("aa1") is not None
+    assert cache.stats()["entries"] == 2
+    assert cache.evictions == 1
+
+
+def test_corrupt_entry_is_miss(tmp_path):
+    cache = IRCache(directory=str(tmp_path))
+    cache.put("dd4", PRINT_IR)
+    cache._path("dd4").write_text("{non json")
+
+    assert cache.get("dd4") is None
+    assert not cache._path("dd4").exists()
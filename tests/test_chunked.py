@@ -0,0 +1,145 @@
+"""
+Test esecuzione a blocchi: aggregazioni incrementali e merge sort esterno
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oratio.runtime import Runtime
+from oratio.runtime import chunked
+from oratio.runtime.chunked import RunningStats, external_sort
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(chunked, "CHUNK_ROWS", 37)
+    monkeypatch.setattr(chunked, "SORT_RUN_ROWS", 100)
+
+
+@pytest.fixture
+def sales(tmp_path, monkeypatch, small_chunks):
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({
+        "prodotto": rng.choice(["Laptop", "Mouse", "Monitor"], 1000),
+        "importo": rng.integers(1, 500, 1000),
+        "quantita": rng.integers(1, 10, 1000),
+    })
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    return frame
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_external_sort_matches_pandas(small_chunks, ascending):
+    frame = pd.DataFrame({"k": np.random.default_rng(2).integers(0, 50, 1000), "i": range(1000)})
+    chunks = (frame.iloc[i:i + 37] for i in range(0, len(frame), 37))
+
+    result = pd.concat(external_sort(chunks, "k", ascending))
+
+    expected = frame.sort_values(by="k", ascending=ascending, kind="stable")
+    assert result["k"].tolist() == expected["k"].tolist()
+    assert sorted(result["i"]) == list(range(1000))
+
+
+def test_running_stats_match_pandas():
+    values = pd.Series(np.random.default_rng(3).normal(100, 15, 1000))
+    stats = RunningStats()
+    for i in range(0, 1000, 37):
+        stats.update(values.iloc[i:i + 37])
+
+    assert stats.count == 1000
+    assert stats.total == pytest.approx(values.sum())
+    assert stats.var() == pytest.approx(values.var())
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_streaming_aggregates(sales, capsys):
+    filtered = sales[sales["importo"] > 100]["importo"]
+    operations = [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.filter", "$var_1", source="$var_0", condition="importo > 100"),
+    ] + [
+        op(f"op_{name}", f"math.{name}", f"$var_{name}", source="$var_1", column="importo")
+        for name in ("sum", "count", "mean", "min", "max", "var", "std")
+    ]
+    runtime = Runtime(chunked=True, free_memory=False)
+    runtime.execute({"version": "1.0", "operations": operations})
+
+    memory = runtime.memory
+    assert memory["$var_sum"] == filtered.sum()
+    assert memory["$var_count"] == len(filtered)
+    assert memory["$var_mean"] == pytest.approx(filtered.mean())
+    assert (memory["$var_min"], memory["$var_max"]) == (filtered.min(), filtered.max())
+    assert memory["$var_var"] == pytest.approx(filtered.var())
+    assert memory["$var_std"] == pytest.approx(filtered.std())
+
+
+def test_sorted_output_written_in_chunks(sales, tmp_path, capsys):
+    Runtime(chunked=True).execute({"version": "1.0", "operations": [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.filter", "$var_1", source="$var_0", condition="quantita >= 3"),
+        op("op_3", "data.sort", "$var_2", source="$var_1", column="importo", ascending=False),
+        op("op_4", "io.write_csv", source="$var_2", file_path="ordinate.csv"),
+        op("op_5", "data.head", "$var_3", source="$var_2", n=5),
+        op("op_6", "io.write_csv", source="$var_3", file_path="prime.csv"),
+    ]})
+
+    expected = sales[sales["quantita"] >= 3].sort_values(by="importo", ascending=False, kind="stable")
+    written = pd.read_csv(tmp_path / "ordinate.csv")
+    assert written["importo"].tolist() == expected["importo"].tolist()
+    assert len(written) == len(expected)
+    top = pd.read_csv(tmp_path / "prime.csv")
+    assert top["importo"].tolist() == expected["importo"].head(5).tolist()
+
+
+
+@pytest.mark.parametrize("optimize", [True, False])
+def test_text_column_matches_eager(sales, optimize):
+    # Colonne di testo: si materializza e si aggrega come in modalità normale
+    operations = [op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv")] + [
+        op(f"op_{name}", f"math.{name}", f"$var_{name}", source="$var_0", column="prodotto")
+        for name in ("min", "max", "count")
+    ]
+
+    results = []
+    for mode in ({}, {"chunked": True}):
+        runtime = Runtime(free_memory=False, optimize=optimize, **mode)
+        runtime.execute({"version": "1.0", "operations": operations})
+        results.append({name: runtime.memory[f"$var_{name}"] for name in ("min", "max", "count")})
+
+    assert results[1] == results[0] == {"min": "Laptop", "max": "Mouse", "count": 1000}
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_external_sort_with_null_keys(monkeypatch, ascending):
+    monkeypatch.setattr(chunked, "CHUNK_ROWS", 2)
+    monkeypatch.setattr(chunked, "SORT_RUN_ROWS", 4)
+    frame = pd.DataFrame({"k": [3, np.nan, 1, 5, 2, np.nan, 4, 0, np.nan, 6], "i": range(10)})
+    chunks = (frame.iloc[i:i + 2] for i in range(0, len(frame), 2))
+
+    result = pd.concat(external_sort(chunks, "k", ascending))
+
+    expected = frame.sort_values(by="k", ascending=ascending, kind="stable")
+    assert result["i"].tolist() == expected["i"].tolist()
+
+
+@pytest.mark.parametrize("optimize", [True, False])
+def test_min_max_of_empty_stream_is_nan(sales, optimize):
+    operations = [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.filter", "$var_1", source="$var_0", condition="importo > 10000"),
+        op("op_3", "math.min", "$var_min", source="$var_1", column="importo"),
+        op("op_4", "math.max", "$var_max", source="$var_1", column="importo"),
+    ]
+    for mode in ({}, {"chunked": True}):
+        runtime = Runtime(free_memory=False, optimize=optimize, **mode)
+        runtime.execute({"version": "1.0", "operations": operations})
+        assert np.isnan(runtime.memory["$var_min"]) and np.isnan(runtime.memory["$var_max"])
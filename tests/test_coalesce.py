@@ -0,0 +1,138 @@
+"""
+Test Request Coalescing (single-flight)
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from oratio.compiler.parser import SemanticParser
+from oratio.compiler.async_parser import AsyncSemanticParser
+from oratio.compiler.coalesce import SingleFlight
+from tests.conftest import PRINT_IR
+
+
+def test_concurrent_sync_parses_share_one_request(chat_server):
+    chat_server.delay = 0.3
+    before = SemanticParser.flight.stats()["coalesced"]
+    results = []
+
+    def worker():
+        parser = SemanticParser(api_key="test", language="it", base_url=chat_server.base_url,
+                                use_cache=False, incremental=False, fast_path=False)
+        results.append(parser.parse("Stampa 'Ciao'"))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(chat_server.requests) == 1
+    assert results == [PRINT_IR] * 4
+    # Ogni chiamante riceve una copia indipendente
+    assert len({id(ir) for ir in results}) == 4
+    assert SemanticParser.flight.stats()["coalesced"] - before == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_parses_share_one_request(chat_server):
+    chat_server.delay = 0.3
+    before = AsyncSemanticParser.flight.stats()["coalesced"]
+    parsers = [
+        AsyncSemanticParser(api_key="test", language="it", base_url=chat_server.base_url,
+                            use_cache=False, incremental=False, fast_path=False)
+        for _ in range(5)
+    ]
+
+    results = await asyncio.gather(*(p.parse("Stampa 'Ciao'") for p in parsers))
+    # Programmi diversi non vengono accorpati
+    await parsers[0].parse("Stampa 'Ciao a tutti'")
+
+    assert len(chat_server.requests) == 2
+    assert all(ir == PRINT_IR for ir in results)
+    assert AsyncSemanticParser.flight.stats()["coalesced"] - before == 4
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait()
+        raise ValueError("boom")
+
+    def call(fn):
+        try:
+            flight.do("k", fn)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call, args=(failing,))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call, args=(lambda: "mai",))
+    follower.start()
+    while flight.stats()["coalesced"] == 0:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    assert flight.stats() == {"leaders": 1, "coalesced": 1, "in_flight": 0}
+
+
+def test_leader_result_is_not_shared_with_followers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def leader_fn():
+        started.set()
+        release.wait()
+        return {"operations": []}
+
+    def call(fn):
+        result = flight.do("k", fn)
+        result["operations"].append("modificato")  # il chiamante modifica il suo IR
+        results.append(result)
+
+    leader = threading.Thread(target=call, args=(leader_fn,))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call, args=(lambda: None,))
+    follower.start()
+    while flight.stats()["coalesced"] == 0:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert results == [{"operations": ["modificato"]}] * 2
+    assert results[0] is not results[1]
+
+
+def test_differently_configured_parsers_are_not_coalesced(chat_server):
+    chat_server.delay = 0.3
+    results = []
+
+    def worker(incremental):
+        parser = SemanticParser(api_key="test", language="it", base_url=chat_server.base_url,
+                                use_cache=False, incremental=incremental, fast_path=False)
+        results.append(parser.parse_with_stats("Stampa 'Ciao'"))
+
+    threads = [threading.Thread(target=worker, args=(flag,)) for flag in (False, True)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(chat_server.requests) == 2
+    # Statistiche per chiamata: solo il parsing frase per frase le produce
+    assert sorted(stats is None for _, stats in results) == [False, True]
@@ -0,0 +1,112 @@
+"""
+Test I/O Parquet e Arrow e copia Parquet dei CSV
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from oratio.render import ConsoleRenderer  # noqa: E402
+from oratio.runtime import Runtime  # noqa: E402
+from oratio.runtime import columnar  # noqa: E402
+from oratio.runtime.lazy import plan_projections  # noqa: E402
+from oratio.compiler.rules import RuleCompiler  # noqa: E402
+from oratio.compiler.languages import ItalianLanguage  # noqa: E402
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+@pytest.fixture
+def sales(tmp_path, monkeypatch):
+    rng = np.random.default_rng(5)
+    frame = pd.DataFrame({
+        "prodotto": rng.choice(["Laptop", "Mouse", "Monitor"], 1000),
+        "importo": rng.uniform(1, 500, 1000).round(2),
+        "quantita": rng.integers(1, 10, 1000),
+    })
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ORATIO_COLUMNAR_DIR", str(tmp_path / "sidecar"))
+    return frame
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_round_trip_with_column_selection(sales, capsys, fmt):
+    runtime = Runtime()
+    runtime.execute({"version": "1.0", "exports": ["$var_1"], "operations": [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", f"io.write_{fmt}", source="$var_0", file_path=f"vendite.{fmt}"),
+        op("op_3", f"io.read_{fmt}", "$var_1", file_path=f"vendite.{fmt}",
+           columns=["prodotto", "importo"]),
+    ]})
+
+    pd.testing.assert_frame_equal(runtime.memory["$var_1"], sales[["prodotto", "importo"]])
+
+
+def test_arrow_numeric_columns_are_not_copied(tmp_path):
+    frame = pd.DataFrame({"a": np.arange(100_000), "b": np.random.default_rng(6).random(100_000)})
+    columnar.write_arrow(frame, str(tmp_path / "numeri.arrow"))
+
+    before = pa.total_allocated_bytes()
+    result = columnar.read_arrow(str(tmp_path / "numeri.arrow"))
+
+    assert pa.total_allocated_bytes() - before < 1024
+    assert not result["a"].to_numpy().flags.writeable  # vista sulla memory map
+    pd.testing.assert_frame_equal(result, frame)
+
+
+def test_csv_sidecar_served_while_csv_unchanged(sales, monkeypatch, capsys):
+    reads = []
+    read_csv = columnar.pd.read_csv
+    monkeypatch.setattr(columnar.pd, "read_csv", lambda *a, **k: reads.append(a) or read_csv(*a, **k))
+    ir = {"version": "1.0", "exports": ["$var_0"],
+          "operations": [op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv")]}
+
+    first = Runtime(csv_cache=True)
+    first.execute(ir)
+    second = Runtime(csv_cache=True, events=ConsoleRenderer())
+    second.execute(ir)
+
+    assert len(reads) == 1
+    assert "(copia Parquet)" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(second.memory["$var_0"], sales)
+
+    # CSV modificato (dimensione diversa): la copia vecchia non vale più
+    sales.head(10).to_csv("vendite.csv", index=False)
+    third = Runtime(csv_cache=True)
+    third.execute(ir)
+
+    assert len(reads) == 2
+    assert len(third.memory["$var_0"]) == 10
+    assert len(os.listdir(os.environ["ORATIO_COLUMNAR_DIR"])) == 1
+
+
+def test_lazy_projection_selects_parquet_columns():
+    operations = [
+        op("op_1", "io.read_parquet", "$var_0", file_path="vendite.parquet"),
+        op("op_2", "math.sum", "$var_1", source="$var_0", column="importo"),
+    ]
+
+    planned = plan_projections(operations, Runtime())
+
+    assert planned[0]["params"]["columns"] == ["importo"]
+
+
+def test_fast_path_picks_format_from_extension():
+    rules = RuleCompiler()
+    italian = ItalianLanguage()
+
+    read = rules.compile_statement("Carica il file vendite.parquet.", italian)
+    write = rules.compile_statement("Salva i dati in risultati.arrow.", italian)
+
+    assert read["operations"][0]["type"] == "io.read_parquet"
+    assert write["operations"][0]["type"] == "io.write_arrow"
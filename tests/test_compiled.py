@@ -0,0 +1,99 @@
+"""
+Test compilazione dell'IR in closure (compiled.py)
+"""
+
+import copy
+
+import pandas as pd
+import pytest
+
+from oratio.runtime import Runtime
+from oratio.runtime.compiled import compile_operation
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"prodotto": ["Laptop", "Mouse", "Monitor"], "importo": [900, 20, 250]})
+
+
+def test_closure_matches_interpreter(frame):
+    runtime = Runtime()
+    runtime.memory["$var_0"] = frame
+    operation = op("op_1", "data.filter", "$var_1", data="$var_0", condition="importo > 100")
+
+    compiled = compile_operation(runtime, operation)()
+    interpreted = runtime._execute_operation(operation)
+
+    pd.testing.assert_frame_equal(compiled, interpreted)
+    # Le variabili sono lette a ogni chiamata
+    runtime.memory["$var_0"] = frame.head(1)
+    assert len(compile_operation(runtime, operation)()) == 1
+
+
+def test_errors_are_raised_when_executed():
+    runtime = Runtime()
+    unknown = compile_operation(runtime, op("op_1", "data.pivot", "$var_1"))
+
+    with pytest.raises(Exception, match="Operazione non supportata: data.pivot"):
+        unknown()
+    with pytest.raises(Exception, match="Errore durante esecuzione"):
+        compile_operation(runtime, op("op_2", "math.sum", source=None, column="importo"))()
+
+
+@pytest.mark.parametrize("mode", [{}, {"lazy": True}, {"jobs": 2}])
+def test_cached_program_is_reused(tmp_path, monkeypatch, frame, mode):
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    ir = {"version": "1.0", "exports": ["$var_2"], "operations": [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.filter", "$var_1", condition="importo > 100"),
+        op("op_3", "math.sum", "$var_2", column="importo"),
+    ]}
+    runtime = Runtime(**mode)
+
+    assert runtime.execute(ir) == 1150
+    # La sorgente implicita ($var_2 dopo la prima esecuzione) fa parte della chiave
+    program = runtime.compile(ir)
+    assert runtime.execute(dict(ir)) == 1150
+    assert runtime.compile(ir) is program
+    assert len(runtime._programs) == 2
+
+    # Un IR diverso è un programma nuovo
+    ir = copy.deepcopy(ir)
+    ir["operations"][1]["params"]["condition"] = "importo > 500"
+    assert runtime.execute(ir) == 900
+    assert runtime.compile(ir) is not program
+
+
+def test_digest_is_computed_once_per_ir(monkeypatch):
+    runtime = Runtime()
+    ir = {"version": "1.0", "operations": [op("op_1", "io.print", message="ciao")]}
+    digest = runtime._digest(ir)
+
+    monkeypatch.setattr("oratio.runtime.executor.json.dumps", None)  # non più chiamato
+    assert runtime._digest(ir) == digest
+    monkeypatch.undo()
+    assert runtime._digest(dict(ir)) == digest
+
+
+@pytest.mark.parametrize("mode", [{"jobs": 2, "free_memory": False, "optimize": False},
+                                  {"jobs": 2}, {"free_memory": False, "optimize": False}])
+def test_implicit_sources_in_every_mode(tmp_path, monkeypatch, frame, mode):
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    ir = {"version": "1.0", "operations": [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.head", "$var_1", n=2),
+        op("op_3", "math.sum", "$var_2", column="importo"),
+    ]}
+    runtime = Runtime(**mode)
+
+    assert runtime.execute(ir) == 920
+    assert runtime.execute(copy.deepcopy(ir)) == 920
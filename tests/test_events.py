@@ -0,0 +1,83 @@
+"""
+Test eventi strutturati del Runtime (events.py) e resa della CLI (render.py)
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from oratio.render import ConsoleRenderer
+from oratio.runtime import Runtime
+from oratio.runtime.events import Event, EventLog
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+@pytest.fixture
+def ir(tmp_path, monkeypatch):
+    pd.DataFrame({"prodotto": ["Laptop", "Mouse", "Monitor"], "importo": [900, 20, 250]}) \
+        .to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    return {"version": "1.0", "operations": [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.filter", "$var_1", condition="importo > 100"),
+        op("op_3", "math.sum", "$var_2", source="$var_0", column="importo"),
+        op("op_4", "io.print", message="Totale: $var_2"),
+    ]}
+
+
+def test_silent_by_default(ir, capsys):
+    assert Runtime().execute(ir) == "Totale: 1170"
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("mode", [{}, {"jobs": 3}, {"lazy": True}])
+def test_events_in_program_order(ir, capsys, mode):
+    log = EventLog()
+    Runtime(events=log, **mode).execute(ir)
+
+    assert capsys.readouterr().out == ""
+    lazy = mode.get("lazy")
+    kinds = [kind for kind in log.kinds() if kind != "loaded"]
+    assert kinds == ["run.start",
+                     "op.start"] + (["planned"] if lazy else []) + ["op.end",
+                     "op.start", "planned" if lazy else "filtered", "op.end",
+                     "op.start", "aggregate", "op.end",
+                     "op.start", "printed", "op.end",
+                     "run.end"]
+    ends = log.of("op.end")
+    assert [e["id"] for e in ends] == ["op_1", "op_2", "op_3", "op_4"]
+    assert all(e["seconds"] >= 0 for e in ends)
+    assert log.of("aggregate")[0].data == {"function": "sum", "value": 1170}
+    if not mode:
+        assert ends[1]["rows"] == 2
+
+
+def test_console_renderer(ir, capsys):
+    Runtime(events=ConsoleRenderer()).execute(ir)
+    out = capsys.readouterr().out
+    assert "  ▶ data.filter..." in out
+    assert "    ✓ Filtrate: 2 righe" in out
+    assert "    ✓ Somma: 1170.00" in out
+
+    Runtime(events=ConsoleRenderer(progress=False)).execute(ir)
+    assert capsys.readouterr().out == "Totale: 1170\n"
+
+
+def test_records_are_json(ir):
+    log = EventLog()
+    Runtime(events=log).execute(ir)
+    records = [event.record() for event in log.events]
+
+    assert json.loads(json.dumps(records, allow_nan=False)) == records
+    aggregate = next(r for r in records if r["kind"] == "aggregate")
+    assert aggregate["data"] == {"function": "sum", "value": 1170}
+
+    frame = Event("frame", {"frame": pd.DataFrame({"a": [1.5, float("nan")]})}).record()
+    assert frame["data"]["frame"] == {"columns": ["a"], "index": [0, 1], "data": [[1.5], [None]]}
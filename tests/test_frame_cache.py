@@ -0,0 +1,99 @@
+"""
+Test cache dei DataFrame letti (Runtime.frames)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oratio.render import ConsoleRenderer
+from oratio.runtime import Runtime
+from oratio.runtime.frame_cache import FrameCache
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+READ = {"version": "1.0", "exports": ["$var_0"],
+        "operations": [op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv")]}
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    cache = FrameCache()
+    monkeypatch.setattr(Runtime, "frames", cache)
+    return cache
+
+
+@pytest.fixture
+def sales(tmp_path, monkeypatch):
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame({"prodotto": rng.choice(["Laptop", "Mouse"], 200),
+                          "importo": rng.integers(1, 500, 200)})
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    return frame
+
+
+def test_second_read_is_served_from_cache(sales, frames, monkeypatch, capsys):
+    reads = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, "read_csv", lambda *a, **k: reads.append(a) or read_csv(*a, **k))
+
+    Runtime(frame_cache=True).execute(READ)
+    runtime = Runtime(frame_cache=True, events=ConsoleRenderer())
+    runtime.execute(READ)
+
+    assert len(reads) == 1
+    assert "(in cache)" in capsys.readouterr().out
+    assert frames.stats()["hit_ratio"] == 0.5
+    pd.testing.assert_frame_equal(runtime.memory["$var_0"], sales)
+
+
+def test_mutation_does_not_reach_the_cache(sales, frames, capsys):
+    first = Runtime(frame_cache=True)
+    first.execute(READ)
+    first.memory["$var_0"].loc[0, "importo"] = -1
+    first.memory["$var_0"]["nuova"] = 1
+
+    second = Runtime(frame_cache=True)
+    second.execute(READ)
+
+    pd.testing.assert_frame_equal(second.memory["$var_0"], sales)
+
+
+def test_changed_file_is_read_again(sales, frames, capsys):
+    Runtime(frame_cache=True).execute(READ)
+    sales.head(5).to_csv("vendite.csv", index=False)
+
+    runtime = Runtime(frame_cache=True)
+    runtime.execute(READ)
+
+    assert len(runtime.memory["$var_0"]) == 5
+    assert frames.misses == 2
+
+
+def test_lru_eviction_within_budget(tmp_path):
+    frame = pd.DataFrame({"x": np.arange(1000)})
+    paths = []
+    for name in "abc":
+        paths.append(str(tmp_path / f"{name}.csv"))
+        frame.to_csv(paths[-1], index=False)
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    cache = FrameCache(max_bytes=2 * size)
+
+    def load(path):
+        return cache.load(path, "csv", lambda: pd.read_csv(path))[1]
+
+    load(paths[0])
+    load(paths[1])
+    assert load(paths[0])  # a diventa il più recente
+    load(paths[2])  # esce b
+
+    assert cache.evictions == 1
+    assert load(paths[0]) and not load(paths[1])
+    assert cache.stats()["bytes"] <= cache.max_bytes
@@ -0,0 +1,63 @@
+"""
+Test sorgente implicita (ultima variabile prodotta) e namespace del canvas
+"""
+
+from oratio.render import ConsoleRenderer
+from oratio.runtime import Runtime
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+def run(operations, **kwargs):
+    runtime = Runtime(**kwargs)
+    result = runtime.execute({"version": "1.0", "operations": operations})
+    return runtime, result
+
+
+def test_implicit_source_is_last_produced_value(capsys):
+    operations = [
+        op("op_1", "io.print", "$var_0", value=[1, 2, 3]),
+        op("op_2", "io.print", "$var_1", value=[4, 5]),
+        op("op_3", "io.print", "$var_0", value=[6]),
+        op("op_4", "math.count"),
+    ]
+    for kwargs in ({}, {"free_memory": False}, {"jobs": 2}):
+        runtime, result = run(operations, **kwargs)
+        # La riscrittura di $var_0 è l'ultimo valore prodotto
+        assert result == 1
+        assert runtime.last_var == "$var_0"
+        assert runtime.last_value == [6]
+
+
+def test_canvas_lives_outside_memory(tmp_path, capsys):
+    image = tmp_path / "disegno.png"
+    runtime, result = run([
+        op("op_1", "io.print", "$var_0", value=[1, 2, 3]),
+        op("op_2", "viz.create_canvas", width=100, height=100),
+        op("op_3", "viz.draw_circle", radius=10),
+        op("op_4", "math.count"),
+        op("op_5", "viz.save_image", filename=str(image)),
+    ], free_memory=False, events=ConsoleRenderer())
+
+    assert image.exists()
+    assert list(runtime.memory) == ["$var_0"]
+    assert runtime.canvas == {}
+    # Prima la sorgente implicita dopo il canvas era l'asse del disegno
+    assert "Conteggio: 3" in capsys.readouterr().out
+
+
+def test_last_value_carries_over_executions(capsys):
+    runtime = Runtime()
+    runtime.execute({"version": "1.0", "operations": [op("op_1", "io.print", "$var_0", value="ciao")]})
+    # $var_0 è già stata liberata, il valore no
+    assert runtime.execute({"version": "1.0", "operations": [op("op_1", "math.count")]}) == 4
+    # Con la variabile ancora in memoria la sorgente è resa esplicita
+    assert runtime.execute({"version": "1.0", "exports": ["$var_1"], "operations": [
+        op("op_1", "io.print", "$var_1", value="a"),
+        op("op_2", "io.print"),
+    ]}) == "a"
@@ -0,0 +1,166 @@
+"""
+Test Incremental Parsing
+"""
+
+import re
+from pathlib import Path
+
+from oratio.compiler.parser import SemanticParser
+from oratio.compiler.cache import IRCache
+from oratio.compiler.incremental import StatementPlan, split_statements
+from oratio.runtime import Runtime
+from oratio.runtime.events import EventLog
+from tests.conftest import FakeClient
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def statement_responder(messages):
+    """Finto LLM: compila le frasi marcate TODO nel prompt incrementale"""
+    prompt = messages[-1]["content"]
+    next_var = int(re.search(r'\$var_(\d+)\.', prompt).group(1))
+    last_var = None
+    statements = []
+
+    for line in prompt.splitlines():
+        match = re.match(r'\[(\d+)\] (.*?)(?:  => (.*))?$', line)
+        if not match:
+            continue
+        index, text, compiled = match.groups()
+        if compiled != "TODO":
+            produced = re.findall(r'-> (\$var_\d+)', compiled or "")
+            last_var = produced[-1] if produced else last_var
+            continue
+
+        if text.startswith("Carica"):
+            op = {"type": "io.read_csv", "params": {"file_path": text.split()[-1]}}
+        elif text.startswith("Filtra"):
+            op = {"type": "data.filter", "params": {"source": last_var, "condition": "importo > 100"}}
+        else:
+            op = {"type": "io.print", "params": {"message": text, "value": last_var or "-"}}
+        if op["type"] != "io.print":
+            op["output"] = last_var = f"$var_{next_var}"
+            next_var += 1
+        statements.append({"index": int(index), "operations": [op]})
+
+    return {"statements": statements}
+
+
+def make_parser(tmp_path, client):
+    parser = SemanticParser(api_key="test", language="it",
+                            cache=IRCache(directory=str(tmp_path)), fast_path=False)
+    parser.client = client
+    return parser
+
+
+def todo_count(messages):
+    return messages[-1]["content"].count("=> TODO")
+
+
+def test_split_statements():
+    code = (EXAMPLES / "completo.ora").read_text()
+    statements = split_statements(code)
+
+    assert len(statements) == 12
+    assert statements[0] == "Carica il file vendite.csv."
+    assert statements[4] == 'Stampa "Prodotti costosi: {conteggio}".'
+    assert split_statements("Carica dati.csv. Mostra l'importo.") == [
+        "Carica dati.csv.", "Mostra l'importo."
+    ]
+    assert split_statements('Stampa "Fine. Ciao." Conta.') == ['Stampa "Fine. Ciao." Conta.']
+
+
+def test_edit_reparses_only_changed_statement(tmp_path):
+    client = FakeClient(statement_responder)
+    parser = make_parser(tmp_path, client)
+
+    code = "Carica il file a.csv.\nFiltra le righe.\nStampa il risultato."
+    first = parser.parse(code)
+    assert todo_count(client.calls[0]) == 3
+
+    edited = "Carica il file b.csv.\nFiltra le righe.\nStampa il risultato."
+    second = parser.parse(edited)
+
+    # Solo la frase modificata va all'LLM, le altre restano in cache
+    assert len(client.calls) == 2
+    assert todo_count(client.calls[1]) == 1
+    assert "[1] Carica il file b.csv.  => TODO" in client.calls[1][-1]["content"]
+    assert second["operations"][0]["params"]["file_path"] == "b.csv."
+    assert second["operations"][1]["params"]["source"] == "$var_0"
+    assert [op["id"] for op in second["operations"]] == ["op_1", "op_2", "op_3"]
+    assert first["operations"][2] == second["operations"][2]
+
+
+def test_appended_statement_reuses_fragments(tmp_path):
+    client = FakeClient(statement_responder)
+    parser = make_parser(tmp_path, client)
+
+    parser.parse("Carica il file a.csv.\nFiltra le righe.")
+    ir = parser.parse("Carica il file a.csv.\nFiltra le righe.\nFiltra ancora.")
+
+    assert len(client.calls) == 2
+    assert todo_count(client.calls[1]) == 1
+    assert "-> $var_1" in client.calls[1][-1]["content"]
+    ops = ir["operations"]
+    assert ops[2]["params"]["source"] == "$var_1"
+    assert ops[2]["output"] == "$var_2"
+
+
+def test_inserted_statement_renumbers_variables(tmp_path):
+    client = FakeClient(statement_responder)
+    parser = make_parser(tmp_path, client)
+
+    parser.parse("Carica il file a.csv.\nFiltra le righe.")
+    ir = parser.parse("Stampa inizio.\nCarica il file a.csv.\nFiltra le righe.")
+
+    assert todo_count(client.calls[1]) == 1
+    ops = ir["operations"]
+    assert [op["type"] for op in ops] == ["io.print", "io.read_csv", "data.filter"]
+    assert ops[1]["output"] == "$var_0"
+    assert ops[2]["params"]["source"] == "$var_0"
+    assert ops[2]["output"] == "$var_1"
+
+
+def test_edit_removing_output_recompiles_dependents(tmp_path):
+    client = FakeClient(statement_responder)
+    parser = make_parser(tmp_path, client)
+
+    parser.parse("Carica il file a.csv.\nFiltra le righe.")
+    ir = parser.parse("Stampa a.csv.\nFiltra le righe.")
+
+    # Secondo giro: "Filtra" non trova più la variabile della frase 1
+    assert len(client.calls) == 3
+    assert "[2] Filtra le righe.  => TODO" in client.calls[2][-1]["content"]
+    assert [op["type"] for op in ir["operations"]] == ["io.print", "data.filter"]
+
+
+def test_statement_local_vars_are_namespaced():
+    # Output della frase: $var_0; $var_1 è una variabile locale di ogni frase,
+    # che senza rinomina coinciderebbe con l'output globale della seconda
+    def fragment(text):
+        return {"imports": [], "outputs": 1, "operations": [
+            {"type": "io.read_csv", "params": {"file_path": text}, "output": "$var_1"},
+            {"type": "data.head", "params": {"source": "$var_1"}, "output": "$var_0"},
+        ]}
+
+    plan = StatementPlan(["a.csv", "b.csv"])
+    plan.resolve(lambda slot: fragment(slot.text), "cache")
+    operations = plan.assemble()["operations"]
+
+    locals_ = [op["output"] for op in operations if op["type"] == "io.read_csv"]
+    assert locals_ == ["$stmt_1_var_1", "$stmt_2_var_1"]
+    assert [op["params"]["source"] for op in operations if op["type"] == "data.head"] == locals_
+    assert [op["output"] for op in operations if op["type"] == "data.head"] == ["$var_0", "$var_1"]
+
+
+def test_statement_local_value_is_printed():
+    plan = StatementPlan(["Somma e stampa."])
+    plan.resolve(lambda slot: {"imports": [], "outputs": 0, "operations": [
+        {"type": "math.sum", "params": {"source": [1, 2, 3]}, "output": "$var_0"},
+        {"type": "io.print", "params": {"message": "Totale: $var_0 $USD"}},
+    ]}, "cache")
+    log = EventLog()
+
+    Runtime(events=log).execute(plan.assemble())
+
+    assert [e["text"] for e in log.of("printed")] == ["Totale: 6 $USD"]
@@ -0,0 +1,62 @@
+"""
+Test rilevamento lingua
+"""
+
+from oratio.compiler.languages import LanguageDetector, Language, EnglishLanguage, tokenize
+
+
+class SpanishLanguage(Language):
+    def __init__(self):
+        super().__init__('es', 'Español')
+
+    def get_keywords(self):
+        return {
+            'io': ['carga', 'imprime', 'muestra'],
+            'common': ['donde', 'para', 'el', 'los', 'las'],
+        }
+
+
+def test_keywords_match_whole_words_only():
+    # "il" dentro "file" e "la" dentro "last" non sono italiano
+    detector = LanguageDetector()
+    assert detector.detect("Load the file data.csv and show the last rows").code == 'en'
+    assert EnglishLanguage().detect("il file") == 0.0
+
+
+def test_language_index_is_built_once(monkeypatch):
+    english = EnglishLanguage()
+    assert english.detect("Load the file and show the rows") > 0
+    index = english._index
+
+    monkeypatch.setattr(english, "get_keywords", lambda: {})  # non più letto
+    assert english.detect("Load the file and show the rows") > 0
+    assert english._index is index
+
+
+def test_long_keywords_match_as_stems():
+    detector = LanguageDetector()
+    assert detector.detect("Filtrate i record e calcolare la media").code == 'it'
+
+
+def test_result_is_cached_per_source():
+    detector = LanguageDetector()
+    code = "Carica il file vendite.csv. Mostra le prime 5 righe."
+
+    first = detector.detect(code)
+    second = detector.detect(code)
+
+    assert first is second
+    assert (detector.hits, detector.misses) == (1, 1)
+
+
+def test_add_language():
+    detector = LanguageDetector()
+    detector.add_language(SpanishLanguage())
+
+    assert detector.detect("Carga el archivo y muestra los datos para el informe").code == 'es'
+    assert detector.detect("Carica il file e mostra i dati").code == 'it'
+    assert detector.get_language('es').name == 'Español'
+
+
+def test_tokenize_handles_accents_and_elisions():
+    assert tokenize("Calcola l'importo è più!") == ['calcola', 'l', 'importo', 'è', 'più']
@@ -0,0 +1,88 @@
+"""
+Test chiamate LLM con deadline, backoff e hedging (server con ritardi)
+"""
+
+import time
+
+import pytest
+
+from oratio.compiler.parser import SemanticParser
+from oratio.compiler.async_parser import AsyncSemanticParser
+from oratio.compiler.latency import LatencyHistogram, backoff_delay
+from oratio.compiler.errors import ParseError
+from tests.conftest import PRINT_IR
+
+
+def make_parser(server, cls=SemanticParser, **kwargs):
+    return cls(api_key="test", language="it", base_url=server.base_url, use_cache=False,
+               incremental=False, fast_path=False, latency=LatencyHistogram(), **kwargs)
+
+
+def test_hedged_request_wins_over_stalled_one(chat_server):
+    chat_server.delay = lambda n: 3.0 if n == 0 else 0.0
+    parser = make_parser(chat_server, hedge_percentile=0.95, hedge_delay=0.2)
+
+    start = time.monotonic()
+    ir = parser.parse("Stampa 'Ciao'")
+
+    assert ir == PRINT_IR
+    assert time.monotonic() - start < 1.5
+    assert len(chat_server.requests) == 2
+    assert parser.latency.snapshot()["events"] == {"hedges": 1, "hedge_wins": 1}
+
+
+def test_stalled_attempt_is_retried_after_attempt_timeout(chat_server):
+    chat_server.delay = lambda n: 3.0 if n == 0 else 0.0
+    parser = make_parser(chat_server, attempt_timeout=0.3)
+
+    start = time.monotonic()
+    ir = parser.parse("Stampa 'Ciao'")
+
+    assert ir == PRINT_IR
+    assert time.monotonic() - start < 1.5
+    assert len(chat_server.requests) == 2
+    assert parser.latency.snapshot()["events"] == {"failures": 1}
+
+
+def test_deadline_bounds_the_whole_parse(chat_server):
+    chat_server.delay = 3.0
+    parser = make_parser(chat_server, deadline=0.5)
+
+    start = time.monotonic()
+    with pytest.raises(ParseError, match="deadline"):
+        parser.parse("Stampa 'Ciao'")
+
+    assert time.monotonic() - start < 1.5
+    assert parser.latency.snapshot()["events"]["deadline_exceeded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_hedging(chat_server):
+    chat_server.delay = lambda n: 3.0 if n == 0 else 0.0
+    parser = make_parser(chat_server, cls=AsyncSemanticParser,
+                         hedge_percentile=0.95, hedge_delay=0.2)
+
+    start = time.monotonic()
+    ir = await parser.parse("Stampa 'Ciao'")
+
+    assert ir == PRINT_IR
+    assert time.monotonic() - start < 1.5
+    assert parser.latency.snapshot()["events"] == {"hedges": 1, "hedge_wins": 1}
+
+
+def test_histogram_percentiles_and_export():
+    histogram = LatencyHistogram(min_samples=10)
+    for i in range(1, 10):
+        histogram.record(i / 100)
+    assert histogram.percentile(0.95) is None
+
+    histogram.record(0.9)
+    snapshot = histogram.snapshot()
+
+    assert histogram.percentile(0.5) == 0.05
+    assert histogram.percentile(0.95) == 0.9
+    assert snapshot["count"] == 10
+    assert snapshot["buckets"]["0.05"] == 5
+    assert snapshot["buckets"]["+Inf"] == 10
+    assert all(0 <= backoff_delay(a, base=0.5, cap=2.0) <= min(2.0, 0.5 * 2 ** a)
+               for a in range(6))
@@ -0,0 +1,82 @@
+"""
+Test esecuzione lazy: proiezione e filtri applicati in lettura
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oratio.runtime import Runtime
+from oratio.runtime import lazy
+from oratio.runtime.lazy import plan_projections
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+STATS = [
+    op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+    op("op_2", "data.filter", "$var_1", source="$var_0", condition="importo > 100"),
+    op("op_3", "data.sort", "$var_2", source="$var_1", column="quantita", ascending=False),
+    op("op_4", "math.mean", "$var_3", source="$var_2", column="importo"),
+    op("op_5", "math.count", "$var_4", source="$var_1"),
+    op("op_6", "io.print", message="Media: $var_3 su $var_4"),
+]
+
+
+@pytest.fixture
+def wide_csv(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.integers(0, 50, (1000, 20)), columns=[f"extra_{i}" for i in range(20)])
+    frame["importo"] = rng.integers(1, 300, 1000)
+    frame["quantita"] = rng.integers(1, 10, 1000)
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    return frame
+
+
+def test_projection_collects_used_columns():
+    planned = plan_projections(STATS, Runtime())
+    assert planned[0]["params"]["usecols"] == ["importo", "quantita"]
+
+    # Un DataFrame stampato per intero richiede tutte le colonne
+    planned = plan_projections(STATS + [op("op_7", "data.show", source="$var_2")], Runtime())
+    assert "usecols" not in planned[0]["params"]
+
+
+def test_lazy_matches_eager(wide_csv, monkeypatch, capsys):
+    reads = []
+    read_csv = pd.read_csv
+
+    def spy(*args, **kwargs):
+        reads.append(kwargs)
+        return read_csv(*args, **kwargs)
+
+    eager = Runtime().execute({"version": "1.0", "operations": STATS})
+
+    monkeypatch.setattr(lazy, "CHUNK_ROWS", 100)
+    monkeypatch.setattr(lazy.pd, "read_csv", spy)
+    result = Runtime(lazy=True).execute({"version": "1.0", "operations": STATS})
+
+    assert result == eager
+    # Filtro in lettura a blocchi, solo le colonne usate, ordinamento ignorato
+    assert reads and all(kwargs["usecols"] == ["importo"] for kwargs in reads)
+    assert all(kwargs["chunksize"] == 100 for kwargs in reads)
+
+
+def test_sinks_materialize(wide_csv, tmp_path, capsys):
+    runtime = Runtime(lazy=True)
+    runtime.execute({"version": "1.0", "operations": [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.filter", "$var_1", source="$var_0", condition="importo >= 150"),
+        op("op_3", "data.sort", "$var_2", source="$var_1", column="importo"),
+        op("op_4", "io.write_csv", source="$var_2", file_path="filtrate.csv"),
+    ]})
+
+    expected = wide_csv[wide_csv["importo"] >= 150].sort_values(by="importo")
+    written = pd.read_csv(tmp_path / "filtrate.csv")
+    assert written.equals(expected.reset_index(drop=True))
@@ -0,0 +1,75 @@
+"""
+Test liveness delle variabili e rilascio della memoria
+"""
+
+import pandas as pd
+import pytest
+
+from oratio.runtime import Runtime
+from oratio.runtime.analysis import last_uses
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+PIPELINE = [
+    op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+    op("op_2", "data.filter", "$var_1", source="$var_0", condition="importo > 100"),
+    op("op_3", "data.sort", "$var_2", source="$var_1", column="importo"),
+    op("op_4", "math.sum", "$var_3", source="$var_2", column="importo"),
+    op("op_5", "io.print", message="Totale: $var_3"),
+]
+
+
+@pytest.fixture
+def sales_csv(tmp_path, monkeypatch):
+    pd.DataFrame({"importo": [50, 150, 300, 80, 120]}).to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+
+
+def test_last_uses():
+    runtime = Runtime()
+    free = last_uses(PIPELINE, runtime.operations, exports={"$var_3"})
+    assert free == [[], ["$var_0"], ["$var_1"], ["$var_2"], []]
+
+
+def test_implicit_source_keeps_everything_alive():
+    runtime = Runtime()
+    ops = [
+        op("op_1", "io.print", "$var_0", value=1),
+        op("op_2", "viz.create_canvas"),
+        op("op_3", "math.count"),
+    ]
+    assert last_uses(ops, runtime.operations) == [[], [], ["$var_0"]]
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_dead_variables_are_released(sales_csv, capsys, jobs):
+    runtime = Runtime(jobs=jobs)
+    seen = []
+    sort = runtime.operations["data.sort"]
+
+    def spy_sort(**kwargs):
+        seen.append(set(runtime.memory))
+        return sort(**kwargs)
+
+    runtime.operations["data.sort"] = spy_sort
+
+    result = runtime.execute({"version": "1.0", "operations": PIPELINE, "exports": ["$var_3"]})
+
+    assert result == "Totale: 570"
+    assert seen == [{"$var_1"}]
+    assert runtime.memory == {"$var_3": 570}
+    assert runtime.last_report["freed"] == 3
+    assert runtime.last_report["peak_rss"] is None or runtime.last_report["peak_rss"] > 0
+
+
+def test_free_memory_disabled(sales_csv, capsys):
+    runtime = Runtime(free_memory=False)
+    runtime.execute({"version": "1.0", "operations": PIPELINE})
+    assert set(runtime.memory) == {"$var_0", "$var_1", "$var_2", "$var_3"}
+    assert runtime.last_report["freed"] == 0
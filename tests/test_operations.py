@@ -0,0 +1,94 @@
+"""
+Test operazioni su DataFrame: unique, value_counts, drop, rename,
+fillna, dropna, std/var, string.upper/lower
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oratio.runtime import Runtime
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "prodotto": ["Laptop", "mouse", "Laptop", None, "Monitor"],
+        "importo": [1200.0, 25.0, np.nan, 300.0, 250.0],
+        "quantita": [1, 3, 2, 1, 2],
+    })
+
+
+@pytest.fixture
+def runtime(capsys):
+    return Runtime()
+
+
+def test_unique_and_value_counts(runtime, frame):
+    unique = runtime.operations["data.unique"](source=frame, column="quantita")
+    assert unique.columns.tolist() == ["quantita"]
+    assert unique["quantita"].tolist() == [1, 3, 2]
+    assert len(runtime.operations["data.unique"](source=frame)) == 5
+    assert runtime.operations["data.unique"](source=[2, 1, 2])["valore"].tolist() == [2, 1]
+
+    counts = runtime.operations["data.value_counts"](source=frame, column="prodotto")
+    assert counts.columns.tolist() == ["prodotto", "conteggio"]
+    assert counts.iloc[0].tolist() == ["Laptop", 2]
+
+
+def test_drop_and_rename_do_not_touch_the_source(runtime, frame):
+    dropped = runtime.operations["data.drop"](source=frame, columns="quantita")
+    renamed = runtime.operations["data.rename"](source=frame, columns={"importo": "totale"})
+
+    assert dropped.columns.tolist() == ["prodotto", "importo"]
+    assert renamed.columns.tolist() == ["prodotto", "totale", "quantita"]
+    assert frame.columns.tolist() == ["prodotto", "importo", "quantita"]
+    with pytest.raises(ValueError):
+        runtime.operations["data.rename"](source=frame, columns={"prezzo": "totale"})
+
+
+def test_fillna_and_dropna_by_column(runtime, frame):
+    filled = runtime.operations["data.fillna"](source=frame, column="importo", value=0)
+    assert filled["importo"].tolist() == [1200.0, 25.0, 0.0, 300.0, 250.0]
+    assert filled["prodotto"].isna().sum() == 1
+
+    assert len(runtime.operations["data.dropna"](source=frame)) == 3
+    assert len(runtime.operations["data.dropna"](source=frame, column="importo")) == 4
+    assert frame["importo"].isna().sum() == 1
+
+
+def test_std_and_var_match_pandas(runtime, frame):
+    assert runtime.operations["math.var"](source=frame, column="importo") == \
+        pytest.approx(frame["importo"].var())
+    assert runtime.operations["math.std"](source=frame, column="quantita") == \
+        pytest.approx(frame["quantita"].std())
+    assert runtime.operations["math.std"](source=[1, 2, 3, 4]) == pytest.approx(np.std([1, 2, 3, 4], ddof=1))
+
+
+def test_string_case_on_text_columns(runtime, frame):
+    upper = runtime.operations["string.upper"](source=frame)
+    lower = runtime.operations["string.lower"](source=frame, column="prodotto")
+
+    assert upper["prodotto"].tolist()[:2] == ["LAPTOP", "MOUSE"]
+    assert pd.isna(upper["prodotto"].iloc[3])
+    assert lower["prodotto"].tolist()[0] == "laptop"
+    assert upper["quantita"].tolist() == frame["quantita"].tolist()
+    assert runtime.operations["string.upper"](source="ciao") == "CIAO"
+
+
+def test_std_and_var_fuse_with_other_aggregates(tmp_path, monkeypatch, capsys, frame):
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    operations = [{"id": "op_1", "type": "io.read_csv", "params": {"file_path": "vendite.csv"},
+                   "output": "$var_0"}]
+    for i, name in enumerate(["mean", "std", "var"]):
+        operations.append({"id": f"op_{i + 2}", "type": f"math.{name}", "output": f"$var_{i + 1}",
+                           "params": {"source": "$var_0", "column": "importo"}})
+
+    runtime = Runtime(chunked=True)
+    runtime.execute({"version": "1.0", "operations": operations,
+                     "exports": ["$var_1", "$var_2", "$var_3"]})
+
+    assert runtime.last_report["scans"]["scans_after"] == 1
+    assert runtime.memory["$var_2"] == pytest.approx(frame["importo"].std())
+    assert runtime.memory["$var_3"] == pytest.approx(frame["importo"].var())
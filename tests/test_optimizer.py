@@ -0,0 +1,113 @@
+"""
+Test fusione delle aggregazioni sorelle (optimizer.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oratio.render import ConsoleRenderer
+from oratio.runtime import Runtime
+from oratio.runtime import chunked
+from oratio.runtime.optimizer import fuse_aggregates
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+COMPLETO = [
+    op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+    op("op_2", "data.filter", "$var_1", source="$var_0", condition="importo > 100"),
+    op("op_3", "math.count", "$var_2", source="$var_1"),
+    op("op_4", "math.sum", "$var_3", source="$var_1", column="importo"),
+    op("op_5", "math.mean", "$var_4", source="$var_1", column="importo"),
+    op("op_6", "io.print", message="$var_2 $var_3 $var_4"),
+]
+
+
+@pytest.fixture
+def sales(tmp_path, monkeypatch):
+    rng = np.random.default_rng(4)
+    frame = pd.DataFrame({
+        "prodotto": rng.choice(["Laptop", "Mouse", "Monitor"], 500),
+        "importo": rng.integers(1, 500, 500),
+    })
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    return frame
+
+
+def test_fuses_siblings_of_the_same_definition():
+    operations = COMPLETO + [
+        op("op_7", "data.filter", "$var_1", source="$var_0", condition="importo < 50"),
+        op("op_8", "math.max", "$var_5", source="$var_1", column="importo"),
+        op("op_9", "math.min", "$var_6", source="$var_1", column="quantita"),
+    ]
+
+    fused, scans = fuse_aggregates(operations)
+
+    assert [o["type"] for o in fused[2:5]] == ["math.aggregate"] * 3
+    assert [o["output"] for o in fused[2:5]] == ["$var_2", "$var_3", "$var_4"]
+    assert fused[3]["params"]["functions"] == ["count", "sum", "mean"]
+    # Dopo la riscrittura di $var_1 nessuna aggregazione ha sorelle
+    assert fused[7:] == operations[7:]
+    assert scans == {"scans_before": 5, "scans_after": 3}
+
+
+@pytest.mark.parametrize("mode", [{}, {"lazy": True}, {"chunked": True}, {"jobs": 3}])
+def test_fused_results_match_unfused(sales, monkeypatch, capsys, mode):
+    monkeypatch.setattr(chunked, "CHUNK_ROWS", 37)
+
+    fused = Runtime(events=ConsoleRenderer(), **mode)
+    fused.execute({"version": "1.0", "operations": COMPLETO, "exports": ["$var_2", "$var_3", "$var_4"]})
+    out = capsys.readouterr().out
+
+    plain = Runtime(optimize=False, events=ConsoleRenderer(), **mode)
+    plain.execute({"version": "1.0", "operations": COMPLETO, "exports": ["$var_2", "$var_3", "$var_4"]})
+    expected = capsys.readouterr().out
+
+    filtered = sales[sales["importo"] > 100]["importo"]
+    assert fused.memory["$var_2"] == len(filtered)
+    assert fused.memory["$var_3"] == filtered.sum()
+    assert fused.memory["$var_4"] == pytest.approx(filtered.mean())
+    assert fused.last_report["scans"] == {"scans_before": 3, "scans_after": 1}
+    assert "Aggregazioni fuse: 3 letture → 1" in out
+
+    def results(text):
+        return [line for line in text.splitlines()
+                if ("✓" in line or "📄" in line) and "Caricato" not in line]
+
+    assert results(out) == results(expected)
+
+
+def test_lazy_group_reads_the_file_once(sales, monkeypatch, capsys):
+    from oratio.runtime import lazy
+
+    reads = []
+    read_csv = lazy.pd.read_csv
+    monkeypatch.setattr(lazy.pd, "read_csv", lambda *a, **k: reads.append(k) or read_csv(*a, **k))
+
+    Runtime(lazy=True).execute({"version": "1.0", "operations": COMPLETO})
+
+    assert len(reads) == 1
+    assert reads[0]["usecols"] == ["importo"]
+
+
+def test_error_only_affects_its_operation(tmp_path, monkeypatch, capsys):
+    pd.DataFrame({"prodotto": ["a", "b", "c"]}).to_csv(tmp_path / "nomi.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    operations = [
+        op("op_1", "io.read_csv", "$var_0", file_path="nomi.csv"),
+        op("op_2", "math.max", "$var_1", source="$var_0", column="prodotto"),
+        op("op_3", "math.mean", "$var_2", source="$var_0", column="prodotto"),
+    ]
+    runtime = Runtime()
+
+    with pytest.raises(Exception, match="math.mean|Errore"):
+        runtime.execute({"version": "1.0", "operations": operations, "exports": ["$var_1"]})
+
+    assert runtime.memory["$var_1"] == "c"
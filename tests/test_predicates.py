@@ -0,0 +1,80 @@
+"""
+Test condizioni composte di data.filter (predicates.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oratio.runtime import Runtime
+from oratio.runtime.predicates import compile_condition
+
+
+FRAME = pd.DataFrame({
+    "importo": [50, 150, 250, np.nan],
+    "prodotto": ["Laptop", "Mouse", "Monitor LG", None],
+    "email": ["a@x.it", None, "c@y.it", "d@z.it"],
+})
+
+
+@pytest.mark.parametrize("condition, rows", [
+    ("importo > 100", [1, 2]),
+    ("importo>=150 and prodotto == Mouse", [1]),
+    ("(prodotto = 'Laptop' oppure prodotto = Mouse) e non importo < 100", [1]),
+    ("importo != 150", [0, 2, 3]),
+    ("prodotto in (Laptop, Mouse)", [0, 1]),
+    ("prodotto non in [Laptop]", [1, 2, 3]),
+    ("importo tra 100 e 200", [1]),
+    ("importo between 100 and 300", [1, 2]),
+    ("email is null", [1]),
+    ("email non è nullo and importo > 0", [0, 2]),
+    ("prodotto contains 'LG'", [2]),
+    ("prodotto inizia con M", [1, 2]),
+    ("prodotto == Monitor LG", [2]),
+])
+def test_text_conditions(condition, rows):
+    predicate = compile_condition(condition)
+
+    assert FRAME[predicate.mask(FRAME)].index.tolist() == rows
+
+
+def test_dict_conditions_and_legacy_params():
+    condition = {"or": [{"column": "importo", "operator": ">", "value": 200},
+                        {"column": "prodotto", "operator": "not in", "value": ["Mouse", "Monitor LG"]}]}
+
+    assert compile_condition(condition).mask(FRAME).tolist() == [True, False, True, True]
+    assert compile_condition(None, "importo", ">=", 150).mask(FRAME).tolist() == [False, True, True, False]
+
+
+def test_compiled_conditions_are_cached():
+    assert compile_condition("importo > 1 and email is null") is \
+        compile_condition("importo > 1 and email is null")
+    assert compile_condition("importo > 1 and email is null").columns == ["importo", "email"]
+
+
+@pytest.mark.parametrize("condition", ["importo >", "importo ?? 3", "(importo > 1", ""])
+def test_invalid_conditions(condition):
+    with pytest.raises(ValueError):
+        compile_condition(condition)
+
+
+@pytest.mark.parametrize("mode", [{}, {"lazy": True}, {"chunked": True}])
+def test_compound_filter_in_every_mode(tmp_path, monkeypatch, capsys, mode):
+    rng = np.random.default_rng(8)
+    frame = pd.DataFrame({"regione": rng.choice(["Nord", "Sud", "Centro"], 500),
+                          "importo": rng.integers(1, 500, 500),
+                          "extra": rng.integers(0, 9, 500)})
+    frame.to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+
+    runtime = Runtime(**mode)
+    runtime.execute({"version": "1.0", "exports": ["$var_2"], "operations": [
+        {"id": "op_1", "type": "io.read_csv", "params": {"file_path": "vendite.csv"}, "output": "$var_0"},
+        {"id": "op_2", "type": "data.filter", "output": "$var_1",
+         "params": {"source": "$var_0", "condition": "regione in (Nord, Sud) and importo tra 100 e 300"}},
+        {"id": "op_3", "type": "math.sum", "params": {"source": "$var_1", "column": "importo"},
+         "output": "$var_2"},
+    ]})
+
+    expected = frame[frame["regione"].isin(["Nord", "Sud"]) & frame["importo"].between(100, 300)]
+    assert runtime.memory["$var_2"] == expected["importo"].sum()
@@ -0,0 +1,115 @@
+"""
+Test hook per operazione, profiler e tracing (profiler.py, tracing.py)
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from oratio import tracing
+from oratio.compiler.validator import IRValidator
+from oratio.runtime import Runtime
+from oratio.runtime.profiler import OperationHook, Profiler
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+@pytest.fixture
+def ir(tmp_path, monkeypatch):
+    pd.DataFrame({"prodotto": ["Laptop", "Mouse", "Monitor"], "importo": [900, 20, 250]}) \
+        .to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    return {"version": "1.0", "operations": [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.filter", "$var_1", source="$var_0", condition="importo > 100"),
+        op("op_3", "math.sum", "$var_2", source="$var_1", column="importo"),
+    ]}
+
+
+class Recorder(OperationHook):
+    def __init__(self):
+        self.calls = []
+
+    def before_operation(self, op, index):
+        self.calls.append(("before", op["id"], index))
+
+    def after_operation(self, op, index, stats):
+        self.calls.append(("after", op["id"], stats))
+
+
+@pytest.mark.parametrize("mode", [{}, {"jobs": 3}])
+def test_hooks_receive_stats(ir, mode):
+    hook = Recorder()
+    assert Runtime(hooks=[hook], **mode).execute(ir) == 1150
+
+    before = [call for call in hook.calls if call[0] == "before"]
+    stats = {call[1]: call[2] for call in hook.calls if call[0] == "after"}
+    assert [call[1] for call in before] == ["op_1", "op_2", "op_3"]
+    assert stats["op_1"]["rows_in"] is None and stats["op_1"]["rows_out"] == 3
+    assert stats["op_2"]["rows_in"] == 3 and stats["op_2"]["rows_out"] == 2
+    assert stats["op_3"]["rows_out"] is None
+    assert stats["op_2"]["result_bytes"] > 0
+    assert all(s["wall"] >= 0 and s["cpu"] >= 0 and s["error"] is None for s in stats.values())
+    assert stats["op_1"]["allocated"] is None  # tracemalloc spento
+
+
+def test_add_hook_and_errors(ir):
+    runtime = Runtime()
+    hook = runtime.add_hook(Recorder())
+    ir["operations"][1]["params"]["condition"] = "colonna_inesistente > 1"
+    with pytest.raises(Exception):
+        runtime.execute(ir)
+    failed = [call[2] for call in hook.calls if call[0] == "after"][-1]
+    assert failed["id"] == "op_2" and failed["error"]
+
+
+def test_profiler_trace_and_folded(ir, tmp_path):
+    profiler = Profiler()
+    with profiler:
+        IRValidator().validate(ir)
+        Runtime(hooks=[profiler]).execute(ir)
+    assert tracing.active() is None
+
+    operations = profiler.operations()
+    assert [s["id"] for s in operations] == ["op_1", "op_2", "op_3"]
+    assert all(s["allocated"] is not None for s in operations)
+
+    trace = profiler.chrome_trace()
+    names = {e["name"] for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert {"IRValidator.validate", "Runtime.execute", "Runtime.compile",
+            "io.read_csv", "data.filter", "math.sum"} <= names
+    assert all(e["dur"] >= 0 for e in trace["traceEvents"] if e["ph"] == "X")
+
+    folded = profiler.folded().splitlines()
+    assert any(line.startswith("Runtime.execute;data.filter ") for line in folded)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in folded)
+
+    written = profiler.write(str(tmp_path / "profilo.json"))
+    assert [path.name for path in written] == ["profilo.json", "profilo.folded"]
+    assert json.loads(written[0].read_text())["traceEvents"]
+
+
+def test_spans_without_tracer():
+    calls = []
+
+    @tracing.traced("fase")
+    def fase():
+        calls.append(1)
+        return 42
+
+    assert tracing.active() is None
+    assert fase() == 42
+    with tracing.span("vuoto"):
+        pass
+
+    profiler = Profiler(memory=False)
+    with profiler:
+        with tracing.span("esterna"):
+            fase()
+    assert [(s.name, s.stack) for s in profiler.spans] == [("fase", ("esterna",)), ("esterna", ())]
@@ -0,0 +1,99 @@
+"""
+Test Rule-based Fast Path
+"""
+
+import re
+from pathlib import Path
+
+from oratio.compiler.parser import SemanticParser
+from oratio.compiler.languages import ItalianLanguage, EnglishLanguage
+from oratio.compiler.rules import RuleCompiler
+from tests.conftest import FakeClient
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def llm_responder(messages):
+    """Finto LLM: una io.print per ogni frase TODO, più un math.sum sulla frase 6"""
+    prompt = messages[-1]["content"]
+    next_var = int(re.search(r'\$var_(\d+)\.', prompt).group(1))
+    statements = []
+    for index in re.findall(r'^\[(\d+)\] .*=> TODO$', prompt, re.MULTILINE):
+        if index == "6":
+            op = {"type": "math.sum", "params": {"source": "$var_1", "column": "importo"},
+                  "output": f"$var_{next_var}"}
+            next_var += 1
+        else:
+            op = {"type": "io.print", "params": {"value": "x"}}
+        statements.append({"index": int(index), "operations": [op]})
+    return {"statements": statements}
+
+
+def make_parser(language="it", responder=llm_responder):
+    parser = SemanticParser(api_key="test", language=language, use_cache=False)
+    parser.client = FakeClient(responder)
+    return parser
+
+
+def test_common_sentences():
+    rules = RuleCompiler()
+    italian = ItalianLanguage()
+
+    fragment = rules.compile_statement("Carica il file vendite.csv.", italian)
+    assert fragment["operations"][0]["type"] == "io.read_csv"
+    assert fragment["operations"][0]["params"]["file_path"] == "vendite.csv"
+    assert fragment["imports"] == []
+
+    fragment = rules.compile_statement("Calcola la media della colonna importo", italian)
+    assert fragment["operations"][0]["type"] == "math.mean"
+    assert fragment["operations"][0]["params"] == {"source": "$var_0", "column": "importo"}
+
+    fragment = rules.compile_statement("Filtra le righe dove importo è maggiore di 100.", italian)
+    assert fragment["operations"][0]["params"]["condition"] == "importo > 100"
+
+    fragment = rules.compile_statement('Print "Hello World!"', EnglishLanguage())
+    assert fragment["operations"][0]["params"] == {"value": "Hello World!"}
+
+    # Frasi con segnaposto o formulazioni libere restano all'LLM
+    assert rules.compile_statement('Stampa "Totale: {somma} euro".', italian) is None
+    assert rules.compile_statement("Calcola la somma totale degli importi.", italian) is None
+
+
+def test_fully_covered_script_skips_llm():
+    parser = make_parser()
+
+    ir, stats = parser.parse_with_stats("Carica il file vendite.csv.\nMostra le prime 3 righe.\n"
+                                        "Calcola la media della colonna importo.")
+
+    assert parser.client.calls == []
+    assert stats["coverage"] == 1.0
+    assert [op["type"] for op in ir["operations"]] == ["io.read_csv", "data.show", "math.mean"]
+    assert ir["operations"][1]["params"]["source"] == "$var_0"
+    assert ir["operations"][2]["output"] == "$var_1"
+
+
+def test_leftover_statements_go_to_llm():
+    parser = make_parser()
+
+    ir, stats = parser.parse_with_stats((EXAMPLES / "completo.ora").read_text())
+
+    assert len(parser.client.calls) == 1
+    assert parser.client.calls[0][-1]["content"].count("=> TODO") == 6
+    assert stats == {
+        "statements": 12, "rules": 6, "cache": 0, "llm": 6, "coverage": 0.5
+    }
+
+    ops = {op["id"]: op for op in ir["operations"]}
+    # "Ordina" lavora sull'output del filtro, non sulla somma dell'LLM
+    assert ops["op_6"]["type"] == "math.sum"
+    assert ops["op_10"]["type"] == "data.sort"
+    assert ops["op_10"]["params"]["source"] == ops["op_3"]["output"]
+
+
+def test_english_script():
+    parser = make_parser(language="en")
+
+    _, stats = parser.parse_with_stats((EXAMPLES / "test_english.ora").read_text())
+
+    assert stats["statements"] == 5
+    assert stats["rules"] == 3
@@ -0,0 +1,139 @@
+"""
+Test esecuzione parallela dell'IR (DataflowScheduler)
+"""
+
+import time
+import threading
+
+import pandas as pd
+import pytest
+
+from oratio.render import ConsoleRenderer
+from oratio.runtime import Runtime
+from oratio.runtime.analysis import resolve_implicit_sources, dependencies
+
+
+def op(op_id, op_type, output=None, **params):
+    result = {"id": op_id, "type": op_type, "params": params}
+    if output:
+        result["output"] = output
+    return result
+
+
+STATS_IR = {
+    "version": "1.0",
+    "operations": [
+        op("op_1", "io.read_csv", "$var_0", file_path="vendite.csv"),
+        op("op_2", "data.filter", "$var_1", source="$var_0", condition="importo > 100"),
+        op("op_3", "math.sum", "$var_2", source="$var_1", column="importo"),
+        op("op_4", "math.mean", "$var_3", source="$var_1", column="importo"),
+        op("op_5", "math.max", "$var_4", source="$var_1", column="importo"),
+        op("op_6", "io.print", message="Totale: $var_2, media: $var_3, massimo: $var_4"),
+    ]
+}
+
+
+@pytest.fixture
+def sales_csv(tmp_path, monkeypatch):
+    pd.DataFrame({"importo": [50, 150, 300, 80, 120]}).to_csv(tmp_path / "vendite.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_dependencies_follow_variables_and_implicit_sources():
+    runtime = Runtime()
+    ops = STATS_IR["operations"] + [op("op_7", "math.count")]
+    resolved = resolve_implicit_sources(ops, runtime.operations)
+    deps = dependencies(resolved, runtime.operations)
+
+    assert deps[:6] == [set(), {0}, {1}, {1}, {1}, {2, 3, 4}]
+    # La sorgente implicita diventa l'ultima variabile creata
+    assert resolved[6]["params"] == {"source": "$var_4"}
+    assert deps[6] == {4}
+
+
+def test_rewritten_variable_waits_for_readers():
+    runtime = Runtime()
+    ops = [
+        op("op_1", "io.print", "$var_0", value=1),
+        op("op_2", "io.print", "$var_1", value="$var_0"),
+        op("op_3", "io.print", "$var_0", value=2),
+    ]
+    deps = dependencies(resolve_implicit_sources(ops, runtime.operations), runtime.operations)
+    assert deps == [set(), {0}, {0, 1}]
+
+
+def test_parallel_matches_sequential(sales_csv, capsys):
+    sequential = Runtime(events=ConsoleRenderer())
+    sequential.execute(STATS_IR)
+    expected = capsys.readouterr().out
+
+    parallel = Runtime(jobs=4, events=ConsoleRenderer())
+    result = parallel.execute(STATS_IR)
+    out = capsys.readouterr().out
+
+    assert result == "Totale: 570, media: 190.0, massimo: 300"
+    assert out.splitlines()[2:] == expected.splitlines()[2:]
+    assert list(parallel.memory) == list(sequential.memory)
+
+
+def test_independent_operations_overlap():
+    runtime = Runtime(jobs=3)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow(value=None, **kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.1)
+        with lock:
+            active[0] -= 1
+        return value
+
+    runtime.operations["test.slow"] = slow
+    ir = {"version": "1.0", "exports": ["$var_0", "$var_1", "$var_2"], "operations": [
+        op(f"op_{i}", "test.slow", f"$var_{i}", value=i) for i in range(3)
+    ]}
+
+    start = time.perf_counter()
+    runtime.execute(ir)
+
+    assert peak[0] == 3
+    assert time.perf_counter() - start < 0.25
+    assert [runtime.memory[f"$var_{i}"] for i in range(3)] == [0, 1, 2]
+
+
+def test_first_error_in_program_order(capsys):
+    runtime = Runtime(jobs=4, events=ConsoleRenderer())
+
+    def fail_after(delay=0, **kwargs):
+        time.sleep(delay)
+        raise ValueError(f"errore dopo {delay}")
+
+    runtime.operations["test.fail"] = fail_after
+    ir = {"version": "1.0", "operations": [
+        op("op_1", "io.print", value="prima"),
+        op("op_2", "test.fail", delay=0.1),
+        op("op_3", "test.fail", delay=0),
+        op("op_4", "io.print", value="dopo"),
+    ]}
+
+    with pytest.raises(Exception, match="errore dopo 0.1"):
+        runtime.execute(ir)
+    out = capsys.readouterr().out
+    assert "prima" in out
+    assert "dopo" not in out
+
+
+def test_process_stdout_is_left_alone():
+    import sys
+
+    runtime = Runtime(jobs=2)
+    seen = []
+    runtime.operations["test.stdout"] = lambda **kwargs: seen.append(sys.stdout)
+    ir = {"version": "1.0", "operations": [op(f"op_{i}", "test.stdout") for i in range(3)]}
+
+    stdout = sys.stdout
+    runtime.execute(ir)
+    assert seen == [stdout] * 3
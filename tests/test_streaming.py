@@ -0,0 +1,109 @@
+"""
+Test parsing in streaming ed esecuzione sovrapposta
+"""
+
+import json
+import time
+
+import pytest
+
+from oratio.compiler.parser import SemanticParser
+from oratio.compiler.streaming import OperationScanner
+from oratio.compiler.errors import ValidationError
+from oratio.runtime import Runtime
+
+
+STREAM_IR = {
+    "version": "1.0",
+    "operations": [
+        {"id": "op_1", "type": "io.print", "params": {"value": "primo {\"}"}, "output": "$var_0"},
+        {"id": "op_2", "type": "io.print", "params": {"value": "$var_0"}},
+        {"id": "op_3", "type": "io.print", "params": {"value": "x" * 200}},
+    ]
+}
+
+
+def make_parser(server):
+    return SemanticParser(api_key="test", language="it", base_url=server.base_url,
+                          use_cache=False, incremental=False, fast_path=False)
+
+
+def test_scanner_yields_operations_as_they_close():
+    text = json.dumps(STREAM_IR)
+    scanner = OperationScanner()
+    seen = []
+    for i, c in enumerate(text):
+        for op in scanner.feed(c):
+            seen.append((op, i))
+
+    assert [op for op, _ in seen] == STREAM_IR["operations"]
+    assert seen[0][1] < len(text) // 3
+    assert scanner.complete
+    assert scanner.result() == STREAM_IR
+
+
+def test_scanner_ignores_trailing_chatter():
+    scanner = OperationScanner()
+    scanner.feed('Ecco: {"version": "1.0", "operations": []} spero vada bene {')
+    assert scanner.complete
+    assert scanner.result() == {"version": "1.0", "operations": []}
+
+
+def test_parse_stream_yields_before_completion_ends(chat_server):
+    chat_server.responder = lambda messages: STREAM_IR
+    chat_server.chunk_size = 20
+    chat_server.chunk_delay = 0.05
+    parser = make_parser(chat_server)
+
+    start = time.monotonic()
+    arrivals = [(op, time.monotonic() - start) for op in parser.parse_stream("Stampa tre cose")]
+    total = time.monotonic() - start
+
+    assert [op for op, _ in arrivals] == STREAM_IR["operations"]
+    assert chat_server.requests[0]["stream"] is True
+    assert arrivals[0][1] < total / 2
+
+
+def test_parse_stream_rejects_undefined_variable(chat_server):
+    bad = {"version": "1.0", "operations": [
+        {"id": "op_1", "type": "io.print", "params": {"value": "$var_9"}},
+    ]}
+    chat_server.responder = lambda messages: bad
+    parser = make_parser(chat_server)
+
+    with pytest.raises(ValidationError):
+        list(parser.parse_stream("Stampa qualcosa"))
+
+
+def test_execute_stream_overlaps_production():
+    events = []
+
+    def operations():
+        for i in range(3):
+            events.append(("prodotta", i))
+            yield {"type": "io.print", "params": {"value": i}, "output": f"$var_{i}"}
+            time.sleep(0.1)
+
+    runtime = Runtime()
+    print_op = runtime.operations["io.print"]
+
+    def record(**kwargs):
+        events.append(("eseguita", kwargs["value"]))
+        return print_op(**kwargs)
+
+    runtime.operations["io.print"] = record
+    result = runtime.execute_stream(operations())
+
+    assert result == 2
+    assert runtime.memory == {"$var_0": 0, "$var_1": 1, "$var_2": 2}
+    # La prima operazione gira prima che la seconda sia prodotta
+    assert events.index(("eseguita", 0)) < events.index(("prodotta", 1))
+
+
+def test_execute_stream_propagates_producer_errors():
+    def operations():
+        yield {"type": "io.print", "params": {"value": "ok"}}
+        raise ValidationError("rotta")
+
+    with pytest.raises(ValidationError):
+        Runtime().execute_stream(operations())